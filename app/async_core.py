@@ -0,0 +1,245 @@
+# app/async_core.py
+import asyncio
+import logging
+import time
+import weakref
+from typing import Dict, Optional
+from app.core import SS7Core
+from app.metrics import Metrics
+from app.transaction_manager import Transaction, TransactionManager
+from utils.network.async_transport import AsyncConnectionPool, PoolKey, create_transport
+from utils.validators import validate_imsi, validate_msisdn, validate_gt, validate_ssn, validate_ip, validate_port, validate_protocol
+
+
+async def begin_transaction(transactions: TransactionManager, operation: str, params: dict) -> Transaction:
+    """
+    TransactionManager.begin(), waiting while the only invoke IDs left are
+    quarantined after an expiry (the caller bounds transactions in flight).
+    """
+    while True:
+        try:
+            return transactions.begin(operation, params)
+        except RuntimeError:
+            delay = transactions.retry_after()
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+
+
+class PipelinedChannel:
+    """
+    Single association carrying many outstanding transactions.
+
+    Requests are written as soon as they get an invoke ID; a reader task
+    parses every incoming SCCP message and routes it to its waiter through
+    the channel's TransactionManager.
+    """
+
+    def __init__(self, transport, response_parser):
+        self.transport = transport
+        self.response_parser = response_parser
+        self.transactions = TransactionManager(future_factory=asyncio.get_running_loop().create_future)
+        self._slots = asyncio.Semaphore(self.transactions.capacity)
+        self._connect_lock = asyncio.Lock()
+        self._reader_task: Optional[asyncio.Task] = None
+        self.logger = logging.getLogger(__name__)
+
+    async def request(self, operation: str, build, params: dict) -> dict:
+        """
+        Send a request built for a fresh invoke ID and wait for its result.
+        """
+        async with self._slots:
+            txn = await begin_transaction(self.transactions, operation, params)
+            try:
+                await self._ensure_connected()
+                await self.transport.send(build(txn.invoke_id))
+                return await txn.future
+            finally:
+                # no-op once resolved; otherwise a late response must not
+                # reach the next transaction given this invoke ID
+                self.transactions.expire(txn.invoke_id)
+
+    async def _ensure_connected(self) -> None:
+        async with self._connect_lock:
+            if self._reader_task is None or self._reader_task.done():
+                await self.transport.connect()
+                self._reader_task = asyncio.ensure_future(self._read_loop())
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                frame = await self.transport.read_frame()
+                result = self.response_parser.parse_response(frame, store=False)
+                self.transactions.resolve(result.get("invoke_id"), result)
+        except asyncio.CancelledError:
+            raise
+        except (asyncio.IncompleteReadError, OSError) as e:
+            self.logger.warning(f"Pipelined association closed: {e}")
+            self.transactions.fail_all(ConnectionResetError(f"Association closed: {e}"))
+            await self.transport.close()
+
+    async def close(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+        self.transactions.fail_all(ConnectionResetError("Channel closed"))
+        await self.transport.close()
+
+
+class AsyncSS7Core:
+    """
+    asyncio front end for SS7Core.
+
+    Packets are built and parsed by the wrapped SS7Core's MessageFactory and
+    ResponseParser; only the transport runs on the event loop, so many MAP
+    transactions can be in flight from a single process. A semaphore bounds
+    the number of concurrent transactions and each one is given its own
+    deadline. Invoke IDs are allocated per association, from a
+    TransactionManager kept for each pooled transport, so the 256 one-octet
+    IDs never bound the process as a whole. With pipeline enabled, all
+    transactions to a target share one association and are matched to
+    responses by invoke ID.
+    """
+
+    def __init__(self, api_key: str = None, max_concurrency: Optional[int] = None,
+                 timeout: Optional[float] = None, core: Optional[SS7Core] = None,
+                 pipeline: Optional[bool] = None):
+        self.logger = logging.getLogger(__name__)
+        self.core = core or SS7Core(api_key)
+        async_config = self.core.config.get_config("async", {}) or {}
+        self.max_concurrency = int(max_concurrency or async_config.get("max_concurrency", 1000))
+        self.timeout = float(timeout or async_config.get("timeout", 5.0))
+        self.message_factory = self.core.message_factory
+        self.response_parser = self.core.response_parser
+        self.pipeline = bool(async_config.get("pipeline", False) if pipeline is None else pipeline)
+        self.connection_pool = AsyncConnectionPool(max_idle_per_key=self.max_concurrency)
+        self._channels: Dict[PoolKey, PipelinedChannel] = {}
+        # invoke IDs of the non-pipelined path, per pooled transport
+        self._transactions: "weakref.WeakKeyDictionary[object, TransactionManager]" = weakref.WeakKeyDictionary()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def send_sri(self, imsi: str, msisdn: str, target_ip: str, target_port: int, ssn: int, gt: str, protocol: str, timeout: Optional[float] = None) -> dict:
+        if not all([validate_imsi(imsi), validate_msisdn(msisdn), validate_ip(target_ip), validate_port(target_port), validate_ssn(ssn), validate_gt(gt), validate_protocol(protocol)]):
+            self.logger.error("Invalid input parameters for SRI")
+            return {"status": "error", "message": "Invalid input parameters"}
+
+        build = lambda invoke_id: self.message_factory.create_sri_message(imsi, msisdn, gt, ssn, invoke_id=invoke_id)
+        return await self._send_packet(build, "SRI", target_ip, target_port, {"imsi": imsi, "msisdn": msisdn, "gt": gt, "ssn": ssn, "target_ip": target_ip, "target_port": target_port, "protocol": protocol}, timeout)
+
+    async def send_ati(self, imsi: str, target_ip: str, target_port: int, ssn: int, gt: str, protocol: str, timeout: Optional[float] = None) -> dict:
+        if not all([validate_imsi(imsi), validate_ip(target_ip), validate_port(target_port), validate_ssn(ssn), validate_gt(gt), validate_protocol(protocol)]):
+            self.logger.error("Invalid input parameters for ATI")
+            return {"status": "error", "message": "Invalid input parameters"}
+
+        build = lambda invoke_id: self.message_factory.create_ati_message(imsi, gt, ssn, invoke_id=invoke_id)
+        return await self._send_packet(build, "ATI", target_ip, target_port, {"imsi": imsi, "gt": gt, "ssn": ssn, "target_ip": target_ip, "target_port": target_port, "protocol": protocol}, timeout)
+
+    async def send_ul(self, imsi: str, vlr_gt: str, target_ip: str, target_port: int, ssn: int, gt: str, protocol: str, timeout: Optional[float] = None) -> dict:
+        if not all([validate_imsi(imsi), validate_gt(vlr_gt), validate_ip(target_ip), validate_port(target_port), validate_ssn(ssn), validate_gt(gt), validate_protocol(protocol)]):
+            self.logger.error("Invalid input parameters for UL")
+            return {"status": "error", "message": "Invalid input parameters"}
+
+        build = lambda invoke_id: self.message_factory.create_ul_message(imsi, vlr_gt, gt, ssn, invoke_id=invoke_id)
+        return await self._send_packet(build, "UL", target_ip, target_port, {"imsi": imsi, "vlr_gt": vlr_gt, "gt": gt, "ssn": ssn, "target_ip": target_ip, "target_port": target_port, "protocol": protocol}, timeout)
+
+    async def send_psi(self, imsi: str, target_ip: str, target_port: int, ssn: int, gt: str, protocol: str, timeout: Optional[float] = None) -> dict:
+        if not all([validate_imsi(imsi), validate_ip(target_ip), validate_port(target_port), validate_ssn(ssn), validate_gt(gt), validate_protocol(protocol)]):
+            self.logger.error("Invalid input parameters for PSI")
+            return {"status": "error", "message": "Invalid input parameters"}
+
+        build = lambda invoke_id: self.message_factory.create_psi_message(imsi, gt, ssn, invoke_id=invoke_id)
+        return await self._send_packet(build, "PSI", target_ip, target_port, {"imsi": imsi, "gt": gt, "ssn": ssn, "target_ip": target_ip, "target_port": target_port, "protocol": protocol}, timeout)
+
+    async def close(self) -> None:
+        """Close all pooled transports, pipelined channels and the wrapped core."""
+        channels, self._channels = self._channels, {}
+        for channel in channels.values():
+            await channel.close()
+        await self.connection_pool.close_all()
+        self.core.close()
+
+    async def _send_packet(self, build, operation, target_ip, target_port, params, timeout=None):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        deadline = self.timeout if timeout is None else timeout
+        context = dict(params, operation=operation)
+        timings = {}
+        queued = time.perf_counter()
+
+        def build_request(invoke_id):
+            started = time.perf_counter()
+            context["request"] = build(invoke_id)
+            timings["build"] = time.perf_counter() - started
+            return context["request"]
+
+        try:
+            async with self._semaphore:
+                self.logger.debug(f"Sending {operation} packet to {target_ip}:{target_port} with protocol {params['protocol']}")
+                started = time.monotonic()
+                if self.pipeline:
+                    channel = self._channel(target_ip, target_port, params["protocol"])
+                    result = await asyncio.wait_for(channel.request(operation, build_request, params), deadline)
+                else:
+                    result = await asyncio.wait_for(self._transact(build_request, operation, target_ip, target_port, params), deadline)
+                context["rtt_ms"] = (time.monotonic() - started) * 1000.0
+        except asyncio.TimeoutError:
+            self.logger.error(f"{operation} transaction to {target_ip}:{target_port} exceeded {deadline}s deadline")
+            result = {
+                "status": "error",
+                "message": f"Transaction deadline of {deadline}s exceeded",
+                "operation": operation,
+                "params": params,
+                "raw_response": ""
+            }
+        except Exception as e:
+            self.logger.error(f"Failed to send {operation} packet: {str(e)}")
+            result = {
+                "status": "error",
+                "message": str(e),
+                "operation": operation,
+                "params": params,
+                "raw_response": ""
+            }
+        stored = time.perf_counter()
+        self.response_parser._store_response(result, context)
+        finished = time.perf_counter()
+        timings["store"] = finished - stored
+        timings["total"] = finished - queued
+        self.core.metrics.record_stages(operation, Metrics.target_key(target_ip, target_port, params["protocol"]), timings)
+        return result
+
+    async def _transact(self, build, operation, target_ip, target_port, params) -> dict:
+        async def exchange(transport) -> bytes:
+            transactions = self._transactions.get(transport)
+            if transactions is None:
+                transactions = self._transactions[transport] = TransactionManager()
+            txn = await begin_transaction(transactions, operation, params)
+            response = None
+            try:
+                response = await transport.send_packet(build(txn.invoke_id))
+            finally:
+                if response:
+                    transactions.finish(txn.invoke_id)
+                else:
+                    transactions.expire(txn.invoke_id)
+            return response
+
+        response = await self.connection_pool.transact(target_ip, target_port, params["protocol"], exchange)
+        return self.response_parser.parse_response(response, store=False)
+
+    def _channel(self, target_ip, target_port, protocol) -> PipelinedChannel:
+        key = AsyncConnectionPool.make_key(target_ip, target_port, protocol)
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = PipelinedChannel(create_transport(*key), self.response_parser)
+            self._channels[key] = channel
+        return channel
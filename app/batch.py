@@ -0,0 +1,300 @@
+#app/batch.py
+import csv
+import json
+import logging
+import sys
+from typing import Iterable, Iterator, Optional, Tuple
+from utils.number_ranges import NumberRange
+from utils.validators import validate_imsi, validate_msisdn, validate_gt, validate_ssn, validate_ip, validate_port, validate_protocol
+
+# operation -> fields its send_* method needs besides the common target fields
+OPERATION_FIELDS = {
+    "SRI": ("imsi", "msisdn"),
+    "ATI": ("imsi",),
+    "UL": ("imsi", "vlr_gt"),
+    "PSI": ("imsi",),
+}
+TARGET_FIELDS = ("target_ip", "target_port", "ssn", "gt", "protocol")
+
+VALIDATORS = {
+    "imsi": validate_imsi,
+    "msisdn": validate_msisdn,
+    "vlr_gt": validate_gt,
+    "target_ip": validate_ip,
+    "target_port": validate_port,
+    "ssn": validate_ssn,
+    "gt": validate_gt,
+    "protocol": validate_protocol,
+}
+
+CSV_COLUMNS = ("line", "operation", "status", "imsi", "msisdn", "vlr_gt", "target_ip", "target_port",
+               "invoke_id", "opcode", "message")
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    if fmt:
+        return fmt.lower()
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def _open(path: str, mode: str, fmt: str):
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    # the csv module does its own newline handling
+    return open(path, mode, newline="" if fmt == "csv" else None)
+
+
+def read_requests(path: str, fmt: Optional[str] = None) -> Iterator[Tuple[int, object]]:
+    """
+    Lazily read operation specs from a JSONL or CSV file ("-" for stdin).
+
+    Yields:
+        (line number, dict) per request, or (line number, ValueError) for
+        lines that cannot be parsed; blank lines and # comments are skipped
+    """
+    fmt = detect_format(path, fmt)
+    f = _open(path, "r", fmt)
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, {key: value for key, value in row.items() if key and value not in (None, "")}
+            return
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                yield line_no, ValueError(f"Invalid JSON: {e}")
+                continue
+            if not isinstance(request, dict):
+                yield line_no, ValueError("Request must be a JSON object")
+                continue
+            yield line_no, request
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+class GeneratedRequest(dict):
+    """
+    Request made by generate_requests from number ranges, whose values are
+    valid by construction and already carry their wire form: BatchRunner
+    only adds the target fields, skips normalize_request and sends it with
+    SS7Core.send_prepared.
+    """
+
+
+def _normalize_field(field: str, value) -> Tuple[object, Optional[str]]:
+    if field in ("target_port", "ssn"):
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            return None, f"Invalid {field}: {value}"
+    elif field == "protocol":
+        value = str(value).upper()
+    else:
+        value = str(value)
+    if not VALIDATORS[field](value):
+        return None, f"Invalid {field}: {value}"
+    return value, None
+
+
+def normalize_request(request: dict, defaults: Optional[dict] = None) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    Validate a raw request and turn it into an SS7Core.send_spec() dict.
+
+    Missing target fields are taken from defaults; numeric fields given as
+    strings (as in CSV) are converted.
+
+    Returns:
+        (spec, None) if valid, (None, error message) otherwise
+    """
+    operation = str(request.get("operation") or "").upper()
+    if operation.startswith("MAP_"):
+        operation = operation[4:]
+    if operation not in OPERATION_FIELDS:
+        return None, f"Unknown operation: {request.get('operation')}"
+    spec = {"operation": operation}
+    for field in OPERATION_FIELDS[operation] + TARGET_FIELDS:
+        value = request.get(field)
+        if value is None and defaults:
+            value = defaults.get(field)
+        if value is None:
+            return None, f"Missing field: {field}"
+        value, error = _normalize_field(field, value)
+        if error:
+            return None, error
+        spec[field] = value
+    return spec, None
+
+
+def _cycle(values: NumberRange) -> Iterator[str]:
+    while True:
+        yield from values.encoded()
+
+
+def generate_requests(operation: str, imsis: NumberRange, msisdns: Optional[NumberRange] = None,
+                      vlr_gts: Optional[NumberRange] = None) -> Iterator[GeneratedRequest]:
+    """
+    Lazily turn number ranges into batch requests.
+
+    The n-th IMSI is paired with the n-th MSISDN or VLR GT, wrapping around
+    shorter ranges; targets are left to the batch defaults. Numbers are
+    EncodedNumbers, TBCD-encoded a chunk at a time (see NumberRange.encoded).
+
+    Raises:
+        ValueError: If the operation is unknown or a range it needs is missing
+    """
+    operation = operation.upper()
+    if operation not in OPERATION_FIELDS:
+        raise ValueError(f"Unknown operation: {operation}")
+    if operation == "SRI" and not msisdns:
+        raise ValueError("SRI requests need an MSISDN range")
+    if operation == "UL" and not vlr_gts:
+        raise ValueError("UL requests need a VLR GT range")
+
+    def requests():
+        others = _cycle(msisdns) if operation == "SRI" else _cycle(vlr_gts) if operation == "UL" else None
+        field = "msisdn" if operation == "SRI" else "vlr_gt"
+        for imsi in imsis.encoded():
+            request = GeneratedRequest(operation=operation, imsi=imsi)
+            if others is not None:
+                request[field] = next(others)
+            yield request
+
+    return requests()
+
+
+class BatchRunner:
+    """
+    Stream operation specs through SS7Core.send_many.
+
+    At most max_in_flight requests are read ahead of the output, so memory
+    use does not depend on the input size. Results are produced in input
+    order, or in completion order when ordered is False. Rejected lines
+    take their place in the same window, so they keep their position too.
+    """
+
+    def __init__(self, core, max_workers: int = 8, max_in_flight: Optional[int] = None,
+                 ordered: bool = True, defaults: Optional[dict] = None):
+        self.core = core
+        self.max_workers = max(1, int(max_workers))
+        self.max_in_flight = max(self.max_workers, int(max_in_flight or 2 * self.max_workers))
+        self.ordered = ordered
+        self.defaults = defaults or {}
+        self._targets: Optional[Tuple[Optional[dict], Optional[str]]] = None
+        self.logger = logging.getLogger(__name__)
+
+    def run(self, requests: Iterable[Tuple[int, object]]) -> Iterator[dict]:
+        """
+        Run (line, request) pairs as produced by read_requests().
+
+        Yields:
+            Output records: {"line", "request", **result, "operation"} where
+            request is the validated spec that was sent (or the raw input if
+            it was rejected)
+        """
+        items = (self._prepare(line, request) for line, request in requests)
+        for (line, request, _), result in self.core.send_many(items, self.max_workers, self.max_in_flight,
+                                                              ordered=self.ordered, send=self._send):
+            yield self._record(line, request, result)
+
+    def _prepare(self, line: int, request) -> Tuple[int, object, Optional[str]]:
+        """
+        Validate a request; returns (line, request as it is sent or the raw
+        input if rejected, error message or None).
+        """
+        if isinstance(request, Exception):
+            return line, request, str(request)
+        if isinstance(request, GeneratedRequest):
+            targets, error = self._default_targets()
+            if error:
+                return line, request, error
+            return line, GeneratedRequest(request, **targets), None
+        spec, error = normalize_request(request, self.defaults)
+        if error:
+            self.logger.error(f"Batch line {line}: {error}")
+            return line, request, error
+        return line, spec, None
+
+    def _default_targets(self) -> Tuple[Optional[dict], Optional[str]]:
+        """
+        Target fields from defaults, validated once for all generated requests.
+        """
+        if self._targets is None:
+            targets = {}
+            for field in TARGET_FIELDS:
+                if self.defaults.get(field) is None:
+                    self._targets = None, f"Missing field: {field}"
+                    break
+                targets[field], error = _normalize_field(field, self.defaults[field])
+                if error:
+                    self._targets = None, error
+                    break
+            else:
+                self._targets = targets, None
+        return self._targets
+
+    def _send(self, item: Tuple[int, object, Optional[str]]) -> dict:
+        _, spec, error = item
+        if error:
+            return {"status": "error", "message": error}
+        if isinstance(spec, GeneratedRequest):
+            operation = spec["operation"]
+            return self.core.send_prepared(operation, {field: spec[field] for field in OPERATION_FIELDS[operation]},
+                                           **{field: spec[field] for field in TARGET_FIELDS})
+        return self.core.send_spec(spec)
+
+    @staticmethod
+    def _record(line: int, request, result: dict) -> dict:
+        record = {"line": line}
+        if isinstance(request, dict):
+            record["request"] = request
+        record.update(result)
+        if isinstance(request, dict):
+            record["operation"] = request.get("operation")
+        return record
+
+
+class ResultWriter:
+    """
+    Write batch output records as JSON lines or CSV rows ("-" for stdout).
+    """
+
+    def __init__(self, path: str, fmt: Optional[str] = None):
+        self.path = path
+        self.format = detect_format(path, fmt)
+        self.count = 0
+        self._file = _open(path, "w", self.format)
+        self._csv = None
+        if self.format == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+            self._csv.writeheader()
+
+    def write(self, record: dict) -> None:
+        if self._csv is not None:
+            params = record.get("params") or {}
+            request = record.get("request") or {}
+            row = {column: record.get(column) for column in CSV_COLUMNS}
+            for column in ("imsi", "msisdn", "vlr_gt", "target_ip", "target_port"):
+                row[column] = params.get(column, request.get(column))
+            row["message"] = record.get("message") or record.get("error")
+            self._csv.writerow(row)
+        else:
+            self._file.write(json.dumps(record) + "\n")
+        self.count += 1
+
+    def close(self) -> None:
+        if self._file is sys.stdout:
+            self._file.flush()
+        else:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,509 @@
+#app/campaign.py
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from app.metrics import Metrics
+from app.storage import TransactionStore
+from utils.number_ranges import EncodedNumber, NumberRange
+
+# Imported once by the forkserver so that every worker forked from it
+# starts with the core and the scapy-backed SS7 layers (used to decode
+# malformed responses) already loaded.
+PRELOAD_MODULES = ["utils.protocols.ss7_layers", "app.core", "app.campaign"]
+
+Target = Tuple[str, int, str]
+
+
+def parse_operations(value: str) -> Dict[str, int]:
+    """
+    Parse an operation mix such as "SRI=3,ATI,UL=2" into {operation: weight}.
+    """
+    mix = {}
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip().upper()
+        if name.startswith("MAP_"):
+            name = name[4:]
+        if name not in ("SRI", "ATI", "UL", "PSI"):
+            raise ValueError(f"Unknown operation: {name}")
+        mix[name] = int(weight) if weight else 1
+    if not mix or any(weight < 1 for weight in mix.values()):
+        raise ValueError(f"Invalid operation mix: {value}")
+    return mix
+
+
+def parse_target(value: str, default_protocol: str = "SCTP") -> Target:
+    """
+    Parse "ip:port[/protocol]" into (ip, port, PROTOCOL).
+    """
+    address, _, protocol = value.partition("/")
+    ip, _, port = address.rpartition(":")
+    if not ip or not port:
+        raise ValueError(f"Invalid target: {value}")
+    return ip, int(port), (protocol or default_protocol).upper()
+
+
+class CampaignSpec:
+    """
+    Deterministic description of a campaign workload.
+
+    Request i queries IMSI imsi_start + i with the operation and target
+    picked round-robin from the weighted operation mix and the target list,
+    so any index range can be generated independently by any worker.
+    """
+
+    def __init__(self, imsi_start: int, count: int, operations: Dict[str, int], targets: Sequence[Target],
+                 gt: str, ssn: int, msisdn_start: int = 9876543210, vlr_gt: str = "1234567890"):
+        if not targets:
+            raise ValueError("A campaign needs at least one target")
+        self.imsi_start = int(imsi_start)
+        self.count = int(count)
+        self.operations = dict(operations)
+        self.targets = [tuple(target) for target in targets]
+        self.gt = gt
+        self.ssn = int(ssn)
+        self.msisdn_start = int(msisdn_start)
+        self.vlr_gt = vlr_gt
+        self._cycle = [name for name, weight in self.operations.items() for _ in range(weight)]
+
+    def request(self, index: int, imsi: Optional[str] = None, msisdn: Optional[str] = None) -> dict:
+        """
+        Keyword arguments for SS7Core.send_operation for request index.
+
+        Args:
+            imsi: The IMSI of index if already made, e.g. by requests()
+            msisdn: Likewise for the MSISDN
+        """
+        operation = self._cycle[index % len(self._cycle)]
+        target_ip, target_port, protocol = self.targets[index % len(self.targets)]
+        request = {
+            "operation": operation,
+            "imsi": imsi or f"{self.imsi_start + index:015d}",
+            "target_ip": target_ip,
+            "target_port": target_port,
+            "ssn": self.ssn,
+            "gt": self.gt,
+            "protocol": protocol,
+        }
+        if operation == "SRI":
+            request["msisdn"] = msisdn or f"{self.msisdn_start + index:010d}"
+        elif operation == "UL":
+            request["vlr_gt"] = self.vlr_gt
+        return request
+
+    def requests(self, start: int, stop: int) -> Iterator[dict]:
+        """
+        request(index) for every index in [start, stop), with the IMSIs and
+        MSISDNs made as EncodedNumbers a chunk at a time (see
+        NumberRange.encoded), so they are not encoded once per request.
+        """
+        imsis = _encoded(self.imsi_start + start, stop - start, 15)
+        msisdns = _encoded(self.msisdn_start + start, stop - start, 10) if "SRI" in self.operations else None
+        for index in range(start, stop):
+            yield self.request(index, next(imsis) if imsis else None, next(msisdns) if msisdns else None)
+
+    def to_dict(self) -> dict:
+        return {
+            "imsi_start": self.imsi_start,
+            "count": self.count,
+            "operations": self.operations,
+            "targets": [list(target) for target in self.targets],
+            "gt": self.gt,
+            "ssn": self.ssn,
+            "msisdn_start": self.msisdn_start,
+            "vlr_gt": self.vlr_gt,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CampaignSpec":
+        return cls(**data)
+
+    def shards(self, shard_size: int) -> Iterator[Tuple[int, int]]:
+        """
+        Split [0, count) into (start, stop) ranges of at most shard_size requests.
+        """
+        for start in range(0, self.count, shard_size):
+            yield start, min(start + shard_size, self.count)
+
+
+def _encoded(first: int, count: int, length: int) -> Optional[Iterator[EncodedNumber]]:
+    try:
+        return NumberRange("", first, count, length).encoded()
+    except ValueError:
+        # the numbers outgrow length digits; request() formats them as before
+        return None
+
+
+class RowCollector:
+    """
+    Stand-in for TransactionStore inside worker processes: rows are kept in
+    memory and shipped to the campaign's single storage writer per batch.
+    Keys in tags (campaign_id, campaign_index) are added to every row.
+    """
+
+    def __init__(self):
+        self.items: List[tuple] = []
+        self.tags: dict = {}
+
+    def submit(self, result: dict, context: Optional[dict] = None) -> bool:
+        if self.tags:
+            context = dict(context or {}, **self.tags)
+        self.items.append(TransactionStore.row_from_result(result, context))
+        return True
+
+    def take(self) -> List[tuple]:
+        items, self.items = self.items, []
+        return items
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class Checkpoint:
+    """
+    Progress of a campaign persisted in its TransactionStore.
+
+    Finished request ranges are queued to the storage writer right after
+    their rows, so they are committed together with them or later, never
+    before. Resuming runs only the ranges that are not checkpointed, minus
+    requests whose rows were committed just before an interruption, so no
+    finished operation is sent twice.
+    """
+
+    def __init__(self, store: TransactionStore, campaign_id: int, spec: CampaignSpec, shard_size: int,
+                 ranges: Sequence[Tuple[int, int]] = ()):
+        self.store = store
+        self.campaign_id = campaign_id
+        self.spec = spec
+        self.shard_size = shard_size
+        self.completed = 0
+        self.cursor = 0
+        # finished ranges beyond the cursor, start -> stop
+        self._ahead: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._advance(ranges)
+
+    @classmethod
+    def create(cls, store: TransactionStore, spec: CampaignSpec, shard_size: int) -> "Checkpoint":
+        campaign_id = store.create_campaign(json.dumps(spec.to_dict()), shard_size)
+        return cls(store, campaign_id, spec, shard_size)
+
+    @classmethod
+    def resume(cls, store: TransactionStore, campaign_id: int) -> "Checkpoint":
+        """
+        Raises:
+            ValueError: If the store has no such campaign
+        """
+        campaign = store.get_campaign(campaign_id)
+        if campaign is None:
+            raise ValueError(f"Unknown campaign: {campaign_id}")
+        spec = CampaignSpec.from_dict(json.loads(campaign["spec"]))
+        return cls(store, campaign_id, spec, campaign["shard_size"], store.campaign_ranges(campaign_id))
+
+    def _advance(self, ranges: Sequence[Tuple[int, int]]) -> None:
+        for start, stop in ranges:
+            self.completed += stop - start
+            self._ahead[start] = stop
+        while self.cursor in self._ahead:
+            self.cursor = self._ahead.pop(self.cursor)
+
+    def pending(self) -> List[Tuple[int, int]]:
+        """
+        Ranges of at most shard_size requests that still have to be run.
+
+        Requests found stored inside the gaps are checkpointed instead.
+        """
+        gaps = []
+        position = self.cursor
+        for start in sorted(self._ahead):
+            if start > position:
+                gaps.append((position, start))
+            position = max(position, self._ahead[start])
+        if position < self.spec.count:
+            gaps.append((position, self.spec.count))
+        runs = []
+        stored = []
+        for start, stop in gaps:
+            for index in self.store.campaign_indices(self.campaign_id, start, stop):
+                if index > start:
+                    runs.append((start, index))
+                if stored and stored[-1][1] == index:
+                    stored[-1] = (stored[-1][0], index + 1)
+                else:
+                    stored.append((index, index + 1))
+                start = index + 1
+            if start < stop:
+                runs.append((start, stop))
+        if stored:
+            self.record(stored)
+        return [(start, min(start + self.shard_size, stop))
+                for run_start, stop in runs for start in range(run_start, stop, self.shard_size)]
+
+    def counts(self) -> Dict[Tuple[str, str], int]:
+        """
+        {(operation, status): count} of the results stored so far.
+        """
+        return self.store.campaign_counts(self.campaign_id)
+
+    def record(self, ranges: Sequence[Tuple[int, int]]) -> None:
+        """
+        Checkpoint finished ranges; call after submitting their rows.
+        """
+        with self._lock:
+            self._advance(ranges)
+            status = "finished" if self.cursor >= self.spec.count else "running"
+            self.store.checkpoint(self.campaign_id, ranges, self.completed, self.cursor, status)
+
+
+def run_batches(core, spec: CampaignSpec, start: int, stop: int, campaign_id: Optional[int], batch_size: int,
+                flush_interval: float) -> Iterator[Tuple[int, int, List[tuple], dict, Dict[Tuple[str, str], int]]]:
+    """
+    Run requests [start, stop) of spec on core, whose response_parser.store
+    is a RowCollector, in batches of contiguous requests.
+
+    A batch ends after batch_size requests, after flush_interval seconds or
+    at stop; closing the generator abandons the rest of the range.
+
+    Yields:
+        (batch start, batch stop, rows, drained histograms, {(operation, status): count})
+    """
+    collector = core.response_parser.store
+    # leftovers of an abandoned range
+    collector.take()
+    core.metrics.drain()
+    counts: Dict[Tuple[str, str], int] = {}
+    batch_start = start
+    flushed = time.monotonic()
+    for index, request in enumerate(spec.requests(start, stop), start):
+        if campaign_id is not None:
+            collector.tags = {"campaign_id": campaign_id, "campaign_index": index}
+        operation = request.pop("operation")
+        result = core.send_operation(operation, **request)
+        key = (operation, result.get("status", "error"))
+        counts[key] = counts.get(key, 0) + 1
+        if index + 1 - batch_start >= batch_size or time.monotonic() - flushed >= flush_interval or index + 1 == stop:
+            yield batch_start, index + 1, collector.take(), core.metrics.drain(), counts
+            batch_start, flushed, counts = index + 1, time.monotonic(), {}
+
+
+_worker_core = None
+_worker_results = None
+
+
+def _init_worker(api_key: Optional[str], results) -> None:
+    global _worker_core, _worker_results
+    from app.core import SS7Core
+    _worker_core = SS7Core(api_key, db_path=None)
+    _worker_core.response_parser.store = RowCollector()
+    _worker_results = results
+
+
+def _run_shard(task: Tuple[CampaignSpec, int, int, Optional[int], int, float]) -> Tuple[int, int]:
+    """
+    Run requests [start, stop) and put (pid, start, stop, rows, histograms,
+    counts) batches on the results queue as contiguous sub-ranges finish,
+    after an empty (pid, start, start, ...) batch announcing the shard.
+    """
+    spec, start, stop, campaign_id, batch_size, flush_interval = task
+    pid = os.getpid()
+    _worker_results.put((pid, start, start, [], {}, {}))
+    for batch in run_batches(_worker_core, spec, start, stop, campaign_id, batch_size, flush_interval):
+        _worker_results.put((pid, *batch))
+    return start, stop
+
+
+def get_context():
+    """
+    Multiprocessing context for campaign workers: a forkserver with
+    PRELOAD_MODULES imported where available, spawn elsewhere.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(PRELOAD_MODULES)
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class CampaignRunner:
+    """
+    Run a CampaignSpec on a pool of worker processes.
+
+    Each worker owns an SS7Core without storage and processes whole shards,
+    sending results back over a queue in batches of contiguous requests as
+    they finish; the parent merges their results, counters and latency
+    histograms, checkpoints each batch and is the only process writing to
+    the database. A crash therefore repeats at most one batch per worker.
+
+    The pool replaces a worker that dies (e.g. killed for memory), but not
+    its shard: the rest of a shard whose worker is gone is run again, up to
+    max_retries times before the campaign fails.
+    """
+
+    def __init__(self, spec: CampaignSpec, workers: Optional[int] = None, shard_size: int = 500,
+                 api_key: Optional[str] = None, db_path: Optional[str] = "ss7_data.db",
+                 store: Optional[TransactionStore] = None, metrics: Optional[Metrics] = None,
+                 checkpoint: Optional[Checkpoint] = None, batch_size: int = 100, flush_interval: float = 1.0,
+                 max_retries: int = 2, stall_timeout: float = 30.0):
+        """
+        Initialize campaign runner.
+
+        Args:
+            spec: Workload to run
+            workers: Worker processes (default: CPU count)
+            shard_size: Requests handed to a worker at a time
+            api_key: API key for the workers' cores
+            db_path: Database written by the runner's own store, None to not store
+            store: Existing TransactionStore to write to instead of opening db_path
+            metrics: Metrics receiving the workers' latency samples
+            checkpoint: Checkpoint of an interrupted campaign to resume; by
+                default a new campaign is registered in the store
+            batch_size: Requests per result batch sent back by workers
+            flush_interval: Longest time a worker holds back a partial batch
+            max_retries: Times the rest of a shard is rerun after its worker died
+            stall_timeout: Seconds without results after which shards that no
+                worker announced are taken as lost, e.g. with a worker that
+                died right after taking them
+        """
+        self.spec = spec
+        self.checkpoint = checkpoint
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.shard_size = max(1, int(shard_size))
+        self.api_key = api_key
+        self.db_path = db_path
+        self.store = store
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.stall_timeout = stall_timeout
+        self.logger = logging.getLogger(__name__)
+
+    def run(self, progress: Optional[Callable[[dict], None]] = None) -> dict:
+        """
+        Run every shard and return the campaign summary.
+
+        Args:
+            progress: Called with the running summary after each result batch
+        """
+        store = self.store
+        own_store = store is None and self.db_path is not None
+        if own_store:
+            store = TransactionStore(self.db_path)
+        try:
+            checkpoint = self.checkpoint
+            if checkpoint is None and store is not None:
+                checkpoint = self.checkpoint = Checkpoint.create(store, self.spec, self.shard_size)
+            summary = self.new_summary(self.spec, checkpoint)
+            campaign_id = checkpoint.campaign_id if checkpoint else None
+            shards = checkpoint.pending() if checkpoint else list(self.spec.shards(self.shard_size))
+            remaining = sum(stop - start for start, stop in shards)
+            started = time.monotonic()
+            self.logger.info(f"Starting campaign {campaign_id} with {remaining} "
+                             f"of {self.spec.count} requests left on {self.workers} workers")
+            context = get_context()
+            # a manager queue rather than context.Queue(): a worker killed
+            # while writing to the latter can leave its lock held for good
+            with context.Manager() as manager:
+                results = manager.Queue()
+                with context.Pool(self.workers, initializer=_init_worker, initargs=(self.api_key, results)) as pool:
+                    # shards submitted but not announced, start -> stop; shards
+                    # being run, pid -> (next index, stop); reruns per shard stop
+                    queued: Dict[int, int] = {}
+                    running: Dict[int, Tuple[int, int]] = {}
+                    retries: Dict[int, int] = {}
+                    outcomes = []
+
+                    def submit(start: int, stop: int) -> None:
+                        queued[start] = stop
+                        task = (self.spec, start, stop, campaign_id, self.batch_size, self.flush_interval)
+                        outcomes.append(pool.apply_async(_run_shard, (task,)))
+
+                    def rerun(start: int, stop: int, reason: str) -> None:
+                        retries[stop] = retries.get(stop, 0) + 1
+                        if retries[stop] > self.max_retries:
+                            raise RuntimeError(f"Requests {start}-{stop} lost {retries[stop]} times ({reason})")
+                        self.logger.warning(f"Running requests {start}-{stop} again: {reason}")
+                        submit(start, stop)
+
+                    for start, stop in shards:
+                        submit(start, stop)
+                    heard = time.monotonic()
+                    while remaining > 0:
+                        # put() returns once the manager holds the batch, so an
+                        # empty get() below means workers gone before this
+                        # snapshot have nothing more coming
+                        alive = {process.pid for process in multiprocessing.active_children()}
+                        try:
+                            pid, start, stop, items, histograms, counts = results.get(timeout=0.5)
+                        except queue.Empty:
+                            for outcome in outcomes:
+                                if outcome.ready() and not outcome.successful():
+                                    outcome.get()
+                            for gone in [pid for pid in running if pid not in alive]:
+                                start, stop = running.pop(gone)
+                                rerun(start, stop, f"worker {gone} died")
+                            if not running and queued and time.monotonic() - heard > self.stall_timeout:
+                                lost, queued = list(queued.items()), {}
+                                for start, stop in lost:
+                                    rerun(start, stop, f"no worker took them in {self.stall_timeout}s")
+                                heard = time.monotonic()
+                            continue
+                        heard = time.monotonic()
+                        if start == stop:
+                            running[pid] = (start, queued.pop(start))
+                            continue
+                        shard_stop = running[pid][1]
+                        if stop < shard_stop:
+                            running[pid] = (stop, shard_stop)
+                        else:
+                            del running[pid]
+                        remaining -= stop - start
+                        if store is not None:
+                            store.submit_many(items)
+                        if checkpoint is not None:
+                            checkpoint.record([(start, stop)])
+                        self.metrics.merge(histograms)
+                        self._count(summary, counts, time.monotonic() - started)
+                        if progress:
+                            progress(summary)
+        finally:
+            if own_store:
+                store.close()
+            elif store is not None:
+                store.flush()
+        self.logger.info(f"Campaign finished: {summary}")
+        return summary
+
+    @classmethod
+    def new_summary(cls, spec: CampaignSpec, checkpoint: Optional[Checkpoint] = None) -> dict:
+        """
+        Empty campaign summary, or one counting the results stored before
+        the campaign was interrupted.
+        """
+        summary = {"total": spec.count, "completed": 0, "by_status": {}, "by_operation": {},
+                   "campaign_id": checkpoint.campaign_id if checkpoint else None}
+        if checkpoint is not None:
+            cls._count(summary, checkpoint.counts(), 0.0)
+        summary["resumed"] = summary["completed"]
+        return summary
+
+    @staticmethod
+    def _count(summary: dict, counts: Dict[Tuple[str, str], int], elapsed: float) -> None:
+        for (operation, status), count in counts.items():
+            summary["completed"] += count
+            summary["by_status"][status] = summary["by_status"].get(status, 0) + count
+            per_operation = summary["by_operation"].setdefault(operation, {})
+            per_operation[status] = per_operation.get(status, 0) + count
+        summary["elapsed_s"] = round(elapsed, 3)
+        done = summary["completed"] - summary.get("resumed", 0)
+        summary["rate_per_s"] = round(done / elapsed, 1) if elapsed > 0 else 0.0
@@ -1,6 +1,8 @@
 #app/config_manger.py
 import os
 import logging
+import tempfile
+import threading
 import yaml
 from typing import Optional
 
@@ -18,10 +20,15 @@ class ConfigManager:
         self.default_msisdn: str = "9876543210"
         self.default_gt: str = "1234567890"
         self.config = {}
+        self._lock = threading.RLock()
         self.load_config()
 
     def load_config(self) -> None:
         """Load configuration from YAML file or environment variables."""
+        with self._lock:
+            self._load_config()
+
+    def _load_config(self) -> None:
         try:
             # Check environment variables first
             self.api_key = os.getenv("SS7_API_KEY")
@@ -64,9 +71,25 @@ class ConfigManager:
         return self.config.get(key, default)
 
     def set_config(self, key: str, value) -> None:
-        self.config[key] = value
+        """Set a key and save the whole config; concurrent callers are serialized and readers never see a partial file."""
+        with self._lock:
+            config = dict(self.config)
+            config[key] = value
+            self.config = config
+            try:
+                self._write_atomic(config)
+            except Exception as e:
+                self.logger.error(f"Failed to save config: {e}")
+
+    def _write_atomic(self, config: dict) -> None:
+        directory = os.path.dirname(os.path.abspath(self.config_file))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".config-", suffix=".yml.tmp")
         try:
-            with open(self.config_file, 'w') as f:
-                yaml.safe_dump(self.config, f)
-        except Exception as e:
-            self.logger.error(f"Failed to save config: {e}")
+            with os.fdopen(fd, 'w') as f:
+                yaml.safe_dump(config, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
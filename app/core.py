@@ -1,19 +1,62 @@
 import logging
 import hashlib
-from utils.network.sctp_client import SCTPClient
-from utils.network.tcp_client import TCPClient
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+from utils.network.connection_pool import ConnectionPool
 from app.message_factory import MessageFactory
 from app.response_parser import ResponseParser
 from app.config_manager import ConfigManager
+from app.transaction_manager import TransactionManager
+from app.metrics import Metrics
+from utils.protocols import map_encoding
 from utils.validators import validate_imsi, validate_msisdn, validate_gt, validate_ssn, validate_ip, validate_port, validate_protocol
 
+
+def _collect(pending: Dict, ordered: bool) -> Iterator[Tuple[object, dict]]:
+    """
+    Yield finished (request, result) pairs from pending, which maps futures
+    to requests in submission order: the oldest one if ordered, otherwise
+    whichever complete first.
+    """
+    if ordered:
+        future = next(iter(pending))
+        request = pending.pop(future)
+        yield request, future.result()
+        return
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        yield pending.pop(future), future.result()
+
 class SS7Core:
-    def __init__(self, api_key: str = None):
+    """
+    Synchronous SS7 MAP client.
+
+    A single instance may be shared by many threads: connections are taken
+    from a locked pool, invoke IDs from a locked TransactionManager (threads
+    beyond its capacity wait for a free ID instead of failing) and results
+    go through the storage writer's queue.
+    """
+
+    def __init__(self, api_key: str = None, db_path: Optional[str] = "ss7_data.db"):
         self.logger = logging.getLogger(__name__)
         self.config = ConfigManager()
         self.api_key = api_key or self.config.api_key
+        ss7_config = self.config.get_config("ss7", {}) or {}
+        map_encoding.set_encoding(ss7_config.get("map_encoding", map_encoding.TBCD))
         self.message_factory = MessageFactory()
-        self.response_parser = ResponseParser()
+        self.response_parser = ResponseParser(db_path)
+        pool_config = self.config.get_config("pool", {}) or {}
+        self.connection_pool = ConnectionPool(
+            max_idle_per_key=int(pool_config.get("max_idle_per_key", 4)),
+            idle_timeout=float(pool_config.get("idle_timeout", 30.0))
+        )
+        self.transactions = TransactionManager()
+        self._slots = threading.BoundedSemaphore(self.transactions.capacity)
+        self._close_lock = threading.Lock()
+        self._closed = False
+        self.metrics = Metrics()
         self._validate_api_key()
 
     def _validate_api_key(self):
@@ -34,47 +77,160 @@ class SS7Core:
             self.logger.error("Invalid input parameters for SRI")
             return {"status": "error", "message": "Invalid input parameters"}
         
-        packet = self.message_factory.create_sri_message(imsi, msisdn, gt, ssn)
-        return self._send_packet(packet, "SRI", target_ip, target_port, {"imsi": imsi, "msisdn": msisdn, "gt": gt, "ssn": ssn, "target_ip": target_ip, "target_port": target_port, "protocol": protocol})
+        build = lambda invoke_id: self.message_factory.create_sri_message(imsi, msisdn, gt, ssn, invoke_id=invoke_id)
+        return self._send_packet(build, "SRI", target_ip, target_port, {"imsi": imsi, "msisdn": msisdn, "gt": gt, "ssn": ssn, "target_ip": target_ip, "target_port": target_port, "protocol": protocol})
 
     def send_ati(self, imsi: str, target_ip: str, target_port: int, ssn: int, gt: str, protocol: str) -> dict:
         if not all([validate_imsi(imsi), validate_ip(target_ip), validate_port(target_port), validate_ssn(ssn), validate_gt(gt), validate_protocol(protocol)]):
             self.logger.error("Invalid input parameters for ATI")
             return {"status": "error", "message": "Invalid input parameters"}
         
-        packet = self.message_factory.create_ati_message(imsi, gt, ssn)
-        return self._send_packet(packet, "ATI", target_ip, target_port, {"imsi": imsi, "gt": gt, "ssn": ssn, "target_ip": target_ip, "target_port": target_port, "protocol": protocol})
+        build = lambda invoke_id: self.message_factory.create_ati_message(imsi, gt, ssn, invoke_id=invoke_id)
+        return self._send_packet(build, "ATI", target_ip, target_port, {"imsi": imsi, "gt": gt, "ssn": ssn, "target_ip": target_ip, "target_port": target_port, "protocol": protocol})
 
     def send_ul(self, imsi: str, vlr_gt: str, target_ip: str, target_port: int, ssn: int, gt: str, protocol: str) -> dict:
         if not all([validate_imsi(imsi), validate_gt(vlr_gt), validate_ip(target_ip), validate_port(target_port), validate_ssn(ssn), validate_gt(gt), validate_protocol(protocol)]):
             self.logger.error("Invalid input parameters for UL")
             return {"status": "error", "message": "Invalid input parameters"}
         
-        packet = self.message_factory.create_ul_message(imsi, vlr_gt, gt, ssn)
-        return self._send_packet(packet, "UL", target_ip, target_port, {"imsi": imsi, "vlr_gt": vlr_gt, "gt": gt, "ssn": ssn, "target_ip": target_ip, "target_port": target_port, "protocol": protocol})
+        build = lambda invoke_id: self.message_factory.create_ul_message(imsi, vlr_gt, gt, ssn, invoke_id=invoke_id)
+        return self._send_packet(build, "UL", target_ip, target_port, {"imsi": imsi, "vlr_gt": vlr_gt, "gt": gt, "ssn": ssn, "target_ip": target_ip, "target_port": target_port, "protocol": protocol})
 
     def send_psi(self, imsi: str, target_ip: str, target_port: int, ssn: int, gt: str, protocol: str) -> dict:
         if not all([validate_imsi(imsi), validate_ip(target_ip), validate_port(target_port), validate_ssn(ssn), validate_gt(gt), validate_protocol(protocol)]):
             self.logger.error("Invalid input parameters for PSI")
             return {"status": "error", "message": "Invalid input parameters"}
         
-        packet = self.message_factory.create_psi_message(imsi, gt, ssn)
-        return self._send_packet(packet, "PSI", target_ip, target_port, {"imsi": imsi, "gt": gt, "ssn": ssn, "target_ip": target_ip, "target_port": target_port, "protocol": protocol})
+        build = lambda invoke_id: self.message_factory.create_psi_message(imsi, gt, ssn, invoke_id=invoke_id)
+        return self._send_packet(build, "PSI", target_ip, target_port, {"imsi": imsi, "gt": gt, "ssn": ssn, "target_ip": target_ip, "target_port": target_port, "protocol": protocol})
 
     
 
-    def get_history(self, limit: int = 10) -> list:
-        return self.response_parser.get_history(limit=limit)
+    def send_operation(self, operation: str, **params) -> dict:
+        """Dispatch to send_sri/send_ati/send_ul/send_psi by operation name (a "MAP_" prefix is accepted)."""
+        operation = operation.upper()
+        if operation.startswith("MAP_"):
+            operation = operation[4:]
+        sender = {"SRI": self.send_sri, "ATI": self.send_ati, "UL": self.send_ul, "PSI": self.send_psi}.get(operation)
+        if sender is None:
+            self.logger.error(f"Unknown operation: {operation}")
+            return {"status": "error", "message": f"Unknown operation: {operation}"}
+        return sender(**params)
+
+    def send_prepared(self, operation: str, fields: dict, target_ip: str, target_port: int, ssn: int, gt: str,
+                      protocol: str) -> dict:
+        """
+        Send an operation whose values are known to be valid, skipping the
+        checks of the send_* methods; for requests made by
+        batch.generate_requests, whose numbers are EncodedNumbers put on the
+        wire as they are, with target fields validated once per batch.
+
+        Args:
+            operation: "SRI", "ATI", "UL" or "PSI"
+            fields: imsi plus msisdn (SRI) or vlr_gt (UL)
+        """
+        factory = {"SRI": self.message_factory.create_sri_message, "ATI": self.message_factory.create_ati_message,
+                   "UL": self.message_factory.create_ul_message, "PSI": self.message_factory.create_psi_message}[operation]
+        build = lambda invoke_id: factory(gt=gt, ssn=ssn, invoke_id=invoke_id, **fields)
+        return self._send_packet(build, operation, target_ip, target_port, dict(fields, gt=gt, ssn=ssn, target_ip=target_ip, target_port=target_port, protocol=protocol))
+
+    def send_spec(self, request: dict) -> dict:
+        """Run one operation spec, a dict with "operation" plus the keyword arguments of its send_* method."""
+        params = dict(request)
+        operation = params.pop("operation", None)
+        if not operation:
+            return {"status": "error", "message": "Missing operation"}
+        try:
+            return self.send_operation(operation, **params)
+        except TypeError as e:
+            self.logger.error(f"Invalid {operation} request: {e}")
+            return {"status": "error", "message": f"Invalid request: {e}"}
+
+    def send_many(self, requests: Iterable, max_workers: int = 8, max_in_flight: Optional[int] = None,
+                  ordered: bool = False, send: Optional[Callable[[object], dict]] = None) -> Iterator[Tuple[object, dict]]:
+        """
+        Run operation specs on a bounded thread pool.
 
-    def get_filtered_history(self, operation: str = None, start_date: str = None, end_date: str = None, limit: int = 10) -> list:
-        return self.response_parser.get_filtered_history(operation, start_date, end_date, limit)
+        requests is consumed lazily: at most max_in_flight (default twice
+        max_workers) specs are submitted at a time, so arbitrarily long
+        iterables run in constant memory.
+
+        Args:
+            ordered: Yield results in input order; a slow request then
+                holds back the ones behind it
+            send: Callable run for each request instead of send_spec
+
+        Yields:
+            (request, result) pairs in completion order, or input order
+        """
+        max_in_flight = max(max_workers, max_in_flight or 2 * max_workers)
+        send = send or self.send_spec
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ss7-send")
+        pending: Dict = {}
+        try:
+            for request in requests:
+                pending[executor.submit(send, request)] = request
+                if len(pending) >= max_in_flight:
+                    yield from _collect(pending, ordered)
+            while pending:
+                yield from _collect(pending, ordered)
+        finally:
+            # not shutdown(cancel_futures=True), which needs Python 3.9
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def get_history(self, limit: int = 10, before=None) -> list:
+        return self.response_parser.get_history(limit=limit, before=before)
+
+    def get_filtered_history(self, operation: str = None, start_date: str = None, end_date: str = None, limit: int = 10, imsi: str = None, before=None) -> list:
+        """Return stored transactions newest first; pass the (timestamp, id) of the last row as before for the next page."""
+        return self.response_parser.get_filtered_history(operation, start_date, end_date, limit, imsi=imsi, before=before)
     
-    def _send_packet(self, packet, operation, target_ip, target_port, params):
+    def get_stats(self) -> dict:
+        """Per-stage latency percentiles per operation and target, see Metrics.snapshot."""
+        return self.metrics.snapshot()
+
+    def dump_stats(self, path: str = None) -> dict:
+        """Write get_stats() as JSON to path (default: metrics.dump_path from config)."""
+        path = path or (self.config.get_config("metrics", {}) or {}).get("dump_path", "logs/stats.json")
+        return self.metrics.dump(path)
+
+    def close(self) -> None:
+        """Close all pooled associations and flush pending storage writes."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self.connection_pool.close_all()
+        self.response_parser.close()
+
+    def _send_packet(self, build, operation, target_ip, target_port, params):
+        started = time.perf_counter()
+        timings = {}
+        self._slots.acquire()
+        try:
+            txn = self.transactions.begin_waiting(operation, params)
+        except BaseException:
+            self._slots.release()
+            raise
+        context = dict(params, operation=operation)
+        answered = False
         try:
-            client = SCTPClient(target_ip, target_port) if params["protocol"] == "SCTP" else TCPClient(target_ip, target_port)
+            packet = build(txn.invoke_id)
+            context["request"] = packet
+            built = time.perf_counter()
+            timings["build"] = built - started
             self.logger.info(f"Sending {operation} packet to {target_ip}:{target_port} with protocol {params['protocol']}")
-            response = client.send_packet(packet)
-            result = self.response_parser.parse_response(response)
+            response = self.connection_pool.send_packet(target_ip, target_port, params["protocol"], packet, timings=timings)
+            received = time.perf_counter()
+            context["rtt_ms"] = (received - built) * 1000.0
+            context["response"] = response
+            answered = bool(response)
+            result = self.response_parser.parse_response(response, store=False)
+            timings["parse"] = time.perf_counter() - received
+            if result.get("invoke_id", txn.invoke_id) != txn.invoke_id:
+                self.logger.warning(f"{operation} response invoke ID {result.get('invoke_id')} does not match request invoke ID {txn.invoke_id}")
         except Exception as e:
             self.logger.error(f"Failed to send {operation} packet: {str(e)}")
             result = {
@@ -84,5 +240,16 @@ class SS7Core:
                 "params": params,  # Include params for storage
                 "raw_response": ""
             }
-        self.response_parser._store_response(result)
-        return result
\ No newline at end of file
+        finally:
+            if answered:
+                self.transactions.finish(txn.invoke_id)
+            else:
+                self.transactions.expire(txn.invoke_id)
+            self._slots.release()
+        stored = time.perf_counter()
+        self.response_parser._store_response(result, context)
+        finished = time.perf_counter()
+        timings["store"] = finished - stored
+        timings["total"] = finished - started
+        self.metrics.record_stages(operation, Metrics.target_key(target_ip, target_port, params["protocol"]), timings)
+        return result
@@ -0,0 +1,277 @@
+#app/corpus.py
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from app.fuzzer import Fuzzer
+
+Target = Tuple[str, int, str]
+Fingerprint = tuple
+
+SCCP_HEADER_LEN = 11
+_VARIABLE_PARTS = re.compile(r"0x[0-9a-fA-F]+|\d+")
+
+
+def error_class(message: Optional[str]) -> Optional[str]:
+    """
+    Reduce an error message to its class by dropping the detail after the
+    first colon and any numbers, e.g. "Unknown TCAP tag: 0x30" -> "Unknown TCAP tag".
+    """
+    if not message:
+        return None
+    return _VARIABLE_PARTS.sub("#", str(message).split(":", 1)[0]).strip()
+
+
+def fingerprint(result: dict, timing: bool = True, coverage: bool = True) -> Fingerprint:
+    """
+    Signature of the target's behaviour for one input.
+
+    Args:
+        result: Fuzzer.execute result (a ResponseParser result plus outcome
+            and elapsed_ms)
+        timing: Include the round trip time bucket
+        coverage: Include the coverage id
+
+    Returns:
+        (outcome, status, TCAP tag, opcode, error class, parameter shape,
+        length bucket, timing bucket, coverage id); the shape lists the
+        decoded MAP parameters with their lengths (e.g. "imsi:15,msisdn:10"),
+        buckets are powers of two of the response size in bytes and of the
+        round trip time in 0.1 ms. The coverage id is set by Fuzzer.run for
+        inputs that reached new edges of an instrumented target, so each of
+        them counts as new.
+    """
+    raw = bytes.fromhex(result["raw_response"]) if result.get("raw_response") else b""
+    tcap_tag = None
+    if len(raw) >= SCCP_HEADER_LEN:
+        offset = SCCP_HEADER_LEN + int.from_bytes(raw[5:7], "big") + int.from_bytes(raw[7:9], "big")
+        if offset < len(raw):
+            tcap_tag = raw[offset]
+    elapsed = result.get("elapsed_ms")
+    params = result.get("params")
+    return (
+        result.get("outcome", "response"),
+        result.get("status"),
+        tcap_tag,
+        result.get("opcode"),
+        error_class(result.get("message")) if result.get("status") != "success" else None,
+        ",".join(f"{name}:{len(value)}" for name, value in sorted(params.items())) if params else None,
+        len(raw).bit_length(),
+        int(elapsed * 10).bit_length() if timing and elapsed is not None else None,
+        result.get("coverage_id") if coverage else None
+    )
+
+
+def fingerprint_key(value: Fingerprint) -> str:
+    return hashlib.blake2b(json.dumps(list(value)).encode(), digest_size=8).hexdigest()
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """
+    Replace path with data through a temporary file, so a crash never
+    leaves a partly written file behind.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".corpus-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class CorpusEntry:
+    __slots__ = ("key", "data", "fingerprint", "hits", "added_at")
+
+    def __init__(self, data: bytes, fingerprint: Fingerprint, hits: int = 1, added_at: Optional[float] = None):
+        self.key = fingerprint_key(fingerprint)
+        self.data = data
+        self.fingerprint = fingerprint
+        self.hits = hits
+        self.added_at = time.time() if added_at is None else added_at
+
+    def to_dict(self) -> dict:
+        return {"key": self.key, "fingerprint": list(self.fingerprint), "size": len(self.data),
+                "hits": self.hits, "added_at": self.added_at}
+
+
+class Corpus:
+    """
+    Inputs that produced distinct target behaviour, one per fingerprint.
+
+    Fingerprints are kept in a hash index, so checking an input costs one
+    lookup; only inputs with a new fingerprint are stored. With a path the
+    corpus lives in a directory (inputs/<key>.bin plus an index.jsonl line
+    per entry) and is loaded again on the next run.
+    """
+
+    INDEX = "index.jsonl"
+    INPUTS = "inputs"
+
+    def __init__(self, path: Optional[str] = None, timing: bool = True):
+        """
+        Initialize corpus.
+
+        Args:
+            path: Corpus directory, created if missing; None keeps it in memory
+            timing: Include the round trip time bucket in fingerprints
+        """
+        self.path = path
+        self.timing = timing
+        self.entries: Dict[Fingerprint, CorpusEntry] = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+        if path:
+            os.makedirs(os.path.join(path, self.INPUTS), exist_ok=True)
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, value: Fingerprint) -> bool:
+        return value in self.entries
+
+    def _input_path(self, key: str) -> str:
+        return os.path.join(self.path, self.INPUTS, f"{key}.bin")
+
+    def _load(self) -> None:
+        index = os.path.join(self.path, self.INDEX)
+        if not os.path.exists(index):
+            return
+        with open(index) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    with open(self._input_path(record["key"]), "rb") as data:
+                        entry = CorpusEntry(data.read(), tuple(record["fingerprint"]), record.get("hits", 1),
+                                            record.get("added_at"))
+                except (OSError, ValueError, KeyError) as e:
+                    self.logger.warning(f"Skipping corpus entry {line.strip()[:80]}: {e}")
+                    continue
+                self.entries[entry.fingerprint] = entry
+        self.logger.info(f"Loaded {len(self.entries)} corpus entries from {self.path}")
+
+    def add(self, packet, result: dict) -> bool:
+        """
+        Record the outcome of one input.
+
+        Args:
+            packet: The input (bytes, bytearray or memoryview; copied if kept)
+            result: Its Fuzzer.execute result
+
+        Returns:
+            True if the fingerprint was new and the input was kept
+        """
+        value = fingerprint(result, self.timing)
+        with self._lock:
+            entry = self.entries.get(value)
+            if entry is not None:
+                entry.hits += 1
+                return False
+            entry = CorpusEntry(bytes(packet), value)
+            self.entries[value] = entry
+            if self.path:
+                write_atomic(self._input_path(entry.key), entry.data)
+                with open(os.path.join(self.path, self.INDEX), "a") as f:
+                    f.write(json.dumps(entry.to_dict()) + "\n")
+        return True
+
+    def inputs(self) -> List[bytes]:
+        """
+        Stored inputs, oldest first.
+        """
+        with self._lock:
+            return [entry.data for entry in sorted(self.entries.values(), key=lambda entry: entry.added_at)]
+
+    def minimize(self, target: Target, workers: int = 4, timeout: float = 0.5,
+                 client_factory: Optional[Callable] = None) -> dict:
+        """
+        Replay every input against target and keep the smallest input for
+        each fingerprint seen in the replay. Inputs kept for new coverage
+        are not replayed and stay as they are.
+
+        Inputs are split across workers threads, each with its own
+        association. An input whose fingerprint changed is filed under the
+        new one, and inputs whose fingerprint another, smaller input
+        already covers are dropped.
+
+        Args:
+            target: (ip, port, protocol)
+            workers: Parallel associations
+            timeout: Seconds to wait for each response
+            client_factory: Passed to Fuzzer
+
+        Returns:
+            {"before", "after", "changed", "elapsed_s"}
+        """
+        started = time.perf_counter()
+        with self._lock:
+            entries = sorted(self.entries.values(), key=lambda entry: (len(entry.data), entry.added_at))
+        replay_entries = [entry for entry in entries if entry.fingerprint[-1] is None]
+        replayed: Dict[str, Fingerprint] = {}
+
+        def replay(share: List[CorpusEntry]) -> None:
+            fuzzer = Fuzzer(None, *target, timeout=timeout, client_factory=client_factory)
+            try:
+                for entry in share:
+                    replayed[entry.key] = fingerprint(fuzzer.execute(entry.data), self.timing)
+            finally:
+                fuzzer.close()
+
+        workers = max(1, min(workers, len(replay_entries)))
+        threads = [threading.Thread(target=replay, args=(replay_entries[i::workers],), name=f"corpus-min-{i}",
+                                    daemon=True) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        kept: Dict[Fingerprint, CorpusEntry] = {}
+        changed = 0
+        for entry in entries:
+            if entry.fingerprint[-1] is not None:
+                # kept for new coverage, which a replay cannot tell
+                kept[entry.fingerprint] = entry
+                continue
+            value = replayed.get(entry.key, entry.fingerprint)
+            if value in kept:
+                continue
+            if value != entry.fingerprint:
+                changed += 1
+                entry = CorpusEntry(entry.data, value, entry.hits, entry.added_at)
+            kept[value] = entry
+        with self._lock:
+            previous = self.entries
+            self.entries = kept
+            if self.path:
+                self._rewrite(previous)
+        summary = {"before": len(entries), "after": len(kept), "changed": changed,
+                   "elapsed_s": round(time.perf_counter() - started, 3)}
+        self.logger.info(f"Corpus minimized: {summary}")
+        return summary
+
+    def _rewrite(self, previous: Dict[Fingerprint, CorpusEntry]) -> None:
+        stored = {entry.key: entry for entry in previous.values()}
+        keys = {entry.key for entry in self.entries.values()}
+        for entry in self.entries.values():
+            if stored.get(entry.key) is not entry:
+                write_atomic(self._input_path(entry.key), entry.data)
+        index = "".join(json.dumps(entry.to_dict()) + "\n"
+                        for entry in sorted(self.entries.values(), key=lambda entry: entry.added_at))
+        write_atomic(os.path.join(self.path, self.INDEX), index.encode())
+        for entry in previous.values():
+            if entry.key not in keys:
+                try:
+                    os.unlink(self._input_path(entry.key))
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,146 @@
+#app/coverage.py
+import hashlib
+import logging
+import select
+import socket
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+# Coverage reports of an instrumented target (tests/mock_ss7_server.py
+# --coverage-to): one UDP datagram per request, holding the first bytes of
+# the request's BLAKE2b digest followed by the zlib-compressed edge bitmap.
+MAP_BITS = 1 << 16
+MAP_BYTES = MAP_BITS // 8
+DIGEST_SIZE = 8
+
+
+def request_digest(data) -> bytes:
+    return hashlib.blake2b(bytes(data), digest_size=DIGEST_SIZE).digest()
+
+
+def pack_report(digest: bytes, bitmap: bytes) -> bytes:
+    """
+    Build the coverage report datagram for one request.
+
+    Args:
+        digest: request_digest() of the request as received
+        bitmap: MAP_BYTES edge bitmap recorded while handling it
+    """
+    return digest + zlib.compress(bitmap, 1)
+
+
+class CoverageMap:
+    """
+    Union of all edge bitmaps seen, kept as one int so that checking a
+    report for new edges is a couple of big-int operations.
+    """
+
+    def __init__(self):
+        self.bits = 0
+        self.edges = 0
+
+    def update(self, bitmap: Optional[bytes]) -> int:
+        """
+        Merge a bitmap.
+
+        Returns:
+            Number of edges not seen before
+        """
+        if not bitmap:
+            return 0
+        value = int.from_bytes(bitmap, "little")
+        new = value & ~self.bits
+        if not new:
+            return 0
+        self.bits |= value
+        count = bin(new).count("1")
+        self.edges += count
+        return count
+
+
+class CoverageChannel:
+    """
+    Side channel delivering per-request coverage bitmaps to the fuzzer.
+
+    Reports arrive as UDP datagrams on address, or through put() from an
+    in-process target (host=None opens no socket). get() matches them to
+    requests by digest, so reports for requests the fuzzer no longer waits
+    for are simply dropped.
+    """
+
+    def __init__(self, host: Optional[str] = "127.0.0.1", port: int = 0, wait: float = 0.02,
+                 max_pending: int = 1024):
+        """
+        Initialize channel.
+
+        Args:
+            host: Address to receive reports on, None for in-process only
+            port: UDP port (0: any free port, see address)
+            wait: Seconds get() waits for a report that has not arrived
+            max_pending: Most unmatched reports kept
+        """
+        self.wait = wait
+        self.max_pending = max_pending
+        self.pending: Dict[bytes, bytes] = {}
+        self.received = 0
+        self.missed = 0
+        self.sock = None
+        self.logger = logging.getLogger(__name__)
+        if host is not None:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            self.sock.bind((host, port))
+            self.sock.setblocking(False)
+            self.logger.info(f"Receiving coverage reports on {self.address[0]}:{self.address[1]}")
+
+    @property
+    def address(self) -> Optional[Tuple[str, int]]:
+        return self.sock.getsockname() if self.sock is not None else None
+
+    def put(self, digest: bytes, bitmap: bytes) -> None:
+        if len(self.pending) >= self.max_pending:
+            del self.pending[next(iter(self.pending))]
+        self.pending[digest] = bitmap
+        self.received += 1
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                report = self.sock.recv(65535)
+            except BlockingIOError:
+                return
+            try:
+                self.put(report[:DIGEST_SIZE], zlib.decompress(report[DIGEST_SIZE:]))
+            except zlib.error as e:
+                self.logger.warning(f"Dropping malformed coverage report: {e}")
+
+    def get(self, packet) -> Optional[bytes]:
+        """
+        Bitmap reported for packet, waiting up to wait seconds for it.
+
+        Returns:
+            MAP_BYTES bitmap, or None if no report arrived
+        """
+        digest = request_digest(packet)
+        bitmap = self.pending.pop(digest, None)
+        if bitmap is not None or self.sock is None:
+            if bitmap is None:
+                self.missed += 1
+            return bitmap
+        deadline = time.monotonic() + self.wait
+        while True:
+            self._drain()
+            bitmap = self.pending.pop(digest, None)
+            remaining = deadline - time.monotonic()
+            if bitmap is not None or remaining <= 0:
+                break
+            select.select([self.sock], [], [], remaining)
+        if bitmap is None:
+            self.missed += 1
+        return bitmap
+
+    def close(self) -> None:
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
@@ -0,0 +1,223 @@
+#app/daemon.py
+import json
+import logging
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from typing import Optional
+
+# Kept free of heavy imports: main.py loads this module before deciding
+# whether a command can be forwarded to a running daemon.
+
+
+class DaemonError(RuntimeError):
+    """Raised by DaemonClient when the daemon rejects or fails a request."""
+
+
+def default_socket_path() -> str:
+    """
+    Socket path from SS7_DAEMON_SOCKET, or a per-user path in the temp directory.
+    """
+    path = os.getenv("SS7_DAEMON_SOCKET")
+    if path:
+        return path
+    uid = getattr(os, "getuid", lambda: 0)()
+    return os.path.join(tempfile.gettempdir(), f"ss7-tool-{uid}.sock")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                response = {"ok": True, "result": self.server.daemon.handle(request)}
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class SS7Daemon:
+    """
+    Long-running process serving SS7Core over a Unix domain socket.
+
+    The core, its connection pool and storage writer stay warm between
+    requests, so one-shot CLI calls forwarded here skip interpreter-level
+    setup entirely. The protocol is one JSON object per line each way:
+    {"command": ..., "api_key": ..., **arguments} answered with
+    {"ok": true, "result": ...} or {"ok": false, "error": ...}. Every
+    command, ping included, must carry the core's API key.
+    """
+
+    def __init__(self, core, socket_path: Optional[str] = None):
+        self.core = core
+        self.socket_path = socket_path or default_socket_path()
+        self.started = time.monotonic()
+        self.server: Optional[_Server] = None
+        self.logger = logging.getLogger(__name__)
+
+    def start(self) -> None:
+        """
+        Bind the socket (owner-only permissions), replacing a stale one.
+
+        Raises:
+            RuntimeError: If another daemon is already serving socket_path
+        """
+        if os.path.exists(self.socket_path):
+            if DaemonClient(self.socket_path, timeout=1.0).available():
+                raise RuntimeError(f"A daemon is already running on {self.socket_path}")
+            os.unlink(self.socket_path)
+        # restrict the socket before listening on it; not through os.umask,
+        # which would apply to files created by other threads meanwhile
+        self.server = _Server(self.socket_path, _Handler, bind_and_activate=False)
+        try:
+            self.server.server_bind()
+            os.chmod(self.socket_path, 0o600)
+            self.server.server_activate()
+        except BaseException:
+            self.server.server_close()
+            self.server = None
+            raise
+        self.server.daemon = self
+        self.logger.info(f"SS7 daemon listening on {self.socket_path}")
+
+    def serve_forever(self) -> None:
+        if self.server is None:
+            self.start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        """
+        Stop serve_forever() from another thread.
+        """
+        if self.server is not None:
+            self.server.shutdown()
+
+    def close(self) -> None:
+        if self.server is not None:
+            self.server.server_close()
+            self.server = None
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+            self.logger.info("SS7 daemon stopped")
+
+    def handle(self, request: dict):
+        """
+        Execute one decoded request and return its result.
+        """
+        api_key = request.get("api_key")
+        if not api_key or api_key != self.core.api_key:
+            raise PermissionError("Invalid API key")
+        command = request.get("command")
+        if command == "ping":
+            return {"pid": os.getpid(), "uptime_s": round(time.monotonic() - self.started, 3)}
+        if command == "send":
+            return self.core.send_spec(request.get("spec") or {})
+        if command == "history":
+            before = request.get("before")
+            return self.core.get_filtered_history(
+                operation=request.get("operation"),
+                start_date=request.get("start_date"),
+                end_date=request.get("end_date"),
+                limit=int(request.get("limit") or 10),
+                imsi=request.get("imsi"),
+                before=tuple(before) if before else None
+            )
+        if command == "stats":
+            return self.core.get_stats()
+        if command == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"pid": os.getpid()}
+        raise ValueError(f"Unknown command: {command}")
+
+
+class DaemonClient:
+    """
+    Client for SS7Daemon keeping one connection open for all its calls.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, timeout: float = 30.0, api_key: Optional[str] = None):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+        self.api_key = api_key
+        self.sock: Optional[socket.socket] = None
+        self._reader = None
+
+    def available(self) -> bool:
+        """
+        True if a daemon answers on socket_path, even if it rejects api_key.
+        """
+        if not os.path.exists(self.socket_path):
+            return False
+        try:
+            self.call("ping")
+            return True
+        except DaemonError:
+            return True
+        except (OSError, ValueError):
+            self.close()
+            return False
+
+    def call(self, command: str, **params):
+        """
+        Send a command and return its result.
+
+        Raises:
+            OSError: If the daemon cannot be reached
+            DaemonError: If the daemon reports an error
+        """
+        if self.sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self.sock = sock
+            self._reader = sock.makefile("rb")
+        request = dict(params, command=command)
+        if self.api_key is not None:
+            request["api_key"] = self.api_key
+        try:
+            self.sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            line = self._reader.readline()
+        except OSError:
+            self.close()
+            raise
+        if not line:
+            self.close()
+            raise ConnectionResetError("Daemon closed the connection")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise DaemonError(response.get("error", "Unknown daemon error"))
+        return response.get("result")
+
+    def close(self) -> None:
+        if self.sock is not None:
+            try:
+                self._reader.close()
+                self.sock.close()
+            finally:
+                self.sock = None
+                self._reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,412 @@
+#app/distributed.py
+import base64
+import json
+import logging
+import socket
+import socketserver
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+from app.campaign import CampaignRunner, CampaignSpec, Checkpoint, RowCollector, run_batches
+from app.metrics import LatencyHistogram, Metrics
+from app.storage import TransactionStore
+
+# Wire protocol: one JSON object per line in both directions, every worker
+# message answered by exactly one coordinator message.
+#
+#   worker -> {"type": "hello", "worker": name, "api_key": key}
+#          <- {"type": "welcome", "spec": {...}, "campaign_id": id, "batch_size": n, "flush_interval": s}
+#   worker -> {"type": "lease"}
+#          <- {"type": "lease", "id": n, "start": i, "stop": j} | {"type": "wait", "delay": s} | {"type": "done"}
+#   worker -> {"type": "results", "lease": n, "start": i, "stop": j, "data": encode_batch(...)}
+#          <- {"type": "ack", "ok": bool}   ok is False once the lease was lost
+#
+# Result batches cover contiguous index ranges of a lease in order. A lease
+# that times out or whose worker disconnects goes back to the queue from the
+# first index not yet acknowledged, so no finished request is run twice.
+
+
+def encode_batch(items: List[tuple], histograms: Dict[Tuple[str, str, str], LatencyHistogram],
+                 counts: Dict[Tuple[str, str], int]) -> str:
+    """
+    Pack RowCollector items, drained histograms and status counts into a
+    zlib-compressed, base64-encoded JSON document.
+    """
+    payload = {
+        "rows": [[list(row), request.hex() if request else None, response.hex() if response else None]
+                 for row, request, response in items],
+        "histograms": [[*key, histogram.to_dict()] for key, histogram in histograms.items()],
+        "counts": [[operation, status, count] for (operation, status), count in counts.items()],
+    }
+    data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.b64encode(zlib.compress(data)).decode("ascii")
+
+
+def decode_batch(data: str) -> Tuple[List[tuple], Dict[Tuple[str, str, str], LatencyHistogram], Dict[Tuple[str, str], int]]:
+    """
+    Inverse of encode_batch.
+    """
+    payload = json.loads(zlib.decompress(base64.b64decode(data)))
+    items = [
+        (tuple(row), bytes.fromhex(request) if request else None, bytes.fromhex(response) if response else None)
+        for row, request, response in payload["rows"]
+    ]
+    histograms = {(op, target, stage): LatencyHistogram.from_dict(histogram)
+                  for op, target, stage, histogram in payload["histograms"]}
+    counts = {(operation, status): count for operation, status, count in payload["counts"]}
+    return items, histograms, counts
+
+
+def parse_address(value: str, default_host: str = "127.0.0.1") -> Tuple[str, int]:
+    """
+    Parse "host:port" (or just "port") into (host, port).
+    """
+    host, _, port = value.rpartition(":")
+    return host or default_host, int(port)
+
+
+def _send(wfile, message: dict) -> None:
+    wfile.write(json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n")
+    wfile.flush()
+
+
+def _receive(rfile) -> Optional[dict]:
+    line = rfile.readline()
+    return json.loads(line) if line else None
+
+
+class _Lease:
+    __slots__ = ("id", "next", "stop", "worker", "deadline")
+
+    def __init__(self, lease_id: int, start: int, stop: int, worker: str, deadline: float):
+        self.id = lease_id
+        self.next = start
+        self.stop = stop
+        self.worker = worker
+        self.deadline = deadline
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.coordinator.serve_worker(self.rfile, self.wfile, f"{self.client_address[0]}:{self.client_address[1]}")
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class Coordinator:
+    """
+    Hand out a CampaignSpec as leases of work units to remote Workers.
+
+    The coordinator only tracks leases and is the single storage writer;
+    workers run the requests on their own SS7Core and stream results back.
+    """
+
+    def __init__(self, spec: CampaignSpec, host: str = "127.0.0.1", port: int = 0, lease_size: int = 500,
+                 lease_timeout: float = 30.0, batch_size: int = 100, flush_interval: float = 1.0,
+                 api_key: Optional[str] = None, db_path: Optional[str] = "ss7_data.db",
+                 store: Optional[TransactionStore] = None, metrics: Optional[Metrics] = None,
+                 checkpoint: Optional[Checkpoint] = None):
+        """
+        Initialize coordinator.
+
+        Args:
+            spec: Workload to run
+            host: Address to listen on
+            port: Port to listen on, 0 for any free port
+            lease_size: Requests per lease
+            lease_timeout: Seconds without a result batch after which a lease is reassigned
+            batch_size: Requests per result batch sent by workers
+            flush_interval: Longest time a worker holds back a partial batch
+            api_key: Key workers have to present, None to accept any
+            db_path: Database written by the coordinator's own store, None to not store
+            store: Existing TransactionStore to write to instead of opening db_path
+            metrics: Metrics receiving the workers' latency samples
+            checkpoint: Checkpoint of an interrupted campaign to resume; by
+                default a new campaign is registered in the store
+        """
+        self.spec = spec
+        self.checkpoint = checkpoint
+        self.lease_size = max(1, int(lease_size))
+        self.lease_timeout = float(lease_timeout)
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.api_key = api_key
+        self.db_path = db_path
+        self.store = store
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.summary: dict = {}
+        self._pending: deque = deque()
+        self._leases: Dict[int, _Lease] = {}
+        self._next_id = 1
+        self._remaining = spec.count
+        self._started = time.monotonic()
+        self._changed = threading.Condition()
+        self.server = _Server((host, port), _Handler, bind_and_activate=False)
+        self.server.coordinator = self
+        self._listening = False
+        self._own_store = False
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.server.server_address[:2]
+
+    def start(self) -> None:
+        """
+        Bind and start accepting workers in a background thread.
+        """
+        if self.store is None and self.db_path is not None:
+            self.store = TransactionStore(self.db_path)
+            self._own_store = True
+        if self.checkpoint is None and self.store is not None:
+            self.checkpoint = Checkpoint.create(self.store, self.spec, self.lease_size)
+        self.summary = CampaignRunner.new_summary(self.spec, self.checkpoint)
+        self.summary.update(workers=0, reassigned=0)
+        self._pending = deque(self.checkpoint.pending() if self.checkpoint else self.spec.shards(self.lease_size))
+        self._remaining = sum(stop - start for start, stop in self._pending)
+        self.server.server_bind()
+        self.server.server_activate()
+        self._listening = True
+        self._started = time.monotonic()
+        threading.Thread(target=self.server.serve_forever, name="ss7-coordinator", daemon=True).start()
+        self.logger.info(f"Coordinator listening on {self.address[0]}:{self.address[1]} for {self.spec.count} requests")
+
+    def run(self, progress: Optional[Callable[[dict], None]] = None) -> dict:
+        """
+        Serve leases until every request has been run and return the summary.
+
+        Args:
+            progress: Called with the running summary whenever results arrive
+        """
+        if not self._listening:
+            self.start()
+        try:
+            with self._changed:
+                while self._remaining:
+                    self._changed.wait(min(1.0, self.lease_timeout / 2))
+                    self._expire(time.monotonic())
+                    if progress:
+                        progress(self.summary)
+        finally:
+            # workers asking for another lease are told "done" until they disconnect
+            self.server.shutdown()
+            self.server.server_close()
+            if self._own_store:
+                self.store.close()
+            elif self.store is not None:
+                self.store.flush()
+        self.logger.info(f"Distributed campaign finished: {self.summary}")
+        return self.summary
+
+    def serve_worker(self, rfile, wfile, peer: str) -> None:
+        """
+        Run the protocol for one worker connection.
+        """
+        hello = _receive(rfile)
+        if not hello or hello.get("type") != "hello":
+            return
+        if self.api_key is not None and hello.get("api_key") != self.api_key:
+            self.logger.warning(f"Rejected worker {peer}: invalid API key")
+            _send(wfile, {"type": "error", "message": "Invalid API key"})
+            return
+        worker = f"{hello.get('worker') or 'worker'}@{peer}"
+        with self._changed:
+            self.summary["workers"] += 1
+        self.logger.info(f"Worker {worker} connected")
+        _send(wfile, {"type": "welcome", "spec": self.spec.to_dict(),
+                      "campaign_id": self.checkpoint.campaign_id if self.checkpoint else None,
+                      "batch_size": self.batch_size,
+                      "flush_interval": self.flush_interval})
+        try:
+            while True:
+                message = _receive(rfile)
+                if message is None:
+                    return
+                if message.get("type") == "lease":
+                    _send(wfile, self._acquire(worker))
+                elif message.get("type") == "results":
+                    _send(wfile, {"type": "ack", "ok": self._accept(message)})
+                else:
+                    _send(wfile, {"type": "error", "message": f"Unknown message: {message.get('type')}"})
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Worker {worker} failed: {e}")
+        finally:
+            self._release(worker)
+            self.logger.info(f"Worker {worker} disconnected")
+
+    def _acquire(self, worker: str) -> dict:
+        now = time.monotonic()
+        with self._changed:
+            self._expire(now)
+            if self._pending:
+                start, stop = self._pending.popleft()
+                lease = _Lease(self._next_id, start, stop, worker, now + self.lease_timeout)
+                self._leases[lease.id] = lease
+                self._next_id += 1
+                return {"type": "lease", "id": lease.id, "start": start, "stop": stop}
+            if not self._remaining:
+                return {"type": "done"}
+            # everything is leased out; poll again in case a lease expires
+            return {"type": "wait", "delay": min(1.0, self.lease_timeout / 4)}
+
+    def _expire(self, now: float) -> None:
+        """
+        Requeue the unfinished part of leases past their deadline. Caller holds _changed.
+        """
+        for lease in [lease for lease in self._leases.values() if lease.deadline < now]:
+            self.logger.warning(f"Lease {lease.id} [{lease.next}, {lease.stop}) of {lease.worker} timed out")
+            self._requeue(lease)
+
+    def _release(self, worker: str) -> None:
+        with self._changed:
+            for lease in [lease for lease in self._leases.values() if lease.worker == worker]:
+                self._requeue(lease)
+
+    def _requeue(self, lease: _Lease) -> None:
+        del self._leases[lease.id]
+        self._pending.appendleft((lease.next, lease.stop))
+        self.summary["reassigned"] += 1
+
+    def _accept(self, message: dict) -> bool:
+        start, stop = int(message["start"]), int(message["stop"])
+        with self._changed:
+            lease = self._leases.get(message.get("lease"))
+            if lease is None or start != lease.next or not start < stop <= lease.stop:
+                return False
+            # claim the range before storing so a late duplicate is refused
+            lease.next = stop
+            lease.deadline = time.monotonic() + self.lease_timeout
+            if lease.next == lease.stop:
+                del self._leases[lease.id]
+        items, histograms, counts = decode_batch(message["data"])
+        if self.store is not None:
+            self.store.submit_many(items)
+        if self.checkpoint is not None:
+            self.checkpoint.record([(start, stop)])
+        self.metrics.merge(histograms)
+        with self._changed:
+            CampaignRunner._count(self.summary, counts, time.monotonic() - self._started)
+            self._remaining -= stop - start
+            self._changed.notify_all()
+        return True
+
+
+class Worker:
+    """
+    Pull leases from a Coordinator and run them on a local SS7Core.
+    """
+
+    def __init__(self, host: str, port: int, api_key: Optional[str] = None, name: Optional[str] = None,
+                 core=None, timeout: float = 30.0, retries: int = 3):
+        """
+        Initialize worker.
+
+        Args:
+            host: Coordinator host
+            port: Coordinator port
+            api_key: Key for the coordinator and the local core
+            name: Worker name shown in the coordinator's log (default: hostname)
+            core: SS7Core to use, by default one without storage is created
+            timeout: Socket timeout in seconds
+            retries: Reconnects in a row, without progress in between,
+                after the coordinator did not answer within timeout
+        """
+        self.host = host
+        self.port = int(port)
+        self.api_key = api_key
+        self.name = name or socket.gethostname()
+        self.core = core
+        self.timeout = timeout
+        self.retries = retries
+        self.completed = 0
+        self.logger = logging.getLogger(__name__)
+
+    def run(self) -> int:
+        """
+        Run leases until the coordinator is done; returns the requests run.
+
+        A reply that does not come within timeout leaves the connection out
+        of step, so the worker reconnects; the coordinator reassigns the
+        unacknowledged rest of its lease once the lease times out.
+
+        Raises:
+            socket.timeout: After retries reconnects in a row without progress
+        """
+        own_core = self.core is None
+        timeouts = 0
+        try:
+            while True:
+                completed = self.completed
+                try:
+                    self._session()
+                    break
+                except socket.timeout as e:
+                    timeouts = timeouts + 1 if self.completed == completed else 1
+                    if timeouts > self.retries:
+                        raise
+                    self.logger.warning(f"Coordinator {self.host}:{self.port} did not answer ({e}), "
+                                        f"reconnecting ({timeouts}/{self.retries})")
+                except ConnectionError as e:
+                    # the coordinator exits once the campaign is complete; any
+                    # unacknowledged results are its to reassign
+                    self.logger.warning(f"Lost coordinator {self.host}:{self.port}: {e}")
+                    break
+        finally:
+            if own_core and self.core is not None:
+                self.core.close()
+        self.logger.info(f"Worker {self.name} finished after {self.completed} requests")
+        return self.completed
+
+    def _session(self) -> None:
+        """
+        Join the coordinator on a new connection and run leases until done.
+        """
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+            rfile, wfile = sock.makefile("rb"), sock.makefile("wb")
+            try:
+                welcome = self._call(rfile, wfile, {"type": "hello", "worker": self.name, "api_key": self.api_key})
+                if welcome.get("type") != "welcome":
+                    raise RuntimeError(f"Coordinator refused worker: {welcome.get('message')}")
+                spec = CampaignSpec.from_dict(welcome["spec"])
+                if self.core is None:
+                    from app.core import SS7Core
+                    self.core = SS7Core(self.api_key, db_path=None)
+                self.core.response_parser.store = RowCollector()
+                self.logger.info(f"Worker {self.name} joined {self.host}:{self.port}")
+                while True:
+                    reply = self._call(rfile, wfile, {"type": "lease"})
+                    if reply["type"] == "done":
+                        break
+                    if reply["type"] == "wait":
+                        time.sleep(reply["delay"])
+                        continue
+                    self._run_lease(rfile, wfile, spec, welcome.get("campaign_id"), reply,
+                                    welcome["batch_size"], welcome["flush_interval"])
+            finally:
+                rfile.close()
+                wfile.close()
+
+    @staticmethod
+    def _call(rfile, wfile, message: dict) -> dict:
+        _send(wfile, message)
+        reply = _receive(rfile)
+        if reply is None:
+            raise ConnectionResetError("Coordinator closed the connection")
+        return reply
+
+    def _run_lease(self, rfile, wfile, spec: CampaignSpec, campaign_id: Optional[int], lease: dict,
+                   batch_size: int, flush_interval: float) -> None:
+        batches = run_batches(self.core, spec, lease["start"], lease["stop"], campaign_id, batch_size, flush_interval)
+        for start, stop, items, histograms, counts in batches:
+            message = {"type": "results", "lease": lease["id"], "start": start, "stop": stop,
+                       "data": encode_batch(items, histograms, counts)}
+            if not self._call(rfile, wfile, message).get("ok"):
+                self.logger.warning(f"Lease {lease['id']} was reassigned, dropping it")
+                batches.close()
+                return
+            self.completed += stop - start
@@ -0,0 +1,501 @@
+#app/fuzzer.py
+import logging
+import random
+import select
+import socket
+import struct
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+from app.coverage import CoverageMap
+from app.message_factory import MessageFactory
+from app.response_parser import ResponseParser
+from utils.network.sctp_client import SCTPClient
+from utils.network.tcp_client import TCPClient
+from utils.protocols import map_encoding
+
+# Offsets in the SCCP UDT / TCAP Invoke / MAP requests built by
+# app/message_templates.py (and the scapy layers they mirror).
+SCCP_HEADER_LEN = 11
+SCCP_POINTER_OFFSETS = (2, 3, 4)
+SCCP_LENGTH_OFFSETS = (5, 7, 9)
+TCAP_INVOKE_TAG = 0x02
+TCAP_LENGTH_OFFSETS = (1, 3)
+TCAP_TAG_OFFSETS = (0, 2, 5)
+TCAP_OPCODE_OFFSET = 7
+MAP_OFFSET = 8
+
+INTERESTING_8 = (0x00, 0x01, 0x02, 0x7F, 0x80, 0x81, 0xFE, 0xFF)
+INTERESTING_16 = (0x0000, 0x0001, 0x00FF, 0x0100, 0x7FFF, 0x8000, 0xFFFE, 0xFFFF)
+TAGS = (0x00, 0x01, 0x02, 0x04, 0x05, 0x0C, 0x30, 0x31, 0x80, 0xA0, 0xA1, 0xA2, 0xA3, 0xA4, 0xBF, 0xFF)
+OPCODES = (0, 2, 3, 4, 22, 43, 44, 45, 46, 56, 59, 67, 70, 71, 255)
+
+# Mutation operators, in the order Mutator applies them by index
+OPERATORS = ("length", "length16", "pointer", "tag", "opcode", "nibble", "truncate", "splice", "bitflip", "byte")
+
+
+class PacketLayout:
+    """
+    Offsets of the structural fields of one seed packet.
+
+    Parsing is best effort: a seed that is not a well-formed request (e.g. a
+    corpus entry that was itself mutated) yields fewer fields, and operators
+    without a field to work on fall back to a random byte.
+    """
+
+    __slots__ = ("lengths", "lengths16", "pointers", "tags", "opcodes", "digits")
+
+    def __init__(self, packet: bytes):
+        size = len(packet)
+        lengths, tags, opcodes, digits = [], [], [], []
+        self.pointers = tuple(offset for offset in SCCP_POINTER_OFFSETS if offset < size)
+        self.lengths16 = tuple(offset for offset in SCCP_LENGTH_OFFSETS if offset + 2 <= size)
+        if size >= SCCP_HEADER_LEN:
+            called_len, calling_len, data_len = struct.unpack_from(">HHH", packet, 5)
+            calling = SCCP_HEADER_LEN + called_len
+            tcap = calling + calling_len
+            digits.extend(range(SCCP_HEADER_LEN, min(tcap, size)))
+            end = min(tcap + data_len, size)
+            if tcap + MAP_OFFSET + 2 <= end and packet[tcap] == TCAP_INVOKE_TAG:
+                lengths.extend(tcap + offset for offset in TCAP_LENGTH_OFFSETS)
+                tags.extend(tcap + offset for offset in TCAP_TAG_OFFSETS)
+                tags.append(tcap + MAP_OFFSET)
+                opcodes.append(tcap + TCAP_OPCODE_OFFSET)
+                lengths.append(tcap + MAP_OFFSET + 1)
+                offset = tcap + MAP_OFFSET + 2
+                if map_encoding.get_encoding() == map_encoding.TBCD:
+                    while offset < end:
+                        lengths.append(offset)
+                        stop = min(offset + 1 + packet[offset], end)
+                        digits.extend(range(offset + 1, stop))
+                        offset = stop
+                else:
+                    digits.extend(range(offset, end))
+        self.lengths = tuple(lengths)
+        self.tags = tuple(tags)
+        self.opcodes = tuple(opcodes)
+        self.digits = tuple(digits)
+
+
+class Mutator:
+    """
+    Structure-aware mutation engine over one reusable bytearray.
+
+    Each case copies a seed into the buffer and applies a stack of
+    operators in place: interesting or off-by-one values in the SCCP
+    pointers and 16-bit lengths, the TCAP/MAP length octets (including the
+    TBCD address lengths), tags and opcode, random TBCD nibbles, truncation,
+    splicing with another seed and plain bit/byte changes. No packet buffer
+    is allocated per case, and the same seed value always produces the same
+    sequence of cases.
+    """
+
+    def __init__(self, seeds: Sequence[bytes] = (), seed: int = 0, max_size: int = 4096, max_stack: int = 4):
+        """
+        Initialize mutator.
+
+        Args:
+            seeds: Initial seed packets
+            seed: Random seed
+            max_size: Largest seed (and case) in bytes
+            max_stack: Most operators applied to one case
+        """
+        self.seed = seed
+        self.max_size = max_size
+        self.max_stack = max_stack
+        self.buf = bytearray(max_size)
+        self.view = memoryview(self.buf)
+        self.size = 0
+        self.seeds: List[bytes] = []
+        self.layouts: List[PacketLayout] = []
+        self._seed_views: List[memoryview] = []
+        self.last_seed = -1
+        self.applied: List[int] = []
+        self._random = random.Random(seed).random
+        self._operators = (self._length, self._length16, self._pointer, self._tag, self._opcode,
+                           self._nibble, self._truncate, self._splice, self._bitflip, self._byte)
+        for packet in seeds:
+            self.add_seed(packet)
+
+    def add_seed(self, packet) -> int:
+        """
+        Add a seed packet.
+
+        Returns:
+            Index of the seed
+
+        Raises:
+            ValueError: If the packet is empty or larger than max_size
+        """
+        packet = bytes(packet)
+        if not 0 < len(packet) <= self.max_size:
+            raise ValueError(f"Seed size must be 1-{self.max_size} bytes, got {len(packet)}")
+        self.seeds.append(packet)
+        self.layouts.append(PacketLayout(packet))
+        self._seed_views.append(memoryview(packet))
+        return len(self.seeds) - 1
+
+    def replace_seeds(self, seeds: Sequence[bytes]) -> None:
+        """
+        Start over from a new seed set, keeping the random state.
+        """
+        self.seeds, self.layouts, self._seed_views = [], [], []
+        for packet in seeds:
+            self.add_seed(packet)
+
+    def mutate(self, seed_index: Optional[int] = None, operators: Optional[Sequence[int]] = None) -> memoryview:
+        """
+        Build the next case in place.
+
+        Args:
+            seed_index: Seed to start from (default: uniformly random)
+            operators: Indices into OPERATORS to apply in order (default: a
+                random stack of 1 to max_stack operators)
+
+        Returns:
+            memoryview of the case, valid until the next call; the seed and
+            operators used are left in last_seed and applied
+
+        Raises:
+            ValueError: If there are no seeds
+        """
+        if not self.seeds:
+            raise ValueError("Mutator has no seeds")
+        random_ = self._random
+        if seed_index is None:
+            seed_index = int(random_() * len(self.seeds))
+        packet = self.seeds[seed_index]
+        size = len(packet)
+        self.buf[:size] = packet
+        layout = self.layouts[seed_index]
+        applied = self.applied
+        applied.clear()
+        if operators is None:
+            count = len(self._operators)
+            for _ in range(1 + int(random_() * self.max_stack)):
+                operator = int(random_() * count)
+                size = self._operators[operator](layout, size)
+                applied.append(operator)
+        else:
+            for operator in operators:
+                size = self._operators[operator](layout, size)
+                applied.append(operator)
+        self.last_seed = seed_index
+        self.size = size
+        return self.view[:size]
+
+    def _pick(self, offsets: tuple, size: int, width: int = 1) -> int:
+        if not offsets:
+            return -1
+        offset = offsets[int(self._random() * len(offsets))]
+        return offset if offset + width <= size else -1
+
+    def _nudge(self, offset: int, values: tuple) -> None:
+        value = self._random()
+        if value < 0.5:
+            self.buf[offset] = values[int(value * 2 * len(values))]
+        else:
+            self.buf[offset] = (self.buf[offset] + (1 if value < 0.75 else -1)) & 0xFF
+
+    def _length(self, layout: PacketLayout, size: int) -> int:
+        offset = self._pick(layout.lengths, size)
+        if offset < 0:
+            return self._byte(layout, size)
+        self._nudge(offset, INTERESTING_8)
+        return size
+
+    def _length16(self, layout: PacketLayout, size: int) -> int:
+        offset = self._pick(layout.lengths16, size, 2)
+        if offset < 0:
+            return self._byte(layout, size)
+        value = self._random()
+        if value < 0.5:
+            value = INTERESTING_16[int(value * 2 * len(INTERESTING_16))]
+        else:
+            value = (((self.buf[offset] << 8) | self.buf[offset + 1]) + (1 if value < 0.75 else -1)) & 0xFFFF
+        self.buf[offset] = value >> 8
+        self.buf[offset + 1] = value & 0xFF
+        return size
+
+    def _pointer(self, layout: PacketLayout, size: int) -> int:
+        offset = self._pick(layout.pointers, size)
+        if offset < 0:
+            return self._byte(layout, size)
+        self._nudge(offset, INTERESTING_8)
+        return size
+
+    def _tag(self, layout: PacketLayout, size: int) -> int:
+        offset = self._pick(layout.tags, size)
+        if offset < 0:
+            return self._byte(layout, size)
+        self.buf[offset] = TAGS[int(self._random() * len(TAGS))]
+        return size
+
+    def _opcode(self, layout: PacketLayout, size: int) -> int:
+        offset = self._pick(layout.opcodes, size)
+        if offset < 0:
+            return self._byte(layout, size)
+        self.buf[offset] = OPCODES[int(self._random() * len(OPCODES))]
+        return size
+
+    def _nibble(self, layout: PacketLayout, size: int) -> int:
+        offset = self._pick(layout.digits, size)
+        if offset < 0:
+            return self._byte(layout, size)
+        value = self._random()
+        nibble = int(value * 32)
+        if nibble < 16:
+            self.buf[offset] = (self.buf[offset] & 0xF0) | nibble
+        else:
+            self.buf[offset] = (self.buf[offset] & 0x0F) | ((nibble - 16) << 4)
+        return size
+
+    def _truncate(self, layout: PacketLayout, size: int) -> int:
+        if size < 2:
+            return self._byte(layout, size)
+        return 1 + int(self._random() * (size - 1))
+
+    def _splice(self, layout: PacketLayout, size: int) -> int:
+        other = self._seed_views[int(self._random() * len(self._seed_views))]
+        end = len(other)
+        if min(size, end) < 2:
+            return self._byte(layout, size)
+        cut = 1 + int(self._random() * (min(size, end) - 1))
+        self.view[cut:end] = other[cut:end]
+        return end
+
+    def _bitflip(self, layout: PacketLayout, size: int) -> int:
+        self.buf[int(self._random() * size)] ^= 1 << int(self._random() * 8)
+        return size
+
+    def _byte(self, layout: PacketLayout, size: int) -> int:
+        self.buf[int(self._random() * size)] = int(self._random() * 256)
+        return size
+
+
+def seed_packets(imsi: str, msisdn: str, vlr_gt: str, gt: str, ssn: int,
+                 operations: Sequence[str] = ("SRI", "ATI", "UL", "PSI")) -> List[bytes]:
+    """
+    Well-formed requests from MessageFactory to start fuzzing from.
+    """
+    factory = MessageFactory()
+    builders = {
+        "SRI": lambda: factory.create_sri_message(imsi, msisdn, gt, ssn),
+        "ATI": lambda: factory.create_ati_message(imsi, gt, ssn),
+        "UL": lambda: factory.create_ul_message(imsi, vlr_gt, gt, ssn),
+        "PSI": lambda: factory.create_psi_message(imsi, gt, ssn),
+    }
+    return [builders[operation]() for operation in operations]
+
+
+def default_client_factory(target_ip: str, target_port: int, protocol: str, timeout: float):
+    """
+    Create a transport client that waits at most timeout for a response.
+    """
+    if protocol.upper() == "SCTP":
+        return SCTPClient(target_ip, target_port, timeout=timeout, retries=1, persistent=True)
+    return TCPClient(target_ip, target_port, timeout=timeout, persistent=True)
+
+
+class Fuzzer:
+    """
+    Send cases from a Mutator to one target over a single association.
+
+    The association is dropped and re-established after a timeout, a reset
+    or a close by the peer, since a mutated length field may have left the
+    stream framing on either side out of step.
+    """
+
+    def __init__(self, mutator: Optional[Mutator], target_ip: str, target_port: int, protocol: str = "SCTP",
+                 timeout: float = 0.5, parser: Optional[ResponseParser] = None,
+                 client_factory: Optional[Callable[[str, int, str, float], object]] = None, corpus=None,
+                 triage=None, scheduler=None, coverage=None):
+        """
+        Initialize fuzzer.
+
+        Args:
+            mutator: Source of test cases (None if only execute() is used)
+            target_ip: Target IP
+            target_port: Target port
+            protocol: "SCTP" or "TCP"
+            timeout: Seconds to wait for each response
+            parser: Parser for responses (default: one without storage)
+            client_factory: Callable creating a client for (ip, port, protocol, timeout)
+            corpus: app.corpus.Corpus; its inputs become seeds, and cases with
+                a new response fingerprint are added to both
+            triage: app.triage.Triage capturing the cases run() sees
+                anomalies for
+            scheduler: app.scheduler.PowerScheduler choosing the seed and
+                operators of each case in run() (default: uniformly random)
+            coverage: app.coverage.CoverageChannel of an instrumented target;
+                run() marks cases reaching new edges with a coverage id, so
+                the corpus keeps them and the scheduler rewards them
+        """
+        self.mutator = mutator
+        self.target_ip = target_ip
+        self.target_port = target_port
+        self.protocol = protocol.upper()
+        self.timeout = timeout
+        self.parser = parser or ResponseParser(db_path=None)
+        self.client_factory = client_factory or default_client_factory
+        self.client = None
+        self.executions = 0
+        self.outcomes: Dict[str, int] = {}
+        self.by_status: Dict[str, int] = {}
+        self.new_inputs = 0
+        self.corpus = corpus
+        self.triage = triage
+        self.scheduler = scheduler
+        self.coverage = coverage
+        self.coverage_map = CoverageMap() if coverage is not None else None
+        self.logger = logging.getLogger(__name__)
+        if corpus is not None and mutator is not None:
+            self._base_seeds = list(mutator.seeds)
+            for packet in corpus.inputs():
+                mutator.add_seed(packet)
+
+    def _connect(self):
+        if self.client is None:
+            client = self.client_factory(self.target_ip, self.target_port, self.protocol, self.timeout)
+            client.connect()
+            self.client = client
+        return self.client
+
+    def _reset(self) -> None:
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+    def execute(self, packet) -> dict:
+        """
+        Send one packet and wait for its response.
+
+        Returns:
+            The parsed response (see ResponseParser) or an error, with
+            "outcome" set to "response", "timeout", "closed" or "reset" and
+            "elapsed_ms" to the round trip time
+        """
+        started = time.perf_counter()
+        try:
+            frame = self._connect().request(packet)
+        except socket.timeout:
+            result = {"status": "error", "message": "No response", "outcome": "timeout"}
+        except OSError as e:
+            result = {"status": "error", "message": str(e), "outcome": "reset"}
+        else:
+            if frame:
+                result = self.parser.parse_response(frame, store=False)
+                result["outcome"] = "response"
+            elif frame is None:
+                result = {"status": "error", "message": "No response", "outcome": "timeout"}
+            else:
+                result = {"status": "error", "message": "Connection closed by peer", "outcome": "closed"}
+        if result["outcome"] != "response":
+            self._reset()
+        result["elapsed_ms"] = (time.perf_counter() - started) * 1000.0
+        self.executions += 1
+        self.outcomes[result["outcome"]] = self.outcomes.get(result["outcome"], 0) + 1
+        if result["outcome"] == "response":
+            self.by_status[result["status"]] = self.by_status.get(result["status"], 0) + 1
+        return result
+
+    def run(self, count: int, callback: Optional[Callable[[memoryview, dict], None]] = None,
+            minimize_every: int = 0, workers: int = 4) -> dict:
+        """
+        Execute count cases, waiting for each response.
+
+        Args:
+            count: Number of cases
+            callback: Called with (case, result) after each case; the case
+                view is only valid during the call. result["new"] tells
+                whether the corpus kept the case.
+            minimize_every: Minimize the corpus every this many cases
+            workers: Parallel associations for corpus minimization
+
+        Returns:
+            Summary, see summary()
+        """
+        started = time.perf_counter()
+        mutator, execute, corpus, triage, scheduler = self.mutator, self.execute, self.corpus, self.triage, self.scheduler
+        coverage, coverage_map = self.coverage, self.coverage_map
+        mutate = scheduler.next if scheduler is not None else mutator.mutate
+        for i in range(count):
+            packet = mutate()
+            result = execute(packet)
+            if coverage is not None and coverage_map.update(coverage.get(packet)):
+                result["coverage_id"] = coverage_map.edges
+            if scheduler is not None:
+                scheduler.update(result)
+            if triage is not None:
+                triage.capture(packet, result)
+            if corpus is not None:
+                result["new"] = corpus.add(packet, result)
+                if result["new"]:
+                    self.new_inputs += 1
+                    mutator.add_seed(packet)
+            if callback is not None:
+                callback(packet, result)
+            if minimize_every and corpus is not None and not (i + 1) % minimize_every:
+                self.minimize(workers)
+        return self.summary(time.perf_counter() - started, count)
+
+    def minimize(self, workers: int = 4) -> dict:
+        """
+        Minimize the corpus against this fuzzer's target and reseed the
+        mutator with the initial seeds plus what is left.
+        """
+        summary = self.corpus.minimize((self.target_ip, self.target_port, self.protocol), workers=workers,
+                                       timeout=self.timeout, client_factory=self.client_factory)
+        if self.mutator is not None:
+            self.mutator.replace_seeds(self._base_seeds + self.corpus.inputs())
+        return summary
+
+    def feed(self, count: int, drain_every: int = 16) -> dict:
+        """
+        Send count cases back to back without waiting for responses.
+
+        Whatever the peer sends back is drained every drain_every cases so it
+        never blocks on a full receive window.
+
+        Returns:
+            Summary, see summary()
+        """
+        started = time.perf_counter()
+        scratch = bytearray(65536)
+        mutate = self.mutator.mutate
+        for i in range(count):
+            packet = mutate()
+            try:
+                sock = self._connect().sock
+                sock.sendall(packet)
+                if not i % drain_every:
+                    self._drain(sock, scratch)
+                outcome = "sent"
+            except OSError as e:
+                self.logger.debug(f"Fuzz association reset: {e}")
+                self._reset()
+                outcome = "reset"
+            self.executions += 1
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        return self.summary(time.perf_counter() - started, count)
+
+    @staticmethod
+    def _drain(sock: socket.socket, scratch: bytearray) -> None:
+        while select.select([sock], [], [], 0)[0]:
+            if not sock.recv_into(scratch):
+                raise ConnectionResetError("Connection closed by peer")
+
+    def summary(self, elapsed: float, count: int) -> dict:
+        return {
+            "executions": self.executions,
+            "elapsed_s": round(elapsed, 3),
+            "rate_per_s": round(count / elapsed, 1) if elapsed > 0 else 0.0,
+            "outcomes": dict(self.outcomes),
+            "by_status": dict(self.by_status),
+            "new_inputs": self.new_inputs,
+            "corpus": len(self.corpus) if self.corpus is not None else None,
+            "signatures": len(self.scheduler.signatures) if self.scheduler is not None else None,
+            "edges": self.coverage_map.edges if self.coverage_map is not None else None
+        }
+
+    def close(self) -> None:
+        self._reset()
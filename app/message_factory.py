@@ -1,16 +1,44 @@
 #app/message_factory.py
-from scapy.all import raw
-from utils.protocols.ss7_layers import SCCP_UDT, TCAP_Invoke, MAP_SRI, MAP_ATI, MAP_UL, MAP_PSI, set_map_fields
 from utils.encoding.bcd import encode_bcd
+from app.message_templates import TemplateBuilder, CALLING_PARTY_GT
+
+_templates = TemplateBuilder()
 
 class MessageFactory:
+    """
+    Builds MAP request packets.
+
+    The create_* methods render packets from precompiled templates; the
+    build_*_scapy methods assemble the same bytes through the scapy layers
+    and serve as the reference implementation; scapy is only imported when
+    one of them is first called.
+    """
+
+    @staticmethod
+    def create_sri_message(imsi: str, msisdn: str, gt: str, ssn: int, invoke_id: int = 2) -> bytes:
+        return _templates.build("SRI", gt, ssn, invoke_id, imsi, msisdn)
+
+    @staticmethod
+    def create_ati_message(imsi: str, gt: str, ssn: int, invoke_id: int = 2) -> bytes:
+        return _templates.build("ATI", gt, ssn, invoke_id, imsi)
+
+    @staticmethod
+    def create_ul_message(imsi: str, vlr_gt: str, gt: str, ssn: int, invoke_id: int = 2) -> bytes:
+        return _templates.build("UL", gt, ssn, invoke_id, imsi, vlr_gt)
+
+    @staticmethod
+    def create_psi_message(imsi: str, gt: str, ssn: int, invoke_id: int = 2) -> bytes:
+        return _templates.build("PSI", gt, ssn, invoke_id, imsi)
+
     @staticmethod
-    def create_sri_message(imsi: str, msisdn: str, gt: str, ssn: int) -> bytes:
+    def build_sri_message_scapy(imsi: str, msisdn: str, gt: str, ssn: int, invoke_id: int = 2) -> bytes:
+        from scapy.compat import raw
+        from utils.protocols.ss7_layers import SCCP_UDT, TCAP_Invoke, MAP_SRI, set_map_fields
         map_sri = set_map_fields(MAP_SRI(), imsi=imsi, msisdn=msisdn)
-        tcap = TCAP_Invoke(invoke_id=2, opcode=4)
+        tcap = TCAP_Invoke(invoke_id=invoke_id, opcode=4)
         tcap_data = raw(tcap / map_sri)
         called_party = encode_bcd(gt)
-        calling_party = encode_bcd("2143658709")
+        calling_party = encode_bcd(CALLING_PARTY_GT)
         sccp = SCCP_UDT(
             msg_type=0x09,
             protocol_class=0x00,
@@ -27,12 +55,14 @@ class MessageFactory:
         return raw(sccp)
 
     @staticmethod
-    def create_ati_message(imsi: str, gt: str, ssn: int) -> bytes:
+    def build_ati_message_scapy(imsi: str, gt: str, ssn: int, invoke_id: int = 2) -> bytes:
+        from scapy.compat import raw
+        from utils.protocols.ss7_layers import SCCP_UDT, TCAP_Invoke, MAP_ATI, set_map_fields
         map_ati = set_map_fields(MAP_ATI(), imsi=imsi)
-        tcap = TCAP_Invoke(invoke_id=2, opcode=71)
+        tcap = TCAP_Invoke(invoke_id=invoke_id, opcode=71)
         tcap_data = raw(tcap / map_ati)
         called_party = encode_bcd(gt)
-        calling_party = encode_bcd("2143658709")
+        calling_party = encode_bcd(CALLING_PARTY_GT)
         sccp = SCCP_UDT(
             msg_type=0x09,
             protocol_class=0x00,
@@ -49,12 +79,14 @@ class MessageFactory:
         return raw(sccp)
 
     @staticmethod
-    def create_ul_message(imsi: str, vlr_gt: str, gt: str, ssn: int) -> bytes:
+    def build_ul_message_scapy(imsi: str, vlr_gt: str, gt: str, ssn: int, invoke_id: int = 2) -> bytes:
+        from scapy.compat import raw
+        from utils.protocols.ss7_layers import SCCP_UDT, TCAP_Invoke, MAP_UL, set_map_fields
         map_ul = set_map_fields(MAP_UL(), imsi=imsi, vlr_gt=vlr_gt)
-        tcap = TCAP_Invoke(invoke_id=2, opcode=2)
+        tcap = TCAP_Invoke(invoke_id=invoke_id, opcode=2)
         tcap_data = raw(tcap / map_ul)
         called_party = encode_bcd(gt)
-        calling_party = encode_bcd("2143658709")
+        calling_party = encode_bcd(CALLING_PARTY_GT)
         sccp = SCCP_UDT(
             msg_type=0x09,
             protocol_class=0x00,
@@ -71,12 +103,14 @@ class MessageFactory:
         return raw(sccp)
 
     @staticmethod
-    def create_psi_message(imsi: str, gt: str, ssn: int) -> bytes:
+    def build_psi_message_scapy(imsi: str, gt: str, ssn: int, invoke_id: int = 2) -> bytes:
+        from scapy.compat import raw
+        from utils.protocols.ss7_layers import SCCP_UDT, TCAP_Invoke, MAP_PSI, set_map_fields
         map_psi = set_map_fields(MAP_PSI(), imsi=imsi)
-        tcap = TCAP_Invoke(invoke_id=2, opcode=59)
+        tcap = TCAP_Invoke(invoke_id=invoke_id, opcode=59)
         tcap_data = raw(tcap / map_psi)
         called_party = encode_bcd(gt)
-        calling_party = encode_bcd("2143658709")
+        calling_party = encode_bcd(CALLING_PARTY_GT)
         sccp = SCCP_UDT(
             msg_type=0x09,
             protocol_class=0x00,
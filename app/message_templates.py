@@ -0,0 +1,134 @@
+#app/message_templates.py
+import struct
+import threading
+from typing import Dict, Tuple
+from utils.encoding.bcd import encode_bcd
+from utils.number_ranges import EncodedNumber
+from utils.protocols.map_encoding import encode_address, get_encoding
+
+CALLING_PARTY_GT = "2143658709"
+
+# operation -> (TCAP opcode, MAP tag), matching the scapy layers in
+# utils/protocols/ss7_layers.py
+OPERATIONS = {
+    "SRI": (4, 0x04),
+    "ATI": (71, 0x47),
+    "UL": (2, 0x02),
+    "PSI": (59, 0x46),
+}
+
+_DATA_LEN = struct.Struct(">H")
+TCAP_INVOKE_LEN = 8
+MAP_HEADER_LEN = 2
+
+
+class MessageTemplate:
+    """
+    Precompiled byte layout of an SCCP UDT / TCAP Invoke / MAP request.
+
+    Everything that only depends on (operation, GT, SSN) -- the SCCP header,
+    the BCD-encoded called and calling party addresses and the fixed TCAP
+    and MAP octets -- is rendered once. build() copies that prefix into a
+    per-thread preallocated bytearray and patches in the invoke ID, the
+    length octets and the variable MAP fields.
+    """
+
+    def __init__(self, operation: str, gt: str, ssn: int):
+        opcode, map_tag = OPERATIONS[operation]
+        called_party = encode_bcd(gt)
+        calling_party = encode_bcd(CALLING_PARTY_GT)
+        called_len = len(called_party)
+        calling_len = len(calling_party)
+
+        prefix = bytearray()
+        prefix += bytes([0x09, 0x00, 3, 5 + called_len, 7 + called_len + calling_len])
+        prefix += struct.pack(">HHH", called_len, calling_len, 0)
+        prefix += called_party + calling_party
+        self.tcap_offset = len(prefix)
+        prefix += bytes([0x02, 0x00, 0x0C, 0x00, 0x00, 0x02, 0x01, opcode])
+        prefix += bytes([map_tag, 0x00])
+
+        self.operation = operation
+        self.prefix = bytes(prefix)
+        self.fields_offset = len(self.prefix)
+        self._local = threading.local()
+
+    def _buffer(self, size: int) -> bytearray:
+        buf = getattr(self._local, "buf", None)
+        if buf is None or len(buf) < size:
+            buf = bytearray(max(size, 256))
+            buf[:self.fields_offset] = self.prefix
+            self._local.buf = buf
+        return buf
+
+    def build(self, invoke_id: int, *fields: bytes) -> bytes:
+        """
+        Render a request with the given invoke ID and MAP field values.
+
+        Args:
+            invoke_id: TCAP invoke ID (0-255)
+            fields: Wire-encoded MAP fields in layer order (e.g. IMSI, MSISDN)
+
+        Returns:
+            Complete SCCP UDT message
+
+        Raises:
+            ValueError: If a length or the invoke ID does not fit in one octet
+        """
+        map_len = 0
+        for field in fields:
+            map_len += len(field)
+        total = self.fields_offset + map_len
+        buf = self._buffer(total)
+
+        tcap = self.tcap_offset
+        # invoke_id, opcode_tag, opcode_len and opcode plus the MAP payload
+        invoke_len = 4 + MAP_HEADER_LEN + map_len
+        _DATA_LEN.pack_into(buf, 9, TCAP_INVOKE_LEN + MAP_HEADER_LEN + map_len)
+        buf[tcap + 1] = invoke_len
+        buf[tcap + 3] = invoke_len
+        buf[tcap + 4] = invoke_id
+        buf[self.fields_offset - 1] = map_len
+
+        offset = self.fields_offset
+        for field in fields:
+            end = offset + len(field)
+            buf[offset:end] = field
+            offset = end
+        return bytes(memoryview(buf)[:total])
+
+
+class TemplateBuilder:
+    """
+    Cache of MessageTemplate objects keyed by (operation, GT, SSN).
+    """
+
+    def __init__(self, max_templates: int = 4096):
+        self.max_templates = max_templates
+        self._templates: Dict[Tuple[str, str, int], MessageTemplate] = {}
+        self._lock = threading.Lock()
+
+    def template(self, operation: str, gt: str, ssn: int) -> MessageTemplate:
+        key = (operation, gt, ssn)
+        template = self._templates.get(key)
+        if template is None:
+            template = MessageTemplate(operation, gt, ssn)
+            with self._lock:
+                if len(self._templates) >= self.max_templates:
+                    self._templates.clear()
+                self._templates[key] = template
+        return template
+
+    def build(self, operation: str, gt: str, ssn: int, invoke_id: int, *fields) -> bytes:
+        """
+        Build a request, encoding str field values the way the MAP layers do.
+        bytes values, and EncodedNumbers made for the current encoding, are
+        taken as already encoded (see encode_address).
+        """
+        encoding = get_encoding()
+        encoded = [
+            (field.wire if isinstance(field, EncodedNumber) and field.encoding == encoding else encode_address(field))
+            if isinstance(field, str) else field
+            for field in fields
+        ]
+        return self.template(operation, gt, ssn).build(invoke_id, *encoded)
@@ -0,0 +1,240 @@
+#app/metrics.py
+import json
+import math
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+# Stages timed by SS7Core._send_packet, in pipeline order
+STAGES = ("build", "connect", "send", "receive", "parse", "store", "total")
+PERCENTILES = (50, 90, 99)
+ALL_TARGETS = "*"
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram.
+
+    Samples are counted in buckets that are SUB_BUCKETS per power of two
+    of microseconds wide, so recording is one log2 and one list increment
+    and any percentile is reported within about 2% of the true value.
+    Latencies from 1us to roughly 2 minutes are covered; anything outside
+    is clamped to the first or last bucket, while min and max stay exact.
+    """
+
+    SUB_BUCKETS = 16
+    OCTAVES = 27
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * (self.SUB_BUCKETS * self.OCTAVES + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        micros = seconds * 1e6
+        index = int(math.log2(micros) * self.SUB_BUCKETS) if micros > 1.0 else 0
+        if index >= len(self.counts):
+            index = len(self.counts) - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        """
+        Return the q-th percentile (0-100) in seconds, 0.0 if empty.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * q / 100.0))
+        if rank >= self.count:
+            return self.max
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                # geometric midpoint of the bucket, clamped to the observed range
+                value = 2 ** ((index + 0.5) / self.SUB_BUCKETS) / 1e6
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        """
+        Count, mean, min, percentiles and max in milliseconds.
+        """
+        if not self.count:
+            return {"count": 0}
+        summary = {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000.0, 3),
+            "min_ms": round(self.min * 1000.0, 3),
+        }
+        for q in PERCENTILES:
+            summary[f"p{q}_ms"] = round(self.percentile(q) * 1000.0, 3)
+        summary["max_ms"] = round(self.max * 1000.0, 3)
+        return summary
+
+    def to_dict(self) -> dict:
+        """
+        Sparse JSON-safe form, e.g. to ship a histogram to another host.
+        """
+        return {
+            "counts": [[index, count] for index, count in enumerate(self.counts) if count],
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        histogram = cls()
+        for index, count in data["counts"]:
+            histogram.counts[index] = count
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = math.inf if data["min"] is None else data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+
+class Metrics:
+    """
+    Thread-safe registry of stage latency histograms per (operation, target).
+    """
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self.started_at = datetime.now(timezone.utc).isoformat()
+
+    @staticmethod
+    def target_key(target_ip: str, target_port: int, protocol: str) -> str:
+        return f"{target_ip}:{target_port}/{protocol.upper()}"
+
+    def record(self, operation: str, target: str, stage: str, seconds: float) -> None:
+        self.record_stages(operation, target, {stage: seconds})
+
+    def record_stages(self, operation: str, target: str, timings: Dict[str, float]) -> None:
+        """
+        Record one transaction's stage durations (seconds) under a single lock.
+        """
+        with self._lock:
+            for stage, seconds in timings.items():
+                key = (operation, target, stage)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = LatencyHistogram()
+                histogram.record(seconds)
+
+    def drain(self) -> Dict[Tuple[str, str, str], LatencyHistogram]:
+        """
+        Take all histograms recorded so far and start over, e.g. to ship a
+        worker's samples to the process that aggregates them with merge().
+        """
+        with self._lock:
+            histograms, self._histograms = self._histograms, {}
+        return histograms
+
+    def merge(self, histograms: Dict[Tuple[str, str, str], LatencyHistogram]) -> None:
+        with self._lock:
+            for key, histogram in histograms.items():
+                current = self._histograms.get(key)
+                if current is None:
+                    current = self._histograms[key] = LatencyHistogram()
+                current.merge(histogram)
+
+    def histogram(self, operation: str, stage: str, target: Optional[str] = None) -> LatencyHistogram:
+        """
+        Histogram for one stage of an operation, merged over all targets
+        unless target is given.
+        """
+        merged = LatencyHistogram()
+        with self._lock:
+            for (op, tgt, stg), histogram in self._histograms.items():
+                if op == operation and stg == stage and (target is None or tgt == target):
+                    merged.merge(histogram)
+        return merged
+
+    def snapshot(self) -> dict:
+        """
+        Summaries for every operation, per target and merged over targets.
+
+        Returns:
+            {"started_at", "generated_at", "operations": {operation: {target: {stage: summary}}}}
+            where the "*" target aggregates all targets of the operation
+        """
+        with self._lock:
+            grouped: Dict[str, Dict[str, Dict[str, LatencyHistogram]]] = {}
+            for (operation, target, stage), histogram in self._histograms.items():
+                targets = grouped.setdefault(operation, {})
+                targets.setdefault(target, {})[stage] = histogram
+                merged = targets.setdefault(ALL_TARGETS, {}).setdefault(stage, LatencyHistogram())
+                merged.merge(histogram)
+            operations = {}
+            for operation in sorted(grouped):
+                operations[operation] = {
+                    target: {stage: stages[stage].summary() for stage in _ordered(stages)}
+                    for target, stages in sorted(grouped[operation].items())
+                }
+        return {
+            "started_at": self.started_at,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "operations": operations,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+        self.started_at = datetime.now(timezone.utc).isoformat()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._histograms)
+
+    def dump(self, path: str) -> dict:
+        """
+        Write snapshot() to path as JSON, replacing any previous dump atomically.
+        """
+        snapshot = self.snapshot()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp_path, path)
+        return snapshot
+
+    @staticmethod
+    def load(path: str) -> Optional[dict]:
+        """
+        Read a snapshot written by dump(), or None if there is none.
+        """
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+
+def _ordered(stages: Dict[str, LatencyHistogram]) -> List[str]:
+    known = [stage for stage in STAGES if stage in stages]
+    return known + sorted(stage for stage in stages if stage not in STAGES)
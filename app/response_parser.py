@@ -1,78 +1,79 @@
 #app/response_parser.py
-import sqlite3
 import logging
-from scapy.all import raw
-from utils.protocols.ss7_layers import SCCP_UDT, TCAP_ReturnResultLast, MAP_SRI, MAP_ATI, MAP_UL, MAP_PSI
+from utils.protocols.fast_codec import decode_response
+from app.storage import TransactionStore
 
 logging.basicConfig(
     filename="logs/ss7_tool.log",
     level=logging.DEBUG,
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
+logger = logging.getLogger()
 
 class ResponseParser:
     def __init__(self, db_path="ss7_data.db"):
         self.db_path = db_path
-        self._init_db()
+        self.store = TransactionStore(db_path) if db_path else None
 
-    def _init_db(self):
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("DROP TABLE IF EXISTS responses")
-                cursor.execute("""
-                    CREATE TABLE responses (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        operation TEXT,
-                        invoke_id INTEGER,
-                        opcode INTEGER,
-                        status TEXT,
-                        imsi TEXT,
-                        msisdn TEXT,
-                        vlr_gt TEXT,
-                        error TEXT,
-                        raw_response TEXT
-                    )
-                """)
-                conn.commit()
-        except sqlite3.Error as e:
-            logging.error(f"Database initialization error: {e}")
-            raise
-
-    def parse_response(self, response: bytes) -> dict:
+    def close(self):
+        """Flush queued results and close the storage writer."""
+        if self.store:
+            self.store.close()
+
+    def parse_response(self, response: bytes, store: bool = True) -> dict:
+        """
+        Parse a MAP response, using the struct-based decoder when possible and
+        scapy for malformed or unknown packets. The result is queued for
+        storage unless store is False.
+        """
+        result = decode_response(response)
+        if result is None:
+            result = self._parse_response_scapy(bytes(response))
+        elif result["status"] == "error":
+            logging.error(result["message"])
+        elif logger.isEnabledFor(logging.DEBUG):
+            logging.debug(f"Parsed result: {result}")
+        if store:
+            self._store_response(result)
+        return result
+
+    def _parse_response_scapy(self, response: bytes) -> dict:
+        # imported here so that only malformed or unknown packets pay for scapy
+        from utils.protocols.ss7_layers import SCCP_UDT, TCAP_ReturnResultLast, MAP_SRI, MAP_ATI, MAP_UL, MAP_PSI
+        debug = logger.isEnabledFor(logging.DEBUG)
+        raw_hex = response.hex()
         try:
-            raw_hex = response.hex()
-            logging.debug(f"Raw response: {raw_hex}")
+            if debug:
+                logging.debug(f"Raw response: {raw_hex}")
             packet = SCCP_UDT(response)
-            logging.debug(f"SCCP_UDT fields: {packet.fields}")
-            logging.debug(f"SCCP_UDT data: {packet.data.hex()}")
+            if debug:
+                logging.debug(f"SCCP_UDT fields: {packet.fields}")
+                logging.debug(f"SCCP_UDT data: {packet.data.hex()}")
 
             if not packet.data:
                 logging.error("No data in SCCP_UDT")
-                result = {
+                return {
                     "status": "error",
                     "message": "No data in SCCP_UDT",
                     "operation": "unknown",
                     "raw_response": raw_hex
                 }
-                self._store_response(result)
-                return result
 
             tcap_tag = packet.data[0]
-            logging.debug(f"TCAP tag: {hex(tcap_tag)}")
+            if debug:
+                logging.debug(f"TCAP tag: {hex(tcap_tag)}")
             if tcap_tag != 0x04:
                 logging.error(f"Expected TCAP_ReturnResultLast tag 0x04, got {hex(tcap_tag)}")
-                result = {
+                return {
                     "status": "error",
                     "message": f"Unknown TCAP tag: {hex(tcap_tag)}",
                     "operation": "unknown",
                     "raw_response": raw_hex
                 }
-                self._store_response(result)
-                return result
 
             tcap = TCAP_ReturnResultLast(packet.data)
-            logging.debug(f"TCAP_ReturnResultLast fields: {tcap.fields}")
+            if debug:
+                logging.debug(f"TCAP_ReturnResultLast fields: {tcap.fields}")
             opcode = getattr(tcap, "opcode", -1)
             invoke_id = getattr(tcap, "invoke_id", -1)
 
@@ -94,7 +95,8 @@ class ResponseParser:
 
             if tcap.haslayer(MAP_SRI):
                 map_layer = tcap[MAP_SRI]
-                logging.debug(f"MAP_SRI fields: {map_layer.fields}")
+                if debug:
+                    logging.debug(f"MAP_SRI fields: {map_layer.fields}")
                 result["params"]["imsi"] = map_layer.imsi.decode('utf-8', errors='ignore')
                 result["params"]["msisdn"] = map_layer.msisdn.decode('utf-8', errors='ignore')
             elif tcap.haslayer(MAP_ATI):
@@ -112,46 +114,36 @@ class ResponseParser:
                 result["status"] = "error"
                 result["message"] = f"No recognized MAP layer for opcode {opcode}"
 
-            logging.debug(f"Parsed result: {result}")
-            self._store_response(result)
+            if debug:
+                logging.debug(f"Parsed result: {result}")
             return result
 
         except Exception as e:
             logging.error(f"Response parsing error: {str(e)}")
-            result = {
+            return {
                 "status": "error",
                 "message": f"Parsing failed: {str(e)}",
                 "operation": "unknown",
                 "raw_response": raw_hex
             }
-            self._store_response(result)
-            return result
 
-    def _store_response(self, result):
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO responses (
-                        operation, invoke_id, opcode, status, imsi, msisdn, vlr_gt, error, raw_response
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    result.get("operation", "unknown"),
-                    result.get("invoke_id", -1),
-                    result.get("opcode", -1),
-                    result.get("status", "error"),
-                    result.get("params", {}).get("imsi"),
-                    result.get("params", {}).get("msisdn"),
-                    result.get("params", {}).get("vlr_gt"),
-                    result.get("error", result.get("message")),
-                    result.get("raw_response")
-                ))
-                conn.commit()
-        except sqlite3.Error as e:
-            logging.error(f"Database storage error: {e}")
+    def _store_response(self, result, context=None):
+        if self.store:
+            self.store.submit(result, context)
+
+    def get_history(self, limit: int = 10, before=None) -> list:
+        return self.get_filtered_history(limit=limit, before=before)
+
+    def get_filtered_history(self, operation: str = None, start_date: str = None, end_date: str = None,
+                             limit: int = 10, imsi: str = None, before=None) -> list:
+        if not self.store:
+            return []
+        self.store.flush()
+        return self.store.query_history(operation, start_date, end_date, imsi=imsi, limit=limit, before=before)
 
 if __name__ == "__main__":
     parser = ResponseParser()
     test_response = b"\x09\x00\x03\x00\x00\x05\x00\x05\x00\x1a\x04\x18\x02\x01\x02\x30\x13\x02\x01\x04\x04\x0e\x31\x32\x33\x34\x35\x36\x37\x38\x39\x30\x31\x32\x33\x34"
     parsed = parser.parse_response(test_response)
+    parser.close()
     print(parsed)
\ No newline at end of file
@@ -0,0 +1,203 @@
+#app/scheduler.py
+import logging
+import math
+import random
+from typing import Dict, List, Set
+from app.corpus import Fingerprint, fingerprint
+from app.fuzzer import OPERATORS, Mutator
+
+UCB = "ucb"
+THOMPSON = "thompson"
+POLICIES = (UCB, THOMPSON)
+
+
+class Bandit:
+    """
+    Multi-armed bandit with rewards in [0, 1] and a growing set of arms.
+
+    "ucb" picks the arm with the best UCB1 bound, "thompson" the best draw
+    from each arm's Beta posterior. Every window updates all statistics are
+    scaled by decay, so arms that paid off long ago lose their lead to arms
+    that pay off now.
+    """
+
+    def __init__(self, arms: int = 0, policy: str = UCB, rng: random.Random = None, exploration: float = 0.1,
+                 decay: float = 0.9, window: int = 512):
+        """
+        Initialize bandit.
+
+        Args:
+            arms: Initial number of arms
+            policy: "ucb" or "thompson"
+            rng: Random source (Thompson sampling, ties)
+            exploration: UCB exploration weight
+            decay: Factor applied to all statistics every window updates
+            window: Updates between decays
+
+        Raises:
+            ValueError: If policy is unknown
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scheduling policy: {policy} (expected one of {', '.join(POLICIES)})")
+        self.policy = policy
+        self.rng = rng or random.Random(0)
+        self.exploration = exploration
+        self.decay = decay
+        self.window = window
+        self.pulls: List[float] = []
+        self.rewards: List[float] = []
+        self.total = 0.0
+        self._updates = 0
+        self._untried: List[int] = []
+        self.add_arms(arms)
+
+    def __len__(self) -> int:
+        return len(self.pulls)
+
+    def add_arms(self, count: int) -> None:
+        start = len(self.pulls)
+        self.pulls.extend([0.0] * count)
+        self.rewards.extend([0.0] * count)
+        # new arms are tried once before any arm is picked by score
+        self._untried.extend(range(start + count - 1, start - 1, -1))
+
+    def select(self) -> int:
+        """
+        Returns:
+            Index of the arm to pull next
+        """
+        if self._untried:
+            return self._untried.pop()
+        scores = self._scores()
+        return scores.index(max(scores))
+
+    def select_many(self, count: int) -> List[int]:
+        """
+        Pick count different arms (all arms if there are fewer) at once,
+        untried ones first, then by score. Calling select() count times
+        instead would return the same arm under UCB, since nothing is
+        updated in between.
+
+        Returns:
+            Arm indices, best first
+        """
+        count = min(count, len(self.pulls))
+        chosen = []
+        while self._untried and len(chosen) < count:
+            chosen.append(self._untried.pop())
+        if len(chosen) < count:
+            scores = self._scores()
+            ranked = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+            chosen.extend([arm for arm in ranked if arm not in chosen][:count - len(chosen)])
+        return chosen
+
+    def _scores(self) -> List[float]:
+        pulls, rewards = self.pulls, self.rewards
+        if self.policy == UCB:
+            bonus = self.exploration * math.sqrt(math.log(self.total + 1))
+            # an arm tried but not updated yet has no pulls; score it as one
+            return [rewards[i] / (pulls[i] or 1.0) + bonus / math.sqrt(pulls[i] or 1.0) for i in range(len(pulls))]
+        betavariate = self.rng.betavariate
+        return [betavariate(1.0 + rewards[i], 1.0 + pulls[i] - rewards[i]) for i in range(len(pulls))]
+
+    def update(self, arm: int, reward: float) -> None:
+        self.pulls[arm] += 1.0
+        self.rewards[arm] += reward
+        self.total += 1.0
+        self._updates += 1
+        if self._updates % self.window == 0:
+            decay = self.decay
+            # keep at least one pull per arm so UCB scores stay defined
+            self.pulls = [max(pulls * decay, 1.0) for pulls in self.pulls]
+            self.rewards = [rewards * decay for rewards in self.rewards]
+            self.total = sum(self.pulls)
+
+
+class PowerScheduler:
+    """
+    Split the fuzzing budget between seeds and mutation operators by how
+    often they recently produced a response signature not seen before.
+
+    One bandit chooses the seed and another the operators of the stack,
+    all different. A case that finds a new signature rewards its seed and every
+    operator it used. Seeds the mutator gains during the run, e.g. new
+    corpus inputs, become arms that are tried before any scored arm.
+    """
+
+    def __init__(self, mutator: Mutator, policy: str = UCB, seed: int = 0, exploration: float = 0.1,
+                 decay: float = 0.9, window: int = 512):
+        """
+        Initialize scheduler.
+
+        Args:
+            mutator: Mutator holding the seeds
+            policy: "ucb" or "thompson"
+            seed: Random seed for stack depth and Thompson sampling
+            exploration: UCB exploration weight
+            decay: Factor applied to the statistics every window cases
+            window: Cases between decays
+
+        Raises:
+            ValueError: If policy is unknown
+        """
+        self.mutator = mutator
+        self.policy = policy
+        self.rng = random.Random(seed)
+        self._bandit_args = dict(policy=policy, rng=self.rng, exploration=exploration, decay=decay, window=window)
+        self.seeds = Bandit(len(mutator.seeds), **self._bandit_args)
+        self.operators = Bandit(len(OPERATORS), **self._bandit_args)
+        self.signatures: Set[Fingerprint] = set()
+        self.finds: Dict[int, int] = {}
+        self.logger = logging.getLogger(__name__)
+
+    def next(self) -> memoryview:
+        """
+        Build the next case with the scheduled seed and operator stack.
+
+        Returns:
+            memoryview of the case, see Mutator.mutate
+        """
+        seeds = len(self.mutator.seeds)
+        if seeds < len(self.seeds):
+            # seeds were replaced (corpus minimization): start over
+            self.seeds = Bandit(seeds, **self._bandit_args)
+            self.finds.clear()
+        elif seeds > len(self.seeds):
+            self.seeds.add_arms(seeds - len(self.seeds))
+        operators = self.operators.select_many(1 + int(self.rng.random() * self.mutator.max_stack))
+        return self.mutator.mutate(self.seeds.select(), operators)
+
+    def update(self, result: dict) -> bool:
+        """
+        Credit the last case with its outcome.
+
+        Args:
+            result: Fuzzer.execute result of the case from next()
+
+        Returns:
+            True if its signature was new
+        """
+        value = fingerprint(result, timing=False)
+        new = value not in self.signatures
+        reward = 1.0 if new else 0.0
+        if new:
+            self.signatures.add(value)
+            self.finds[self.mutator.last_seed] = self.finds.get(self.mutator.last_seed, 0) + 1
+        self.seeds.update(self.mutator.last_seed, reward)
+        for operator in self.mutator.applied:
+            self.operators.update(operator, reward)
+        return new
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            Signatures found, finds per seed and per-operator pulls and
+            rewards (decayed)
+        """
+        return {
+            "policy": self.policy,
+            "signatures": len(self.signatures),
+            "finds_by_seed": dict(self.finds),
+            "operators": {name: {"pulls": round(self.operators.pulls[i], 1), "rewards": round(self.operators.rewards[i], 1)}
+                          for i, name in enumerate(OPERATORS)}
+        }
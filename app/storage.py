@@ -0,0 +1,657 @@
+#app/storage.py
+import atexit
+import hashlib
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Tuple
+
+_STOP = object()
+_FLUSH = object()
+
+
+class _Statement:
+    """
+    Queued write committed by the writer thread in order with the rows
+    queued before it.
+    """
+
+    __slots__ = ("sql", "params")
+
+    def __init__(self, sql: str, params: Sequence):
+        self.sql = sql
+        self.params = params
+
+# payloads.compression values
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+
+
+def payload_hash(data: bytes) -> bytes:
+    """
+    Content address of a request or response payload.
+    """
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def encode_payload(data: bytes, level: Optional[int] = 6) -> Tuple[int, bytes]:
+    """
+    Compress data with zlib at level, keeping it raw unless that saves space.
+
+    Returns:
+        (compression, stored bytes)
+    """
+    if level:
+        packed = zlib.compress(data, level)
+        if len(packed) < len(data):
+            return COMPRESSION_ZLIB, packed
+    return COMPRESSION_NONE, data
+
+
+def decode_payload(compression: int, data: bytes) -> bytes:
+    if compression == COMPRESSION_ZLIB:
+        return zlib.decompress(data)
+    return bytes(data)
+
+
+def utc_timestamp() -> str:
+    """
+    Current UTC time in the naive ISO 8601 form stored so far, so that
+    timestamps keep sorting correctly as text.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def _move_hex_payloads(conn: sqlite3.Connection) -> None:
+    """
+    Move the hex TEXT request/response columns of existing rows into payloads.
+    """
+    rows = conn.execute(
+        "SELECT id, request_data, raw_response FROM responses "
+        "WHERE request_data IS NOT NULL OR raw_response IS NOT NULL"
+    ).fetchall()
+    for row_id, request_hex, response_hex in rows:
+        hashes = []
+        for value in (request_hex, response_hex):
+            try:
+                data = bytes.fromhex(value) if value else b""
+            except ValueError:
+                data = value.encode("utf-8")
+            if not data:
+                hashes.append(None)
+                continue
+            digest = payload_hash(data)
+            compression, stored = encode_payload(data)
+            conn.execute(
+                "INSERT OR IGNORE INTO payloads (hash, compression, size, data) VALUES (?, ?, ?, ?)",
+                (digest, compression, len(data), stored)
+            )
+            hashes.append(digest)
+        conn.execute(
+            "UPDATE responses SET request_hash = ?, response_hash = ?, request_data = NULL, raw_response = NULL "
+            "WHERE id = ?", (hashes[0], hashes[1], row_id)
+        )
+
+
+# (version, steps) applied in order to databases whose PRAGMA user_version
+# is lower; a step is an SQL statement or a callable taking the connection.
+# Never edit a released migration, add a new one.
+MIGRATIONS = [
+    (1, [
+        """
+        CREATE TABLE IF NOT EXISTS responses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            operation TEXT,
+            invoke_id INTEGER,
+            opcode INTEGER,
+            status TEXT,
+            imsi TEXT,
+            msisdn TEXT,
+            vlr_gt TEXT,
+            error TEXT,
+            raw_response TEXT
+        )
+        """,
+    ]),
+    (2, [
+        "ALTER TABLE responses ADD COLUMN timestamp TEXT",
+        "ALTER TABLE responses ADD COLUMN target_ip TEXT",
+        "ALTER TABLE responses ADD COLUMN target_port INTEGER",
+        "ALTER TABLE responses ADD COLUMN protocol TEXT",
+        "ALTER TABLE responses ADD COLUMN gt TEXT",
+        "ALTER TABLE responses ADD COLUMN ssn INTEGER",
+        "ALTER TABLE responses ADD COLUMN rtt_ms REAL",
+        "ALTER TABLE responses ADD COLUMN request_data TEXT",
+        "UPDATE responses SET operation = substr(operation, 5) WHERE operation LIKE 'MAP\\_%' ESCAPE '\\'",
+        "CREATE INDEX IF NOT EXISTS idx_responses_timestamp ON responses (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_responses_operation_timestamp ON responses (operation, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_responses_imsi ON responses (imsi)",
+    ]),
+    (3, [
+        """
+        CREATE TABLE IF NOT EXISTS payloads (
+            hash BLOB PRIMARY KEY,
+            compression INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            data BLOB NOT NULL
+        ) WITHOUT ROWID
+        """,
+        "ALTER TABLE responses ADD COLUMN request_hash BLOB",
+        "ALTER TABLE responses ADD COLUMN response_hash BLOB",
+        _move_hex_payloads,
+    ]),
+    (4, [
+        """
+        CREATE TABLE IF NOT EXISTS campaigns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            spec TEXT NOT NULL,
+            shard_size INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'running',
+            completed INTEGER NOT NULL DEFAULT 0,
+            cursor INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT,
+            updated_at TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS campaign_ranges (
+            campaign_id INTEGER NOT NULL,
+            start INTEGER NOT NULL,
+            stop INTEGER NOT NULL,
+            PRIMARY KEY (campaign_id, start)
+        ) WITHOUT ROWID
+        """,
+        "ALTER TABLE responses ADD COLUMN campaign_id INTEGER",
+        "ALTER TABLE responses ADD COLUMN campaign_index INTEGER",
+        "CREATE INDEX IF NOT EXISTS idx_responses_campaign ON responses (campaign_id, campaign_index) WHERE campaign_id IS NOT NULL",
+    ]),
+    (5, [
+        # rows from before version 2 have no timestamp; NULL never satisfies
+        # the (timestamp, id) keyset predicate, so history pages skipped them.
+        # An empty string sorts below every real timestamp.
+        "UPDATE responses SET timestamp = '' WHERE timestamp IS NULL",
+    ]),
+]
+
+
+class TransactionStore:
+    """
+    Asynchronous SQLite writer for transaction results.
+
+    A single long-lived connection in WAL mode is owned by a background
+    writer thread. Callers hand rows to a bounded queue with submit(), which
+    only blocks while the queue is full, for at most put_timeout seconds
+    (with drop_when_full, rows are dropped at once instead); the writer
+    drains the queue and commits rows in batches
+    with executemany() once batch_size rows are pending or flush_interval
+    seconds have passed. close() (also registered with atexit) flushes
+    everything that was queued before shutting the writer down.
+
+    Request and response packets are not stored on the transaction rows:
+    each distinct payload is written once, optionally zlib-compressed, to
+    the payloads table under its BLAKE2b digest, and rows reference it by
+    request_hash / response_hash.
+    """
+
+    INSERT_SQL = """
+        INSERT INTO responses (
+            operation, invoke_id, opcode, status, imsi, msisdn, vlr_gt, error,
+            timestamp, target_ip, target_port, protocol, gt, ssn, rtt_ms, campaign_id, campaign_index,
+            request_hash, response_hash
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    PAYLOAD_SQL = "INSERT OR IGNORE INTO payloads (hash, compression, size, data) VALUES (?, ?, ?, ?)"
+
+    HISTORY_COLUMNS = """
+        r.id, r.timestamp, r.operation, r.status, r.invoke_id, r.opcode, r.imsi, r.msisdn, r.vlr_gt,
+        r.gt, r.ssn, r.target_ip, r.target_port, r.protocol, r.rtt_ms, r.error,
+        r.request_data, r.raw_response AS response_data,
+        rq.compression AS request_compression, rq.data AS request_payload,
+        rs.compression AS response_compression, rs.data AS response_payload
+    """
+
+    HISTORY_JOINS = """
+        LEFT JOIN payloads rq ON rq.hash = r.request_hash
+        LEFT JOIN payloads rs ON rs.hash = r.response_hash
+    """
+
+    def __init__(self, db_path: str = "ss7_data.db", batch_size: int = 500,
+                 flush_interval: float = 0.5, max_queue: int = 100000,
+                 compression: Optional[int] = 6, known_payloads: int = 65536,
+                 put_timeout: float = 5.0, drop_when_full: bool = False):
+        """
+        Initialize the store, migrate its schema and start the writer thread.
+
+        Args:
+            db_path: SQLite database file
+            batch_size: Rows committed per transaction at most
+            flush_interval: Maximum seconds a queued row waits for its commit
+            max_queue: Bound on queued rows
+            compression: zlib level for payloads, None or 0 to store them raw
+            known_payloads: Digests of committed payloads remembered so that
+                repeated packets are neither compressed nor written again
+            put_timeout: Longest wait of submit() for room in a full queue
+                before the row is dropped
+            drop_when_full: Drop rows submitted while the queue is full
+                instead of waiting
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compression = compression
+        self.known_payloads = known_payloads
+        self._known: "OrderedDict[bytes, None]" = OrderedDict()
+        self.logger = logging.getLogger(__name__)
+        self.put_timeout = put_timeout
+        self.drop_when_full = drop_when_full
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self.written = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._writer = threading.Thread(target=self._run, name="ss7-storage-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    @property
+    def schema_version(self) -> int:
+        with self._lock:
+            return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def _migrate(self) -> None:
+        """
+        Apply every migration newer than the database's user_version.
+        """
+        try:
+            with self._lock:
+                version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+                for target, steps in MIGRATIONS:
+                    if target <= version:
+                        continue
+                    self.logger.info(f"Migrating {self.db_path} to schema version {target}")
+                    self.conn.execute("BEGIN")
+                    try:
+                        for step in steps:
+                            if callable(step):
+                                step(self.conn)
+                            else:
+                                self.conn.execute(step)
+                        self.conn.execute(f"PRAGMA user_version = {target}")
+                        self.conn.execute("COMMIT")
+                    except sqlite3.Error:
+                        self.conn.execute("ROLLBACK")
+                        raise
+        except sqlite3.Error as e:
+            self.logger.error(f"Database initialization error: {e}")
+            raise
+
+    @staticmethod
+    def row_from_result(result: dict, context: Optional[dict] = None) -> tuple:
+        """
+        Build the queued (row, request, response) item for a result.
+
+        row holds every INSERT_SQL column but the payload hashes, which the
+        writer thread fills in. The response is taken from context["response"]
+        when the caller has the raw bytes, or decoded from the result's hex.
+        """
+        context = context or {}
+        params = result.get("params") or {}
+        operation = context.get("operation") or result.get("operation", "unknown")
+        if operation.startswith("MAP_"):
+            operation = operation[4:]
+        response = context.get("response")
+        if response is None and result.get("raw_response"):
+            try:
+                response = bytes.fromhex(result["raw_response"])
+            except ValueError:
+                response = result["raw_response"].encode("utf-8")
+        row = (
+            operation,
+            result.get("invoke_id", -1),
+            result.get("opcode", -1),
+            result.get("status", "error"),
+            params.get("imsi", context.get("imsi")),
+            params.get("msisdn", context.get("msisdn")),
+            params.get("vlr_gt", context.get("vlr_gt")),
+            result.get("error", result.get("message")),
+            context.get("timestamp") or utc_timestamp(),
+            context.get("target_ip"),
+            context.get("target_port"),
+            context.get("protocol"),
+            context.get("gt"),
+            context.get("ssn"),
+            context.get("rtt_ms"),
+            context.get("campaign_id"),
+            context.get("campaign_index"),
+        )
+        return row, context.get("request"), response
+
+    def submit(self, result: dict, context: Optional[dict] = None) -> bool:
+        """
+        Queue a result for storage, waiting up to put_timeout seconds while
+        the queue is full (not at all with drop_when_full).
+
+        Args:
+            result: Parsed or error result dict
+            context: Request details (operation, target, gt, ssn, rtt_ms,
+                request and response bytes)
+
+        Returns:
+            False if the store is closed or the row was dropped
+        """
+        if self._closed:
+            return False
+        try:
+            self._queue.put(self.row_from_result(result, context), block=not self.drop_when_full,
+                            timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            self._drop()
+            return False
+
+    def submit_many(self, items, block: bool = True) -> int:
+        """
+        Queue items built with row_from_result(), e.g. by worker processes.
+
+        Unlike submit(), this waits for room in the queue by default so that
+        a bulk producer is slowed down rather than losing rows.
+
+        Returns:
+            Number of items queued
+        """
+        queued = 0
+        for item in items:
+            if self._closed:
+                break
+            try:
+                self._queue.put(item, block=block)
+                queued += 1
+            except queue.Full:
+                self._drop()
+        return queued
+
+    def _drop(self) -> None:
+        with self._dropped_lock:
+            self.dropped += 1
+            dropped = self.dropped
+        if dropped == 1 or dropped % 1000 == 0:
+            self.logger.warning(f"Storage queue full, {dropped} rows dropped so far")
+
+    def create_campaign(self, spec: str, shard_size: int) -> int:
+        """
+        Register a campaign and return its ID.
+
+        Args:
+            spec: JSON description of the workload
+            shard_size: Requests per shard, kept for resuming
+        """
+        now = utc_timestamp()
+        with self._lock:
+            cursor = self.conn.execute(
+                "INSERT INTO campaigns (spec, shard_size, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (spec, int(shard_size), now, now)
+            )
+            return cursor.lastrowid
+
+    def get_campaign(self, campaign_id: int) -> Optional[dict]:
+        rows = self.execute("SELECT * FROM campaigns WHERE id = ?", (campaign_id,))
+        return rows[0] if rows else None
+
+    def campaign_ranges(self, campaign_id: int) -> List[Tuple[int, int]]:
+        """
+        Checkpointed (start, stop) request ranges of a campaign, in order.
+        """
+        with self._lock:
+            return self.conn.execute(
+                "SELECT start, stop FROM campaign_ranges WHERE campaign_id = ? ORDER BY start", (campaign_id,)
+            ).fetchall()
+
+    def campaign_indices(self, campaign_id: int, start: int, stop: int) -> List[int]:
+        """
+        Request indices in [start, stop) of a campaign that have a stored row.
+        """
+        with self._lock:
+            return [row[0] for row in self.conn.execute(
+                "SELECT DISTINCT campaign_index FROM responses "
+                "WHERE campaign_id = ? AND campaign_index >= ? AND campaign_index < ? ORDER BY campaign_index",
+                (campaign_id, start, stop)
+            )]
+
+    def campaign_counts(self, campaign_id: int) -> dict:
+        """
+        Stored rows of a campaign as {(operation, status): count}.
+        """
+        with self._lock:
+            return {(operation, status): count for operation, status, count in self.conn.execute(
+                "SELECT operation, status, COUNT(*) FROM responses WHERE campaign_id = ? GROUP BY operation, status",
+                (campaign_id,)
+            )}
+
+    def checkpoint(self, campaign_id: int, ranges: Sequence[Tuple[int, int]], completed: int,
+                   cursor: int, status: str = "running") -> None:
+        """
+        Queue a campaign checkpoint behind the rows submitted so far.
+
+        The writer commits it in the same transaction as those rows or a
+        later one, so a checkpointed range never lacks its results.
+
+        Args:
+            campaign_id: Campaign to update
+            ranges: (start, stop) request ranges finished since the last checkpoint
+            completed: Requests finished in total
+            cursor: First request index not finished yet
+            status: "running" or "finished"
+        """
+        if self._closed:
+            return
+        self._queue.put(_Statement(
+            "INSERT OR REPLACE INTO campaign_ranges (campaign_id, start, stop) VALUES (?, ?, ?)",
+            [(campaign_id, start, stop) for start, stop in ranges]
+        ))
+        self._queue.put(_Statement(
+            "UPDATE campaigns SET completed = ?, cursor = ?, status = ?, updated_at = ? WHERE id = ?",
+            [(completed, cursor, status, utc_timestamp(), campaign_id)]
+        ))
+
+    def flush(self) -> None:
+        """
+        Block until every row queued so far has been committed.
+        """
+        if self._closed:
+            return
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self) -> None:
+        """
+        Flush pending rows, stop the writer thread and close the connection.
+        """
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+        # release flush() callers that raced with close()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+        with self._lock:
+            self.conn.close()
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+
+    def _run(self) -> None:
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._write(batch)
+                batch, deadline = [], None
+                continue
+            if item is _STOP or item is _FLUSH:
+                self._write(batch)
+                batch, deadline = [], None
+                self._queue.task_done()
+                if item is _STOP:
+                    return
+                continue
+            batch.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._write(batch)
+                batch, deadline = [], None
+
+    def _payload_ref(self, data, payloads: dict) -> Optional[bytes]:
+        if not data:
+            return None
+        data = bytes(data)
+        digest = payload_hash(data)
+        if digest in self._known:
+            self._known.move_to_end(digest)
+        elif digest not in payloads:
+            compression, stored = encode_payload(data, self.compression)
+            payloads[digest] = (digest, compression, len(data), stored)
+        return digest
+
+    def _remember(self, digests) -> None:
+        known = self._known
+        for digest in digests:
+            known[digest] = None
+        while len(known) > self.known_payloads:
+            known.popitem(last=False)
+
+    def _write(self, items: Sequence[tuple]) -> None:
+        if not items:
+            return
+        payloads: dict = {}
+        rows = []
+        statements = []
+        for item in items:
+            if isinstance(item, _Statement):
+                statements.append(item)
+                continue
+            row, request, response = item
+            rows.append(row + (self._payload_ref(request, payloads), self._payload_ref(response, payloads)))
+        try:
+            with self._lock:
+                self.conn.execute("BEGIN")
+                if payloads:
+                    self.conn.executemany(self.PAYLOAD_SQL, payloads.values())
+                if rows:
+                    self.conn.executemany(self.INSERT_SQL, rows)
+                for statement in statements:
+                    self.conn.executemany(statement.sql, statement.params)
+                self.conn.execute("COMMIT")
+            self._remember(payloads)
+            self.written += len(rows)
+        except sqlite3.Error as e:
+            self.logger.error(f"Database storage error: {e}")
+            try:
+                with self._lock:
+                    self.conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+        finally:
+            for _ in items:
+                self._queue.task_done()
+
+    def execute(self, sql: str, params: Sequence = ()) -> list:
+        """
+        Run a read query on the shared connection and return rows as dicts.
+        """
+        with self._lock:
+            cursor = self.conn.execute(sql, params)
+            columns = [c[0] for c in cursor.description or ()]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def get_payload(self, digest: bytes) -> Optional[bytes]:
+        """
+        Return the decompressed payload stored under digest, if any.
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT compression, data FROM payloads WHERE hash = ?", (digest,)).fetchone()
+        return decode_payload(*row) if row else None
+
+    def query_history(self, operation: Optional[str] = None, start_date: Optional[str] = None,
+                      end_date: Optional[str] = None, imsi: Optional[str] = None, limit: int = 10,
+                      before: Optional[Tuple[str, int]] = None) -> List[dict]:
+        """
+        Return transactions newest first, one page at a time.
+
+        Pages are addressed with a keyset cursor instead of OFFSET: pass the
+        (timestamp, id) of the last row of a page as before to get the next
+        one, so every page is an index range scan regardless of depth.
+
+        Args:
+            operation: Operation name, e.g. "SRI" (a "MAP_" prefix is accepted)
+            start_date: Inclusive lower bound, ISO date or timestamp
+            end_date: Inclusive upper bound; a bare date covers the whole day
+            imsi: Exact IMSI to match
+            limit: Page size
+            before: (timestamp, id) cursor from the previous page
+        """
+        clauses = []
+        params: list = []
+        if operation:
+            operation = operation.upper()
+            if operation.startswith("MAP_"):
+                operation = operation[4:]
+            clauses.append("r.operation = ?")
+            params.append(operation)
+        if imsi:
+            clauses.append("r.imsi = ?")
+            params.append(imsi)
+        if start_date:
+            clauses.append("r.timestamp >= ?")
+            params.append(start_date)
+        if end_date:
+            clauses.append("r.timestamp <= ?")
+            params.append(end_date + "T23:59:59.999999" if len(end_date) == 10 else end_date)
+        if before:
+            clauses.append("(r.timestamp, r.id) < (?, ?)")
+            params.extend(before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (
+            f"SELECT {self.HISTORY_COLUMNS} FROM responses r {self.HISTORY_JOINS} {where} "
+            f"ORDER BY r.timestamp DESC, r.id DESC LIMIT ?"
+        )
+        params.append(int(limit))
+        rows = self.execute(sql, params)
+        for row in rows:
+            for kind in ("request", "response"):
+                compression = row.pop(f"{kind}_compression")
+                payload = row.pop(f"{kind}_payload")
+                if payload is not None:
+                    row[f"{kind}_data"] = decode_payload(compression, payload).hex()
+        return rows
+
+    @staticmethod
+    def next_cursor(rows: List[dict]) -> Optional[Tuple[str, int]]:
+        """
+        Keyset cursor for the page after rows, or None if rows is empty.
+        """
+        if not rows:
+            return None
+        return rows[-1]["timestamp"], rows[-1]["id"]
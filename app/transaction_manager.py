@@ -0,0 +1,239 @@
+# app/transaction_manager.py
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Optional, Set, Tuple
+
+
+class IdAllocator:
+    """
+    Recycling allocator for integer identifiers in [low, high].
+
+    Released identifiers are reused in FIFO order so that a late response
+    carrying a just-released ID is unlikely to match a new transaction.
+    Identifiers released with quarantine=True are held back for grace
+    seconds first. Allocation and release are O(1) and never materialize
+    the whole range.
+    """
+
+    def __init__(self, low: int = 0, high: int = 255, grace: float = 0.0):
+        if low > high:
+            raise ValueError("low must not exceed high")
+        self.low = low
+        self.high = high
+        self.grace = grace
+        self._next = low
+        self._free: Deque[int] = deque()
+        self._quarantine: Deque[Tuple[float, int]] = deque()
+        self._in_use: Set[int] = set()
+
+    @property
+    def capacity(self) -> int:
+        return self.high - self.low + 1
+
+    def allocate(self) -> int:
+        """
+        Allocate an unused identifier.
+
+        Raises:
+            RuntimeError: If every identifier in the range is in use or
+                quarantined (see retry_after)
+        """
+        self._requeue()
+        if self._free:
+            value = self._free.popleft()
+        elif self._next <= self.high:
+            value = self._next
+            self._next += 1
+        else:
+            raise RuntimeError(f"Identifier space {self.low}-{self.high} exhausted")
+        self._in_use.add(value)
+        return value
+
+    def release(self, value: int, quarantine: bool = False) -> None:
+        if value in self._in_use:
+            self._in_use.remove(value)
+            if quarantine and self.grace > 0:
+                self._quarantine.append((time.monotonic() + self.grace, value))
+            else:
+                self._free.append(value)
+
+    def retry_after(self) -> Optional[float]:
+        """
+        Seconds until allocate() can succeed: 0.0 if an identifier is free,
+        the time left until the oldest quarantined one comes back, or None
+        if every identifier is in use.
+        """
+        self._requeue()
+        if self._free or self._next <= self.high:
+            return 0.0
+        if self._quarantine:
+            return max(0.0, self._quarantine[0][0] - time.monotonic())
+        return None
+
+    def in_use(self) -> int:
+        return len(self._in_use)
+
+    def quarantined(self) -> int:
+        return len(self._quarantine)
+
+    def _requeue(self) -> None:
+        if not self._quarantine:
+            return
+        now = time.monotonic()
+        while self._quarantine and self._quarantine[0][0] <= now:
+            self._free.append(self._quarantine.popleft()[1])
+
+
+class Transaction:
+    """
+    Outstanding MAP operation awaiting its TCAP ReturnResultLast.
+    """
+    __slots__ = ("invoke_id", "operation", "future", "started", "context")
+
+    def __init__(self, invoke_id: int, operation: str, future, context: Optional[dict] = None):
+        self.invoke_id = invoke_id
+        self.operation = operation
+        self.future = future
+        self.started = time.monotonic()
+        self.context = context or {}
+
+
+class TransactionManager:
+    """
+    Table of outstanding transactions keyed by invoke ID.
+
+    Each begin() takes a fresh invoke ID and registers a waiter future;
+    incoming responses are routed back to their waiter by invoke ID in O(1),
+    so a single association can carry many pipelined requests. The ID of a
+    transaction that expired without an answer is quarantined for
+    reuse_grace seconds, so that a late response to it is dropped instead
+    of being matched to the next transaction given the same ID.
+    """
+
+    def __init__(self, invoke_id_low: int = 0, invoke_id_high: int = 255,
+                 future_factory: Callable[[], Any] = Future, reuse_grace: float = 2.0):
+        """
+        Initialize transaction manager.
+
+        Args:
+            invoke_id_low: Lowest invoke ID handed out
+            invoke_id_high: Highest invoke ID handed out (TCAP invoke IDs are one octet)
+            future_factory: Callable creating waiter futures, e.g. loop.create_future
+            reuse_grace: Seconds an expired transaction's invoke ID is held back
+        """
+        self.invoke_ids = IdAllocator(invoke_id_low, invoke_id_high, reuse_grace)
+        self.future_factory = future_factory
+        self._outstanding: Dict[int, Transaction] = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def capacity(self) -> int:
+        return self.invoke_ids.capacity
+
+    def __len__(self) -> int:
+        return len(self._outstanding)
+
+    def begin(self, operation: str, context: Optional[dict] = None) -> Transaction:
+        """
+        Register a new outstanding transaction with a unique invoke ID.
+
+        Raises:
+            RuntimeError: If all invoke IDs are in use or quarantined; with a
+                caller-side bound of capacity transactions in flight,
+                retry_after() then tells how long to wait
+        """
+        with self._lock:
+            invoke_id = self.invoke_ids.allocate()
+            txn = Transaction(invoke_id, operation, self.future_factory(), context)
+            self._outstanding[invoke_id] = txn
+        return txn
+
+    def begin_waiting(self, operation: str, context: Optional[dict] = None) -> Transaction:
+        """
+        begin(), sleeping while the only invoke IDs left are quarantined.
+        """
+        while True:
+            try:
+                return self.begin(operation, context)
+            except RuntimeError:
+                delay = self.retry_after()
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    def retry_after(self) -> Optional[float]:
+        with self._lock:
+            return self.invoke_ids.retry_after()
+
+    def get(self, invoke_id: int) -> Optional[Transaction]:
+        return self._outstanding.get(invoke_id)
+
+    def resolve(self, invoke_id: Optional[int], result: dict) -> bool:
+        """
+        Route a parsed response to the transaction waiting on invoke_id.
+
+        Returns:
+            True if a waiter was found, False for unsolicited or late responses
+        """
+        txn = self._pop(invoke_id)
+        if txn is None:
+            self.logger.warning(f"No outstanding transaction for invoke ID {invoke_id}")
+            return False
+        if not txn.future.done():
+            txn.future.set_result(result)
+        return True
+
+    def fail(self, invoke_id: int, exc: BaseException) -> bool:
+        txn = self._pop(invoke_id)
+        if txn is None:
+            return False
+        if not txn.future.done():
+            txn.future.set_exception(exc)
+        return True
+
+    def finish(self, invoke_id: int) -> None:
+        """
+        Drop a transaction without completing its waiter and free its ID.
+        """
+        self._pop(invoke_id)
+
+    def expire(self, invoke_id: int) -> bool:
+        """
+        Drop a transaction that got no answer (e.g. after a deadline) and
+        quarantine its invoke ID. A no-op for transactions already resolved.
+
+        Returns:
+            True if the transaction was still outstanding
+        """
+        return self._pop(invoke_id, quarantine=True) is not None
+
+    def fail_all(self, exc: BaseException) -> int:
+        """
+        Fail every outstanding transaction, e.g. when the association drops.
+        """
+        with self._lock:
+            pending = list(self._outstanding.values())
+            self._outstanding.clear()
+            for txn in pending:
+                self.invoke_ids.release(txn.invoke_id)
+        for txn in pending:
+            if not txn.future.done():
+                txn.future.set_exception(exc)
+        return len(pending)
+
+    def outstanding_ids(self) -> list:
+        with self._lock:
+            return list(self._outstanding)
+
+    def _pop(self, invoke_id: Optional[int], quarantine: bool = False) -> Optional[Transaction]:
+        if invoke_id is None:
+            return None
+        with self._lock:
+            txn = self._outstanding.pop(invoke_id, None)
+            if txn is not None:
+                self.invoke_ids.release(invoke_id, quarantine)
+        return txn
@@ -0,0 +1,288 @@
+#app/triage.py
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from app.corpus import Fingerprint, Target, fingerprint, fingerprint_key, write_atomic
+from app.fuzzer import Fuzzer
+
+PENDING = "pending"
+FLAKY = "flaky"
+MINIMIZED = "minimized"
+
+
+def anomaly(result: dict) -> Optional[str]:
+    """
+    Classify a Fuzzer.execute result.
+
+    Returns:
+        "reset", "closed" or "timeout" for a broken or silent association,
+        "garbage" for a response the parser could not make sense of, None
+        for a well-formed response
+    """
+    outcome = result.get("outcome", "response")
+    if outcome == "response":
+        return "garbage" if result.get("status") != "success" else None
+    return outcome
+
+
+class Finding:
+    __slots__ = ("key", "kind", "signature", "data", "reproducer", "status", "hits", "reproduced", "tests",
+                 "found_at")
+
+    def __init__(self, data: bytes, kind: str, signature: Fingerprint, found_at: Optional[float] = None):
+        self.key = fingerprint_key(signature)
+        self.kind = kind
+        self.signature = signature
+        self.data = data
+        self.reproducer: Optional[bytes] = None
+        self.status = PENDING
+        self.hits = 1
+        self.reproduced = 0
+        self.tests = 0
+        self.found_at = time.time() if found_at is None else found_at
+
+    def to_dict(self) -> dict:
+        return {"key": self.key, "kind": self.kind, "signature": list(self.signature), "status": self.status,
+                "size": len(self.data), "reproducer_size": len(self.reproducer) if self.reproducer is not None else None,
+                "hits": self.hits, "reproduced": self.reproduced, "tests": self.tests, "found_at": self.found_at}
+
+
+class Triage:
+    """
+    Collect anomalies seen while fuzzing, confirm them and shrink them.
+
+    Findings are deduplicated by the signature of the anomaly (see
+    app.corpus.fingerprint, without timing and coverage), which is also their key: later
+    inputs with a known signature only count as hits. process() replays
+    every pending finding, and the reproducible ones are reduced with
+    delta debugging (ddmin) down to an input where removing any single
+    chunk loses the anomaly. Candidates are tested over a pool of
+    associations in parallel and several findings are minimized at once.
+
+    With a path, findings live in a directory: inputs/<key>.bin holds the
+    captured input, reproducers/<key>.bin the minimized one and
+    findings.jsonl one line per finding.
+    """
+
+    INDEX = "findings.jsonl"
+    INPUTS = "inputs"
+    REPRODUCERS = "reproducers"
+
+    def __init__(self, target: Target, path: Optional[str] = None, workers: int = 4, timeout: float = 0.5,
+                 replays: int = 3, max_tests: int = 1000,
+                 client_factory: Optional[Callable[[str, int, str, float], object]] = None):
+        """
+        Initialize triage.
+
+        Args:
+            target: (ip, port, protocol) to replay against
+            path: Findings directory, created if missing; None keeps them in memory
+            workers: Parallel associations
+            timeout: Seconds to wait for each response
+            replays: Replays that must all show the anomaly to confirm it
+            max_tests: Most candidate inputs tested while minimizing one finding
+            client_factory: Passed to Fuzzer
+        """
+        self.target = target
+        self.path = path
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.replays = max(1, replays)
+        self.max_tests = max_tests
+        self.client_factory = client_factory
+        self.findings: Dict[str, Finding] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._fuzzers: List[Fuzzer] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.logger = logging.getLogger(__name__)
+        if path:
+            for directory in (self.INPUTS, self.REPRODUCERS):
+                os.makedirs(os.path.join(path, directory), exist_ok=True)
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self.findings)
+
+    def _file(self, directory: str, key: str) -> str:
+        return os.path.join(self.path, directory, f"{key}.bin")
+
+    def _load(self) -> None:
+        index = os.path.join(self.path, self.INDEX)
+        if not os.path.exists(index):
+            return
+        with open(index) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    with open(self._file(self.INPUTS, record["key"]), "rb") as data:
+                        finding = Finding(data.read(), record["kind"], tuple(record["signature"]), record.get("found_at"))
+                    if record.get("reproducer_size") is not None:
+                        with open(self._file(self.REPRODUCERS, record["key"]), "rb") as data:
+                            finding.reproducer = data.read()
+                except (OSError, ValueError, KeyError) as e:
+                    self.logger.warning(f"Skipping finding {line.strip()[:80]}: {e}")
+                    continue
+                finding.status = record.get("status", PENDING)
+                finding.hits = record.get("hits", 1)
+                finding.reproduced = record.get("reproduced", 0)
+                finding.tests = record.get("tests", 0)
+                self.findings[finding.key] = finding
+        self.logger.info(f"Loaded {len(self.findings)} findings from {self.path}")
+
+    def capture(self, packet, result: dict) -> bool:
+        """
+        Record the input behind result if result is an anomaly.
+
+        Args:
+            packet: The input (bytes, bytearray or memoryview; copied if kept)
+            result: Its Fuzzer.execute result
+
+        Returns:
+            True if this is a new finding
+        """
+        kind = anomaly(result)
+        if kind is None:
+            return False
+        signature = fingerprint(result, timing=False, coverage=False)
+        key = fingerprint_key(signature)
+        with self._lock:
+            finding = self.findings.get(key)
+            if finding is not None:
+                finding.hits += 1
+                if finding.status == PENDING and len(packet) < len(finding.data):
+                    finding.data = bytes(packet)
+                return False
+            finding = Finding(bytes(packet), kind, signature)
+            self.findings[key] = finding
+        self.logger.info(f"New {kind} finding {key} ({len(finding.data)} bytes)")
+        return True
+
+    def pending(self) -> List[Finding]:
+        with self._lock:
+            return [finding for finding in self.findings.values() if finding.status == PENDING]
+
+    def process(self) -> dict:
+        """
+        Confirm and minimize all pending findings.
+
+        Returns:
+            {"processed", "minimized", "flaky", "tests", "bytes_before",
+            "bytes_after", "elapsed_s"}
+        """
+        started = time.perf_counter()
+        findings = self.pending()
+        if findings:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ss7-triage")
+            try:
+                # one coordinating thread per finding in flight; the replays
+                # themselves run on the shared pool of associations
+                with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ss7-ddmin") as coordinators:
+                    list(coordinators.map(self._triage, findings))
+            finally:
+                self._executor.shutdown()
+                self._executor = None
+                with self._lock:
+                    fuzzers, self._fuzzers = self._fuzzers, []
+                self._local = threading.local()
+                for fuzzer in fuzzers:
+                    fuzzer.close()
+            if self.path:
+                self.save()
+        minimized = [finding for finding in findings if finding.status == MINIMIZED]
+        summary = {
+            "processed": len(findings),
+            "minimized": len(minimized),
+            "flaky": sum(1 for finding in findings if finding.status == FLAKY),
+            "tests": sum(finding.tests for finding in findings),
+            "bytes_before": sum(len(finding.data) for finding in minimized),
+            "bytes_after": sum(len(finding.reproducer) for finding in minimized),
+            "elapsed_s": round(time.perf_counter() - started, 3)
+        }
+        self.logger.info(f"Triage finished: {summary}")
+        return summary
+
+    def _test(self, packet: bytes) -> Fingerprint:
+        fuzzer = getattr(self._local, "fuzzer", None)
+        if fuzzer is None:
+            fuzzer = Fuzzer(None, *self.target, timeout=self.timeout, client_factory=self.client_factory)
+            self._local.fuzzer = fuzzer
+            with self._lock:
+                self._fuzzers.append(fuzzer)
+        return fingerprint(fuzzer.execute(packet), timing=False)
+
+    def _signatures(self, packets: Sequence[bytes]) -> List[Fingerprint]:
+        return list(self._executor.map(self._test, packets))
+
+    def _triage(self, finding: Finding) -> None:
+        try:
+            finding.reproduced = self._signatures([finding.data] * self.replays).count(finding.signature)
+            finding.tests = self.replays
+            if finding.reproduced < self.replays:
+                finding.status = FLAKY
+                self.logger.info(f"Finding {finding.key} reproduced {finding.reproduced}/{self.replays} times")
+                return
+            finding.reproducer, tests = self._ddmin(finding.data, finding.signature)
+            finding.tests += tests
+            finding.status = MINIMIZED
+            self.logger.info(f"Finding {finding.key} minimized from {len(finding.data)} to "
+                             f"{len(finding.reproducer)} bytes in {tests} tests")
+        except Exception as e:
+            self.logger.error(f"Triage of finding {finding.key} failed: {e}")
+
+    def _ddmin(self, data: bytes, signature: Fingerprint) -> Tuple[bytes, int]:
+        """
+        Shrink data while the target keeps answering with signature.
+
+        Each round splits the input into n chunks and tests every chunk and
+        every complement in parallel; the first one that still reproduces
+        becomes the input. Otherwise n doubles until chunks are single
+        bytes. Tested inputs are cached, and at most max_tests are tried.
+
+        Args:
+            data: Input known to reproduce signature
+            signature: Fingerprint to preserve
+
+        Returns:
+            (smallest reproducing input found, number of inputs tested)
+        """
+        cache: Dict[bytes, bool] = {}
+        n = 2
+        while len(data) >= 2 and len(cache) < self.max_tests:
+            size = len(data)
+            bounds = [size * i // n for i in range(n + 1)]
+            candidates = [data[bounds[i]:bounds[i + 1]] for i in range(n)]
+            if n > 2:
+                candidates += [data[:bounds[i]] + data[bounds[i + 1]:] for i in range(n)]
+            todo = [candidate for candidate in dict.fromkeys(candidates) if candidate not in cache]
+            todo = todo[:self.max_tests - len(cache)]
+            for candidate, value in zip(todo, self._signatures(todo)):
+                cache[candidate] = value == signature
+            index = next((i for i, candidate in enumerate(candidates) if cache.get(candidate)), None)
+            if index is not None:
+                data = candidates[index]
+                n = 2 if index < n else max(n - 1, 2)
+            elif n >= size:
+                break
+            else:
+                n = min(2 * n, size)
+        return data, len(cache)
+
+    def save(self) -> None:
+        """
+        Write inputs, reproducers and the index to the findings directory.
+        """
+        with self._lock:
+            findings = sorted(self.findings.values(), key=lambda finding: finding.found_at)
+        for finding in findings:
+            write_atomic(self._file(self.INPUTS, finding.key), finding.data)
+            if finding.reproducer is not None:
+                write_atomic(self._file(self.REPRODUCERS, finding.key), finding.reproducer)
+        index = "".join(json.dumps(finding.to_dict()) + "\n" for finding in findings)
+        write_atomic(os.path.join(self.path, self.INDEX), index.encode())
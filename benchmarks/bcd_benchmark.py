@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# benchmarks/bcd_benchmark.py
+"""
+Compare the scalar BCD codec (encode_bcd/decode_bcd per number) with the
+batch codec (encode_bcd_batch/decode_bcd_batch on one buffer), using numpy
+when it is installed and the pure-Python lookup tables otherwise.
+
+    python benchmarks/bcd_benchmark.py [--count 100000] [--runs 5] [--json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.encoding.bcd import _numpy, decode_bcd, decode_bcd_batch, encode_bcd, encode_bcd_batch  # noqa: E402
+
+LENGTH = 15
+WIDTH = (LENGTH + 1) // 2
+
+
+def best_of(func, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BCD codec benchmark")
+    parser.add_argument("--count", type=int, default=100000, help="Numbers per batch")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    numbers = [f"{rng.randrange(10 ** LENGTH):0{LENGTH}d}" for _ in range(args.count)]
+    encoded = [encode_bcd(number) for number in numbers]
+    buffer = b"".join(encoded)
+    assert encode_bcd_batch(numbers, LENGTH, use_numpy=False) == buffer
+    assert decode_bcd_batch(buffer, WIDTH, use_numpy=False) == numbers
+
+    cases = {
+        "encode scalar": lambda: [encode_bcd(number) for number in numbers],
+        "encode batch (tables)": lambda: encode_bcd_batch(numbers, LENGTH, use_numpy=False),
+        "decode scalar": lambda: [decode_bcd(data) for data in encoded],
+        "decode batch (tables)": lambda: decode_bcd_batch(buffer, WIDTH, use_numpy=False),
+    }
+    if _numpy(None) is not None:
+        cases["encode batch (numpy)"] = lambda: encode_bcd_batch(numbers, LENGTH, use_numpy=True)
+        cases["decode batch (numpy)"] = lambda: decode_bcd_batch(buffer, WIDTH, use_numpy=True)
+
+    results = {}
+    for name, func in cases.items():
+        seconds = best_of(func, args.runs)
+        results[name] = {"ns_per_number": round(seconds / args.count * 1e9, 1),
+                         "numbers_per_s": round(args.count / seconds)}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'Case':<24}{'ns/number':>11}{'numbers/s':>14}")
+    for name, result in results.items():
+        print(f"{name:<24}{result['ns_per_number']:>11}{result['numbers_per_s']:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# benchmarks/scheduler_benchmark.py
+"""
+Compare fuzzing schedules by the number of distinct response signatures
+(app.corpus.fingerprint without timing) found in a fixed number of
+executions against tests/mock_ss7_server.py.
+
+By default the mock server runs in-process (LoopbackClient), so silent
+cases cost no timeout; --target sends to a running server instead, e.g.
+one started with `python -m tests.mock_ss7_server --port 2905`. New
+signatures go into a corpus and become seeds, as with `fuzz --corpus`.
+With --coverage the in-process server records edge coverage and cases
+reaching new edges count as new too, as with `fuzz --coverage-listen`.
+
+    python benchmarks/scheduler_benchmark.py [--executions 10000] [--runs 3]
+        [--policies uniform,ucb,thompson] [--target 127.0.0.1:2905] [--coverage] [--json]
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.corpus import Corpus, fingerprint  # noqa: E402
+from app.coverage import CoverageChannel  # noqa: E402
+from app.fuzzer import Fuzzer, Mutator, seed_packets  # noqa: E402
+from app.scheduler import PowerScheduler  # noqa: E402
+from tests.mock_ss7_server import LoopbackClient  # noqa: E402
+
+
+def run_once(policy: str, seed: int, executions: int, target, timeout: float, use_corpus: bool,
+             use_coverage: bool) -> dict:
+    mutator = Mutator(seed_packets("123456789012345", "9876543210", "1234567890", "1234567890", 6), seed=seed)
+    scheduler = PowerScheduler(mutator, policy, seed=seed) if policy != "uniform" else None
+    coverage = CoverageChannel(None) if use_coverage else None
+    ip, port = target or ("127.0.0.1", 0)
+    fuzzer = Fuzzer(mutator, ip, port, "TCP", timeout=timeout, corpus=Corpus(timing=False) if use_corpus else None,
+                    scheduler=scheduler, coverage=coverage,
+                    client_factory=None if target else functools.partial(LoopbackClient, coverage=coverage))
+    signatures = set()
+    try:
+        summary = fuzzer.run(executions, callback=lambda case, result: signatures.add(
+            fingerprint(result, timing=False, coverage=False)))
+    finally:
+        fuzzer.close()
+    return {"signatures": len(signatures), "edges": summary["edges"], "rate_per_s": summary["rate_per_s"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzing scheduler benchmark")
+    parser.add_argument("--executions", type=int, default=10000, help="Executions per run")
+    parser.add_argument("--runs", type=int, default=3, help="Runs (random seeds) per policy")
+    parser.add_argument("--policies", default="uniform,ucb,thompson")
+    parser.add_argument("--target", help="ip:port of a running mock server (default: in-process)")
+    parser.add_argument("--timeout", type=float, default=0.02, help="Response timeout with --target")
+    parser.add_argument("--no-corpus", action="store_true", help="Keep the seed set fixed")
+    parser.add_argument("--coverage", action="store_true", help="Guide by edge coverage of the in-process server too")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    # the mock server logs every request at DEBUG
+    logging.disable(logging.CRITICAL)
+
+    if args.coverage and args.target:
+        parser.error("--coverage needs the in-process server")
+    target = None
+    if args.target:
+        host, port = args.target.rsplit(":", 1)
+        target = (host, int(port))
+    results = {}
+    for policy in args.policies.split(","):
+        started = time.perf_counter()
+        runs = [run_once(policy, seed, args.executions, target, args.timeout, not args.no_corpus, args.coverage)
+                for seed in range(args.runs)]
+        counts = [run["signatures"] for run in runs]
+        results[policy] = {
+            "signatures_mean": round(statistics.mean(counts), 1),
+            "signatures_min": min(counts),
+            "signatures_max": max(counts),
+            "edges_mean": round(statistics.mean(run["edges"] for run in runs), 1) if args.coverage else None,
+            "executions_per_s": round(statistics.mean(run["rate_per_s"] for run in runs)),
+            "elapsed_s": round(time.perf_counter() - started, 1)
+        }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"Distinct signatures per {args.executions} executions ({args.runs} runs)")
+    print(f"{'Policy':<10}{'Mean':>8}{'Min':>6}{'Max':>6}{'Edges':>8}{'exec/s':>9}")
+    for policy, result in results.items():
+        print(f"{policy:<10}{result['signatures_mean']:>8}{result['signatures_min']:>6}{result['signatures_max']:>6}"
+              f"{result['edges_mean'] or '-':>8}{result['executions_per_s']:>9}")
+
+
+if __name__ == "__main__":
+    main()
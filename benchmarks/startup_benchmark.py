@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# benchmarks/startup_benchmark.py
+"""
+Measure interpreter startup cost of the tool's entry points.
+
+Every case runs in a fresh interpreter, so the numbers include module
+imports exactly as a one-shot `main.py sri ...` call or a newly spawned
+worker process pays them. Each case also reports whether scapy ended up
+imported, which is what most of the startup time used to go into.
+
+    python benchmarks/startup_benchmark.py [--runs 10] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "python": "pass",
+    "validators+bcd": "import utils.validators, utils.encoding.bcd",
+    "fast_codec": "import utils.protocols.fast_codec",
+    "app.core": "import app.core",
+    "cli": "import main, cli.ui",
+    "ss7_layers": "import utils.protocols.ss7_layers",
+    "scapy.all": "import scapy.all",
+}
+
+PROBE = "import sys; {code}; print(int(any(m == 'scapy' or m.startswith('scapy.') for m in sys.modules)))"
+
+
+def run_case(code: str, runs: int) -> dict:
+    timings = []
+    scapy_loaded = False
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(code=code)],
+            cwd=ROOT, check=True, capture_output=True, text=True
+        ).stdout
+        timings.append((time.perf_counter() - started) * 1000.0)
+        scapy_loaded = output.strip().endswith("1")
+    return {
+        "median_ms": round(statistics.median(timings), 1),
+        "min_ms": round(min(timings), 1),
+        "scapy": scapy_loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time benchmark")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = {name: run_case(code, args.runs) for name, code in CASES.items()}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'Case':<16}{'Median ms':>11}{'Min ms':>10}  scapy")
+    for name, result in results.items():
+        print(f"{name:<16}{result['median_ms']:>11}{result['min_ms']:>10}  {'yes' if result['scapy'] else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -105,21 +105,49 @@ Type 'help' for available commands or 'exit' to quit.
             print(f"❌ Error: {e}")
 
     def do_history(self, arg: str) -> None:
-        """View transaction history: history [--operation <op>] [--start-date <date>] [--end-date <date>] [--limit <limit>]"""
+        """View transaction history: history [--operation <op>] [--imsi <imsi>] [--start-date <date>] [--end-date <date>] [--limit <limit>] [--before <timestamp,id>]"""
         try:
-            args = self._parse_args(arg, [], ["operation", "start-date", "end-date", "limit"])
-            limit = int(args.limit) if hasattr(args, "limit") and args.limit else 10
+            args = self._parse_args(arg, [], ["operation", "imsi", "start-date", "end-date", "limit", "before"])
+            limit = int(args.limit) if args.limit else 10
             history = self.core.get_filtered_history(
-                operation=args.operation if hasattr(args, "operation") else None,
-                start_date=args.start_date if hasattr(args, "start-date") else None,
-                end_date=args.end_date if hasattr(args, "end-date") else None,
-                limit=limit
+                operation=args.operation,
+                start_date=args.start_date,
+                end_date=args.end_date,
+                limit=limit,
+                imsi=args.imsi,
+                before=self.parse_cursor(args.before)
             )
-            self.display_history(history)
+            self.display_history(history, limit)
         except Exception as e:
             self.logger.error(f"History error: {e}")
             print(f"❌ Error: {e}")
 
+    def do_stats(self, arg: str) -> None:
+        """Show per-stage latency statistics for this session: stats [--operation <op>] [--output <json file>] [--reset]"""
+        try:
+            parser = argparse.ArgumentParser(prog="stats", add_help=False)
+            parser.add_argument("--operation")
+            parser.add_argument("--output")
+            parser.add_argument("--reset", action="store_true")
+            args = parser.parse_args(shlex.split(arg))
+            stats = self.core.dump_stats(args.output) if args.output else self.core.get_stats()
+            self.display_stats(stats, args.operation)
+            if args.output:
+                print(f"Statistics written to {args.output}")
+            if args.reset:
+                self.core.metrics.reset()
+        except Exception as e:
+            self.logger.error(f"Stats error: {e}")
+            print(f"❌ Error: {e}")
+
+    @staticmethod
+    def parse_cursor(value: Optional[str]):
+        """Parse a 'timestamp,id' keyset cursor as printed by display_history."""
+        if not value:
+            return None
+        timestamp, _, row_id = value.rpartition(",")
+        return timestamp, int(row_id)
+
     def do_exit(self, arg: str) -> bool:
         """Exit the CLI"""
         print("Exiting...")
@@ -133,7 +161,8 @@ Type 'help' for available commands or 'exit' to quit.
             parser.add_argument(f"--{opt}")
         return parser.parse_args(shlex.split(arg))
 
-    def _print_response(self, response: dict) -> None:
+    @staticmethod
+    def _print_response(response: dict) -> None:
         if response.get("status") == "success":
             params = response.get("params", {})
             print("\nResponse:")
@@ -144,11 +173,13 @@ Type 'help' for available commands or 'exit' to quit.
         else:
             print(f"❌ Error: {response.get('message', 'Unknown error')}")
 
-    def display_result(self, response: dict) -> None:
+    @staticmethod
+    def display_result(response: dict) -> None:
         """Display response for main.py compatibility."""
-        self._print_response(response)
+        SS7CLI._print_response(response)
 
-    def display_history(self, history: list) -> None:
+    @staticmethod
+    def display_history(history: list, limit: Optional[int] = None) -> None:
         """Display transaction history for main.py compatibility."""
         if not history:
             print("No transactions found.")
@@ -156,13 +187,76 @@ Type 'help' for available commands or 'exit' to quit.
         print("\nRecent Transactions:")
         print("-" * 80)
         for tx in history:
-            print(f"ID: {tx['id']} | Time: {tx['timestamp']} | Operation: {tx['operation']}")
+            print(f"ID: {tx['id']} | Time: {tx['timestamp'] or 'N/A'} | Operation: {tx['operation']}")
             print(f"IMSI: {tx['imsi']} | MSISDN: {tx['msisdn'] or 'N/A'} | VLR GT: {tx['vlr_gt'] or 'N/A'}")
             print(f"Target: {tx['target_ip']}:{tx['target_port']} | SSN: {tx['ssn']} | GT: {tx['gt'] or 'N/A'}")
-            print(f"Status: {tx['status']} | Invoke ID: {tx['invoke_id'] or 'N/A'} | Opcode: {tx['opcode'] or 'N/A'}")
-            print(f"Request Hex: {tx['request_data'][:10]}...")
-            print(f"Response Hex: {tx['response_data'][:10]}...")
+            print(f"Status: {tx['status']} | Invoke ID: {'N/A' if tx['invoke_id'] is None else tx['invoke_id']} | Opcode: {'N/A' if tx['opcode'] is None else tx['opcode']} | RTT: {tx['rtt_ms'] or 'N/A'} ms")
+            print(f"Request Hex: {(tx['request_data'] or '')[:10]}...")
+            print(f"Response Hex: {(tx['response_data'] or '')[:10]}...")
             print("-" * 80)
+        if limit and len(history) >= limit and history[-1]['timestamp'] is not None:
+            print(f"Next page: --before {history[-1]['timestamp']},{history[-1]['id']}")
+
+    def display_campaign_progress(self, summary: dict) -> None:
+        """Print a one-line campaign progress update."""
+        print(f"\r{summary['completed']}/{summary['total']} requests | {summary.get('rate_per_s', 0.0)} req/s", end="", flush=True)
+
+    def display_campaign(self, summary: dict) -> None:
+        """Display a campaign summary as returned by CampaignRunner.run."""
+        print("\n\nCampaign Summary:")
+        print("-" * 40)
+        if summary.get("campaign_id") is not None:
+            print(f"Campaign ID: {summary['campaign_id']}" + (f" (resumed at {summary['resumed']})" if summary.get("resumed") else ""))
+        print(f"Completed: {summary['completed']}/{summary['total']} in {summary.get('elapsed_s', 0.0)}s ({summary.get('rate_per_s', 0.0)} req/s)")
+        for status, count in sorted(summary["by_status"].items()):
+            print(f"{status.upper()}: {count}")
+        for operation, statuses in sorted(summary["by_operation"].items()):
+            print(f"{operation}: " + ", ".join(f"{status} {count}" for status, count in sorted(statuses.items())))
+        print("-" * 40)
+
+    def display_fuzz(self, summary: dict) -> None:
+        """Display a fuzzing summary as returned by Fuzzer.run or Fuzzer.feed."""
+        print("\nFuzzing Summary:")
+        print("-" * 40)
+        print(f"Executions: {summary['executions']} in {summary['elapsed_s']}s ({summary['rate_per_s']} cases/s)")
+        for outcome, count in sorted(summary["outcomes"].items()):
+            print(f"{outcome.upper()}: {count}")
+        if summary.get("by_status"):
+            print("Responses: " + ", ".join(f"{status} {count}" for status, count in sorted(summary["by_status"].items())))
+        if summary.get("signatures") is not None:
+            print(f"Distinct response signatures: {summary['signatures']}")
+        if summary.get("edges") is not None:
+            print(f"Edges covered on the target: {summary['edges']}")
+        if summary.get("corpus") is not None:
+            print(f"Corpus: {summary['corpus']} inputs ({summary['new_inputs']} new)")
+        if summary.get("triage"):
+            t = summary["triage"]
+            print(f"Triage: {t['minimized']} minimized, {t['flaky']} flaky of {t['processed']} findings, "
+                  f"{t['bytes_before']} -> {t['bytes_after']} bytes in {t['tests']} replays ({t['elapsed_s']}s)")
+        print("-" * 40)
+
+    def display_stats(self, stats: Optional[dict], operation: Optional[str] = None) -> None:
+        """Display a Metrics snapshot as one row per operation, target and stage."""
+        operations = (stats or {}).get("operations") or {}
+        if operation:
+            operation = operation.upper()
+            operation = operation[4:] if operation.startswith("MAP_") else operation
+            operations = {operation: operations[operation]} if operation in operations else {}
+        if not operations:
+            print("No statistics recorded.")
+            return
+        print(f"\nLatency statistics (ms) since {stats.get('started_at')}:")
+        print("-" * 96)
+        print(f"{'Operation':<10}{'Target':<26}{'Stage':<9}{'Count':>8}{'Mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'Max':>9}")
+        print("-" * 96)
+        for op, targets in operations.items():
+            for target, stages in targets.items():
+                for stage, s in stages.items():
+                    if not s.get("count"):
+                        continue
+                    print(f"{op:<10}{target:<26}{stage:<9}{s['count']:>8}{s['mean_ms']:>9.3f}"
+                          f"{s['p50_ms']:>9.3f}{s['p90_ms']:>9.3f}{s['p99_ms']:>9.3f}{s['max_ms']:>9.3f}")
+        print("-" * 96)
 
     def do_help(self, arg: str) -> None:
         """Show help for commands"""
@@ -173,6 +267,7 @@ Type 'help' for available commands or 'exit' to quit.
         print("ul: Update Location query")
         print("psi: Provide Subscriber Info query")
         print("history: View transaction history")
+        print("stats: Show per-stage latency statistics")
         print("exit: Exit the CLI")
         print("-" * 40)
         print("Use '<command> --help' for specific command options.")
@@ -2,11 +2,12 @@
 # main.py
 #!/usr/bin/env python3
 import argparse
+import json
 import logging
 import os
-from app.core import SS7Core
-from cli.ui import SS7CLI
-from app.config_manager import ConfigManager
+import signal
+import sys
+from app.daemon import DaemonClient, DaemonError, SS7Daemon
 
 logging.basicConfig(
     filename="logs/ss7_tool.log",
@@ -14,8 +15,23 @@ logging.basicConfig(
     format="%(asctime)s %(levelname)s: %(message)s"
 )
 
+def add_range_arguments(parser, required: bool) -> None:
+    parser.add_argument("--operation", choices=["SRI", "ATI", "UL", "PSI"], type=str.upper, required=required)
+    parser.add_argument("--imsi", required=required, help="IMSI range FIRST:COUNT")
+    parser.add_argument("--mnc-length", type=int, choices=[2, 3], default=2)
+    parser.add_argument("--msisdn", help="MSISDN range FIRST:COUNT (SRI)")
+    parser.add_argument("--vlr-gt", help="VLR GT range FIRST:COUNT (UL)")
+    parser.add_argument("--stride", type=int, default=1, help="Step between IMSIs")
+    parser.add_argument("--seed", type=int, help="Visit the IMSI range in a random order from this seed")
+    parser.add_argument("--shard", default="0/1", help="Produce only share i of n, as i/n")
+    parser.add_argument("--dedup", action="store_true", help="Drop repeated IMSIs with a Bloom filter")
+
 def parse_args():
     parser = argparse.ArgumentParser(description="SS7 Security Research Tool")
+    parser.add_argument("--socket", help="Daemon socket path (default: $SS7_DAEMON_SOCKET or a per-user temp path)")
+    parser.add_argument("--no-daemon", action="store_true", help="Run in-process even if a daemon is running")
+    parser.add_argument("--dump-stats", action="store_true",
+                        help="Write latency statistics at exit (always on for batch, campaign and worker)")
     subparsers = parser.add_subparsers(dest="command")
 
     sri_parser = subparsers.add_parser("sri", help="Send Routing Info query")
@@ -54,16 +70,208 @@ def parse_args():
 
     history_parser = subparsers.add_parser("history", help="View transaction history")
     history_parser.add_argument("--operation")
+    history_parser.add_argument("--imsi")
     history_parser.add_argument("--start-date")
     history_parser.add_argument("--end-date")
     history_parser.add_argument("--limit", type=int, default=10)
+    history_parser.add_argument("--before", help="Keyset cursor 'timestamp,id' printed at the end of the previous page")
+
+    campaign_parser = subparsers.add_parser("campaign", help="Run a sharded multi-process campaign")
+    campaign_parser.add_argument("--resume", type=int, metavar="ID", help="Resume an interrupted campaign from its last checkpoint")
+    campaign_parser.add_argument("--imsi-start", help="First IMSI of the range")
+    campaign_parser.add_argument("--count", type=int, help="Number of requests")
+    campaign_parser.add_argument("--operations", default="SRI", help="Operation mix, e.g. SRI=3,ATI=1")
+    campaign_parser.add_argument("--target", action="append", help="ip:port[/SCTP|TCP], repeatable")
+    campaign_parser.add_argument("--ssn", type=int)
+    campaign_parser.add_argument("--gt")
+    campaign_parser.add_argument("--msisdn-start", help="First MSISDN for SRI requests")
+    campaign_parser.add_argument("--vlr-gt", help="VLR GT for UL requests")
+    campaign_parser.add_argument("--protocol", choices=["SCTP", "TCP"], default="SCTP", help="Protocol for targets without one")
+    campaign_parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    campaign_parser.add_argument("--shard-size", type=int, default=500, help="Requests per shard, or per lease with --listen")
+    campaign_parser.add_argument("--listen", help="host:port to hand the campaign out to remote workers instead of local processes")
+    campaign_parser.add_argument("--lease-timeout", type=float, default=30.0, help="Seconds before a silent worker's lease is reassigned")
+
+    worker_parser = subparsers.add_parser("worker", help="Run leases of a remote campaign coordinator")
+    worker_parser.add_argument("--coordinator", required=True, help="Coordinator host:port")
+    worker_parser.add_argument("--name", help="Worker name (default: hostname)")
+
+    batch_parser = subparsers.add_parser("batch", help="Run requests from a JSONL or CSV file, or for IMSI/MSISDN/GT ranges")
+    batch_parser.add_argument("--input", help="JSONL or CSV request file, '-' for stdin")
+    batch_parser.add_argument("--output", default="-", help="JSONL or CSV result file, '-' for stdout")
+    batch_parser.add_argument("--input-format", choices=["jsonl", "csv"], help="Default: from the file extension")
+    batch_parser.add_argument("--output-format", choices=["jsonl", "csv"], help="Default: from the file extension")
+    batch_parser.add_argument("--workers", type=int, default=8, help="Concurrent requests")
+    batch_parser.add_argument("--unordered", action="store_true", help="Write results in completion order")
+    # instead of --input: requests made in-process, sent without per-request validation and encoding
+    add_range_arguments(batch_parser, required=False)
+
+    generate_parser = subparsers.add_parser("generate", help="Write batch requests for IMSI/MSISDN/GT ranges as JSONL")
+    add_range_arguments(generate_parser, required=True)
+    generate_parser.add_argument("--output", default="-", help="JSONL file, '-' for stdout")
+
+    fuzz_parser = subparsers.add_parser("fuzz", help="Send mutated requests to a target")
+    fuzz_parser.add_argument("--target", required=True, help="ip:port[/SCTP|TCP]")
+    fuzz_parser.add_argument("--protocol", choices=["SCTP", "TCP"], default="SCTP", help="Protocol if --target has none")
+    fuzz_parser.add_argument("--operations", default="SRI,ATI,UL,PSI", help="Requests to use as seeds")
+    fuzz_parser.add_argument("--count", type=int, default=1000, help="Number of test cases")
+    fuzz_parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed replays the same cases")
+    fuzz_parser.add_argument("--max-stack", type=int, default=4, help="Most mutations applied to one case")
+    fuzz_parser.add_argument("--timeout", type=float, default=0.5, help="Seconds to wait for each response")
+    fuzz_parser.add_argument("--no-wait", action="store_true", help="Send cases back to back without waiting for responses")
+    fuzz_parser.add_argument("--schedule", choices=["uniform", "ucb", "thompson"], default="uniform",
+                             help="How seeds and operators are chosen: uniformly, or by a bandit rewarding new response signatures")
+    fuzz_parser.add_argument("--corpus", help="Directory keeping one input per distinct response signature")
+    fuzz_parser.add_argument("--minimize-every", type=int, default=0, help="Minimize the corpus every N cases")
+    fuzz_parser.add_argument("--workers", type=int, default=4, help="Parallel associations for corpus minimization and triage")
+    fuzz_parser.add_argument("--coverage-listen", metavar="[HOST:]PORT",
+                             help="Receive per-request coverage on this UDP address from a mock server started with --coverage-to")
+    fuzz_parser.add_argument("--triage", help="Directory for confirmed, minimized reproducers of resets, timeouts and garbage")
+    fuzz_parser.add_argument("--replays", type=int, default=3, help="Replays confirming a finding before it is minimized")
+    fuzz_parser.add_argument("--ssn", type=int)
+    fuzz_parser.add_argument("--gt")
+    fuzz_parser.add_argument("--imsi")
+    fuzz_parser.add_argument("--msisdn")
+    fuzz_parser.add_argument("--vlr-gt")
+
+    stats_parser = subparsers.add_parser("stats", help="Show latency statistics dumped by the last bulk run")
+    stats_parser.add_argument("--operation")
+    stats_parser.add_argument("--input", help="Statistics JSON file (default: metrics.dump_path from config)")
+    stats_parser.add_argument("--json", action="store_true", help="Print the raw JSON")
+
+    daemon_parser = subparsers.add_parser("daemon", help="Keep the core warm and serve CLI calls over a Unix socket")
+    daemon_parser.add_argument("--stop", action="store_true", help="Stop the running daemon")
 
     subparsers.add_parser("interactive", help="Start interactive CLI")
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.command == "campaign" and args.resume is None:
+        missing = [option for option, value in (("--imsi-start", args.imsi_start), ("--count", args.count),
+                   ("--target", args.target), ("--ssn", args.ssn), ("--gt", args.gt)) if value is None]
+        if missing:
+            campaign_parser.error(f"the following arguments are required without --resume: {', '.join(missing)}")
+    if args.command == "batch":
+        if (args.input is None) == (args.imsi is None):
+            batch_parser.error("give either --input or --imsi")
+        if args.imsi is not None and args.operation is None:
+            batch_parser.error("--imsi needs --operation")
+    return args
+
+SEND_FIELDS = {
+    "sri": ("imsi", "msisdn"),
+    "ati": ("imsi",),
+    "ul": ("imsi", "vlr_gt"),
+    "psi": ("imsi",),
+}
+
+def cli_api_key():
+    """
+    API key from SS7_API_KEY or the config, as used by the in-process core.
+    """
+    from app.config_manager import ConfigManager
+    return os.getenv("SS7_API_KEY") or ConfigManager().api_key
+
+def forward(args) -> bool:
+    """
+    Run a one-shot command on a running daemon.
+
+    Returns False, before anything heavy is imported, if the command has to
+    run in-process instead.
+    """
+    if args.no_daemon or (args.command not in SEND_FIELDS and args.command != "history"):
+        return False
+    client = DaemonClient(args.socket, api_key=cli_api_key())
+    if not client.available():
+        return False
+    from cli.ui import SS7CLI
+    with client:
+        try:
+            if args.command == "history":
+                cursor = SS7CLI.parse_cursor(args.before)
+                history = client.call(
+                    "history",
+                    operation=args.operation,
+                    start_date=args.start_date,
+                    end_date=args.end_date,
+                    limit=args.limit,
+                    imsi=args.imsi,
+                    before=list(cursor) if cursor else None
+                )
+                SS7CLI.display_history(history, args.limit)
+            else:
+                spec = {field: getattr(args, field) for field in SEND_FIELDS[args.command]}
+                spec.update(operation=args.command.upper(), target_ip=args.target_ip, target_port=args.target_port,
+                            ssn=args.ssn, gt=args.gt, protocol=args.protocol)
+                SS7CLI.display_result(client.call("send", spec=spec))
+        except DaemonError as e:
+            logging.error(f"Daemon error: {e}")
+            print(f"❌ Error: {e}")
+    return True
+
+def range_requests(args):
+    """
+    batch.generate_requests for the range options of generate and batch.
+
+    Raises:
+        ValueError: If a range or the operation is invalid
+    """
+    from app.batch import generate_requests
+    from utils.number_ranges import BloomFilter, GTRange, IMSIRange, MSISDNRange, parse_range
+    index, _, total = args.shard.partition("/")
+    shard = (int(index), int(total or 1))
+    imsi_count = int(args.imsi.partition(":")[2] or 0)
+    imsis = parse_range(args.imsi, IMSIRange, mnc_length=args.mnc_length, stride=args.stride, seed=args.seed,
+                        shard=shard, dedup=BloomFilter(max(1, imsi_count)) if args.dedup else None)
+    msisdns = parse_range(args.msisdn, MSISDNRange) if args.msisdn else None
+    vlr_gts = parse_range(args.vlr_gt, GTRange) if args.vlr_gt else None
+    return generate_requests(args.operation, imsis, msisdns, vlr_gts)
+
+def generate(args) -> None:
+    from app.batch import ResultWriter
+    try:
+        requests = range_requests(args)
+        with ResultWriter(args.output, "jsonl") as writer:
+            for request in requests:
+                writer.write(request)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return
+    if args.output != "-":
+        print(f"Wrote {writer.count} requests to {args.output}")
 
 def main():
     args = parse_args()
+    if args.command == "daemon" and args.stop:
+        with DaemonClient(args.socket, api_key=cli_api_key()) as client:
+            if not client.available():
+                print("No daemon running.")
+                return
+            try:
+                pid = client.call("shutdown")["pid"]
+            except DaemonError as e:
+                print(f"❌ Error: {e}")
+                return
+        print(f"Stopped daemon (pid {pid}).")
+        return
+    if forward(args):
+        return
+    if args.command == "generate":
+        generate(args)
+        return
+
+    from app.core import SS7Core
+    from app.batch import BatchRunner, ResultWriter, read_requests
+    from app.campaign import CampaignRunner, CampaignSpec, Checkpoint, parse_operations, parse_target
+    from app.corpus import Corpus
+    from app.coverage import CoverageChannel
+    from app.distributed import Coordinator, Worker, parse_address
+    from app.fuzzer import Fuzzer, Mutator, seed_packets
+    from app.metrics import Metrics
+    from app.scheduler import PowerScheduler
+    from app.triage import Triage
+    from cli.ui import SS7CLI
+    from app.config_manager import ConfigManager
+
     config_manager = ConfigManager()
     api_key = os.getenv("SS7_API_KEY") or config_manager.api_key
     if not api_key:
@@ -125,12 +333,160 @@ def main():
             operation=args.operation,
             start_date=args.start_date,
             end_date=args.end_date,
-            limit=args.limit
+            limit=args.limit,
+            imsi=args.imsi,
+            before=cli.parse_cursor(args.before)
         )
-        cli.display_history(history)
+        cli.display_history(history, args.limit)
+
+    elif args.command == "campaign":
+        store = core.response_parser.store
+        checkpoint = None
+        if args.resume is not None:
+            try:
+                checkpoint = Checkpoint.resume(store, args.resume)
+            except ValueError as e:
+                print(f"❌ Error: {e}")
+                core.close()
+                return
+            spec = checkpoint.spec
+        else:
+            spec = CampaignSpec(
+                imsi_start=int(args.imsi_start),
+                count=args.count,
+                operations=parse_operations(args.operations),
+                targets=[parse_target(target, args.protocol) for target in args.target],
+                gt=args.gt,
+                ssn=args.ssn,
+                msisdn_start=int(args.msisdn_start or config_manager.default_msisdn),
+                vlr_gt=args.vlr_gt or config_manager.default_gt
+            )
+        if args.listen:
+            host, port = parse_address(args.listen)
+            runner = Coordinator(
+                spec,
+                host=host,
+                port=port,
+                lease_size=args.shard_size,
+                lease_timeout=args.lease_timeout,
+                api_key=api_key,
+                store=store,
+                metrics=core.metrics,
+                checkpoint=checkpoint
+            )
+            runner.start()
+            print(f"Coordinator listening on {runner.address[0]}:{runner.address[1]}")
+        else:
+            runner = CampaignRunner(
+                spec,
+                workers=args.workers,
+                shard_size=args.shard_size,
+                api_key=api_key,
+                store=store,
+                metrics=core.metrics,
+                checkpoint=checkpoint
+            )
+        try:
+            cli.display_campaign(runner.run(progress=cli.display_campaign_progress))
+        except KeyboardInterrupt:
+            if runner.checkpoint is not None:
+                print(f"\nInterrupted, resume with: campaign --resume {runner.checkpoint.campaign_id}")
+
+    elif args.command == "worker":
+        host, port = parse_address(args.coordinator)
+        completed = Worker(host, port, api_key=api_key, name=args.name).run()
+        print(f"Worker finished after {completed} requests")
+
+    elif args.command == "batch":
+        runner = BatchRunner(
+            core,
+            max_workers=args.workers,
+            ordered=not args.unordered,
+            defaults={
+                "target_ip": config_manager.target_ip,
+                "target_port": config_manager.target_port,
+                "protocol": config_manager.protocol,
+                "ssn": config_manager.ssn,
+                "gt": config_manager.default_gt
+            }
+        )
+        if args.input is not None:
+            requests = read_requests(args.input, args.input_format)
+        else:
+            try:
+                requests = enumerate(range_requests(args), 1)
+            except ValueError as e:
+                print(f"❌ Error: {e}")
+                return
+        statuses = {}
+        with ResultWriter(args.output, args.output_format) as writer:
+            for record in runner.run(requests):
+                writer.write(record)
+                statuses[record["status"]] = statuses.get(record["status"], 0) + 1
+        if args.output != "-":
+            print(f"Wrote {writer.count} results to {args.output}: " + ", ".join(f"{status} {count}" for status, count in sorted(statuses.items())))
+
+    elif args.command == "fuzz":
+        target_ip, target_port, protocol = parse_target(args.target, args.protocol)
+        seeds = seed_packets(
+            imsi=args.imsi or config_manager.default_imsi,
+            msisdn=args.msisdn or config_manager.default_msisdn,
+            vlr_gt=args.vlr_gt or config_manager.default_gt,
+            gt=args.gt or config_manager.default_gt,
+            ssn=args.ssn if args.ssn is not None else config_manager.ssn,
+            operations=list(parse_operations(args.operations))
+        )
+        corpus = Corpus(args.corpus) if args.corpus else None
+        triage = Triage((target_ip, target_port, protocol), args.triage, workers=args.workers, timeout=args.timeout,
+                        replays=args.replays) if args.triage else None
+        mutator = Mutator(seeds, seed=args.seed, max_stack=args.max_stack)
+        scheduler = PowerScheduler(mutator, args.schedule, seed=args.seed) if args.schedule != "uniform" else None
+        coverage = CoverageChannel(*parse_address(args.coverage_listen)) if args.coverage_listen else None
+        fuzzer = Fuzzer(mutator, target_ip, target_port, protocol, timeout=args.timeout, corpus=corpus, triage=triage,
+                        scheduler=scheduler, coverage=coverage)
+        try:
+            if args.no_wait:
+                summary = fuzzer.feed(args.count)
+            else:
+                summary = fuzzer.run(args.count, minimize_every=args.minimize_every, workers=args.workers)
+            if triage is not None:
+                summary["triage"] = triage.process()
+        finally:
+            fuzzer.close()
+            if coverage is not None:
+                coverage.close()
+        cli.display_fuzz(summary)
+
+    elif args.command == "stats":
+        path = args.input or (config_manager.get_config("metrics", {}) or {}).get("dump_path", "logs/stats.json")
+        stats = Metrics.load(path)
+        if args.json:
+            print(json.dumps(stats, indent=2))
+        else:
+            cli.display_stats(stats, args.operation)
+
+    elif args.command == "daemon":
+        daemon = SS7Daemon(core, args.socket)
+        try:
+            daemon.start()
+        except RuntimeError as e:
+            print(f"❌ Error: {e}")
+        else:
+            # SIGTERM unwinds serve_forever() like Ctrl+C so the socket is removed
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+            print(f"SS7 daemon listening on {daemon.socket_path} (pid {os.getpid()})")
+            try:
+                daemon.serve_forever()
+            except (KeyboardInterrupt, SystemExit):
+                pass
 
     elif args.command == "interactive":
         cli.run_interactive_mode()
 
+    # Single queries would otherwise overwrite the stats of the last bulk run
+    if len(core.metrics) and (args.dump_stats or args.command in ("batch", "campaign", "worker")):
+        core.dump_stats()
+    core.close()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,9 +1,19 @@
 #mock_ss7_server.py
+import argparse
 import logging
+import os
 import socket
+import sys
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
 from scapy.all import raw
+from app.coverage import MAP_BITS, MAP_BYTES, pack_report, request_digest
+from utils.network.framing import FrameReader
 from utils.protocols.ss7_layers import SCCP_UDT, TCAP_Invoke, TCAP_ReturnResultLast, MAP_SRI, MAP_ATI, MAP_UL, MAP_PSI
 from utils.encoding.bcd import encode_bcd
+from utils.protocols import map_encoding
 
 logging.basicConfig(level=logging.DEBUG, format="%(asctime)s %(levelname)s: %(message)s")
 
@@ -79,38 +89,250 @@ def create_response(request_packet: SCCP_UDT) -> bytes:
         logging.error(f"Response creation error: {e}")
         return b""
 
-def run_server(host: str = "127.0.0.1", port: int = 2905):
+def handle_request(data) -> bytes:
+    """Dissect one framed request and build its response (b"" for none)."""
+    return create_response(SCCP_UDT(bytes(data)))
+
+MASK = MAP_BITS - 1
+SKIP, ALWAYS, DISSECTION = 0, 1, 2
+
+class CoverageRecorder:
+    """
+    AFL-style edge coverage of the request path. Every executed line gets a
+    location, and each pair of consecutive locations sets one bit of a
+    MAP_BITS bitmap. The SS7 layers, the encoders and this module are
+    traced throughout; scapy only while the request is dissected, not while
+    create_response builds the answer, which would otherwise be most of the
+    lines and the same for every request.
+
+    Lines come from sys.monitoring LINE events where available (Python
+    3.12+), switched off for good in all other code, and from sys.settrace
+    otherwise. One request is recorded at a time.
+    """
+
+    def __init__(self, roots: Optional[Tuple[str, ...]] = None, dissection_roots: Optional[Tuple[str, ...]] = None):
+        """
+        Initialize recorder.
+
+        Args:
+            roots: Path prefixes traced for the whole request
+            dissection_roots: Path prefixes traced only inside dissecting()
+        """
+        import scapy
+        from utils.protocols import ss7_layers
+        from utils.encoding import bcd
+        self.roots = roots or (os.path.dirname(os.path.abspath(ss7_layers.__file__)),
+                               os.path.dirname(os.path.abspath(bcd.__file__)), os.path.abspath(__file__))
+        self.dissection_roots = dissection_roots or (os.path.dirname(os.path.abspath(scapy.__file__)),)
+        self._locations: Dict[object, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._bitmap: Optional[bytearray] = None
+        # previous location >> 1, in a list so the settrace closures share it
+        self._state = [0]
+        self._thread: Optional[int] = None
+        self._dissecting = False
+        self._tool: Optional[int] = None
+
+    def _location(self, code) -> Tuple[int, int]:
+        location = self._locations.get(code)
+        if location is None:
+            path = os.path.abspath(code.co_filename)
+            kind = ALWAYS if path.startswith(self.roots) else DISSECTION if path.startswith(self.dissection_roots) else SKIP
+            base = zlib.crc32(f"{code.co_filename}:{code.co_name}:{code.co_firstlineno}".encode())
+            location = self._locations[code] = (base, kind)
+        return location
+
+    def _hit(self, base: int, line: int) -> None:
+        location = (base + line * 0x9E3779B1) & MASK
+        edge = location ^ self._state[0]
+        self._bitmap[edge >> 3] |= 1 << (edge & 7)
+        self._state[0] = location >> 1
+
+    @contextmanager
+    def record(self, bitmap: bytearray):
+        """Record the edges this thread executes inside the block into bitmap."""
+        with self._lock:
+            self._bitmap, self._state[0], self._thread = bitmap, 0, threading.get_ident()
+            monitoring = hasattr(sys, "monitoring")
+            if monitoring:
+                self._start_monitoring()
+            else:
+                sys.settrace(self._trace_call)
+            try:
+                yield bitmap
+            finally:
+                if not monitoring:
+                    sys.settrace(None)
+                self._bitmap, self._thread, self._dissecting = None, None, False
+
+    @contextmanager
+    def dissecting(self):
+        """Also trace scapy inside the block."""
+        self._dissecting = True
+        try:
+            yield
+        finally:
+            self._dissecting = False
+
+    def _trace_call(self, frame, event, arg):
+        base, kind = self._location(frame.f_code)
+        if kind == SKIP or (kind == DISSECTION and not self._dissecting):
+            return None
+        # _hit inlined: this runs for every traced line
+        bitmap, state = self._bitmap, self._state
+
+        def trace_line(frame, event, arg):
+            if event == "line":
+                location = (base + frame.f_lineno * 0x9E3779B1) & MASK
+                edge = location ^ state[0]
+                bitmap[edge >> 3] |= 1 << (edge & 7)
+                state[0] = location >> 1
+            return trace_line
+        return trace_line
+
+    def _start_monitoring(self) -> None:
+        if self._tool is not None:
+            return
+        monitoring = sys.monitoring
+        tool = next(tool for tool in (monitoring.COVERAGE_ID, 3, 4, monitoring.PROFILER_ID)
+                    if monitoring.get_tool(tool) is None)
+        monitoring.use_tool_id(tool, "mock_ss7_server")
+        monitoring.register_callback(tool, monitoring.events.LINE, self._on_line)
+        monitoring.set_events(tool, monitoring.events.LINE)
+        self._tool = tool
+
+    def _on_line(self, code, line):
+        base, kind = self._location(code)
+        if kind == SKIP:
+            return sys.monitoring.DISABLE
+        if self._thread == threading.get_ident() and (kind == ALWAYS or self._dissecting):
+            self._hit(base, line)
+
+_recorder: Optional[CoverageRecorder] = None
+
+def coverage_recorder() -> CoverageRecorder:
+    """The process-wide recorder (sys.monitoring tools are per process)."""
+    global _recorder
+    if _recorder is None:
+        _recorder = CoverageRecorder()
+    return _recorder
+
+def handle_request_with_coverage(data, report) -> bytes:
+    """handle_request, then report(digest, bitmap) even if dissection failed."""
+    recorder = coverage_recorder()
+    bitmap = bytearray(MAP_BYTES)
+    try:
+        with recorder.record(bitmap):
+            with recorder.dissecting():
+                request_packet = SCCP_UDT(bytes(data))
+            return create_response(request_packet)
+    finally:
+        report(request_digest(data), bytes(bitmap))
+
+class CoverageReporter:
+    """Sends the coverage of each request as a UDP datagram, see app.coverage."""
+
+    def __init__(self, address: Tuple[str, int]):
+        self.address = address
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def handle(self, data) -> bytes:
+        return handle_request_with_coverage(data, self.send)
+
+    def send(self, digest: bytes, bitmap: bytes) -> None:
+        self.sock.sendto(pack_report(digest, bitmap), self.address)
+
+def serve_connection(conn: socket.socket, addr, coverage: Optional[CoverageReporter] = None) -> None:
+    """Answer every framed request on a connection until the client closes it."""
+    reader = FrameReader(conn)
+    try:
+        while True:
+            data = reader.read_frame(timeout=300.0)
+            if not data:
+                break
+            logging.debug(f"Received: {data.hex()}")
+
+            # the coverage report goes out before the response, so it is
+            # waiting for the fuzzer by the time the response arrives
+            response = handle_request(data) if coverage is None else coverage.handle(data)
+            if response:
+                conn.sendall(response)
+            else:
+                logging.error("No response generated")
+    except Exception as e:
+        logging.error(f"Client error: {e}")
+    finally:
+        logging.info(f"Connection to {addr} closed")
+        conn.close()
+
+class LoopbackClient:
+    """
+    In-process stand-in for a client connected to serve_connection, for
+    fuzzing without a network: a request the server would not answer
+    raises socket.timeout at once and one it would drop the connection on
+    returns b"". Takes (and ignores) the client factory arguments of
+    app.fuzzer.Fuzzer.
+
+    With coverage (an app.coverage.CoverageChannel), the edges each request
+    runs through are recorded and put on the channel, e.g.
+    functools.partial(LoopbackClient, coverage=channel) as client factory.
+    """
+
+    def __init__(self, *args, coverage=None, **kwargs):
+        self.coverage = coverage
+
+    def connect(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def request(self, data) -> bytes:
+        try:
+            if self.coverage is None:
+                response = handle_request(data)
+            else:
+                response = handle_request_with_coverage(data, self.coverage.put)
+        except Exception as e:
+            logging.error(f"Client error: {e}")
+            return b""
+        if not response:
+            raise socket.timeout("No response generated")
+        return response
+
+def run_server(host: str = "127.0.0.1", port: int = 2905, coverage_to: Optional[Tuple[str, int]] = None):
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     sock.bind((host, port))
     sock.listen(5)
     logging.info(f"Mock SS7 server listening on {host}:{port}")
+    coverage = None
+    if coverage_to:
+        coverage = CoverageReporter(coverage_to)
+        logging.info(f"Sending coverage reports to {coverage_to[0]}:{coverage_to[1]}")
     
     try:
         while True:
             conn, addr = sock.accept()
             logging.info(f"Connection from {addr}")
-            try:
-                data = conn.recv(1024)
-                if not data:
-                    continue
-                logging.debug(f"Received: {data.hex()}")
-                
-                request_packet = SCCP_UDT(data)
-                response = create_response(request_packet)
-                if response:
-                    conn.send(response)
-                else:
-                    logging.error("No response generated")
-            except Exception as e:
-                logging.error(f"Client error: {e}")
-            finally:
-                logging.info(f"Connection to {addr} closed")
-                conn.close()
+            threading.Thread(target=serve_connection, args=(conn, addr, coverage), daemon=True).start()
     except KeyboardInterrupt:
         logging.info("Server shutting down")
     finally:
         sock.close()
 
 if __name__ == "__main__":
-    run_server()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Mock SS7 server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2905)
+    parser.add_argument("--map-encoding", choices=map_encoding.ENCODINGS, default=map_encoding.TBCD,
+                        help="MAP address field encoding (ascii: the old fixed-width layout)")
+    parser.add_argument("--coverage-to", metavar="HOST:PORT",
+                        help="Record edge coverage per request and send it to this UDP address (fuzz --coverage-listen)")
+    args = parser.parse_args()
+    map_encoding.set_encoding(args.map_encoding)
+    coverage_to = None
+    if args.coverage_to:
+        coverage_host, coverage_port = args.coverage_to.rsplit(":", 1)
+        coverage_to = (coverage_host, int(coverage_port))
+    run_server(args.host, args.port, coverage_to)
\ No newline at end of file
@@ -0,0 +1,164 @@
+# tests/test_async_core.py
+import asyncio
+import unittest
+from app.async_core import AsyncSS7Core
+from tests.mock_ss7_server import create_response
+from utils.network.framing import SCCP_HEADER_LEN, sccp_body_length
+from utils.protocols.ss7_layers import SCCP_UDT
+
+
+class TestAsyncSS7Core(unittest.TestCase):
+    def setUp(self):
+        self.imsi = "123456789012345"
+        self.msisdn = "9876543210"
+        self.gt = "1234567890"
+
+    async def _start_server(self, reply: bool = True):
+        async def handle(reader, writer):
+            while True:
+                data = await reader.read(1024)
+                if not data:
+                    break
+                if reply:
+                    writer.write(create_response(SCCP_UDT(data)))
+                    await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        return server, server.sockets[0].getsockname()[1]
+
+    async def _start_batching_server(self, batch: int):
+        """Server that collects `batch` framed requests and answers them in reverse order in one write."""
+        async def handle(reader, writer):
+            try:
+                while True:
+                    requests = []
+                    for _ in range(batch):
+                        header = await reader.readexactly(SCCP_HEADER_LEN)
+                        requests.append(header + await reader.readexactly(sccp_body_length(header)))
+                    writer.write(b"".join(create_response(SCCP_UDT(req)) for req in reversed(requests)))
+                    await writer.drain()
+            except asyncio.IncompleteReadError:
+                writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        return server, server.sockets[0].getsockname()[1]
+
+    async def _start_splitting_server(self):
+        """Server that sends each response in two segments."""
+        async def handle(reader, writer):
+            try:
+                while True:
+                    header = await reader.readexactly(SCCP_HEADER_LEN)
+                    response = create_response(SCCP_UDT(header + await reader.readexactly(sccp_body_length(header))))
+                    writer.write(response[:SCCP_HEADER_LEN + 3])
+                    await writer.drain()
+                    await asyncio.sleep(0.01)
+                    writer.write(response[SCCP_HEADER_LEN + 3:])
+                    await writer.drain()
+            except asyncio.IncompleteReadError:
+                writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        return server, server.sockets[0].getsockname()[1]
+
+    def test_reassembles_split_responses(self):
+        imsis = [f"12345678901{i:04d}" for i in range(4)]
+
+        async def run():
+            server, port = await self._start_splitting_server()
+            async with AsyncSS7Core(api_key="test_key_123") as core:
+                results = [await core.send_ati(imsi, "127.0.0.1", port, 6, self.gt, "TCP") for imsi in imsis]
+            server.close()
+            await server.wait_closed()
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual([r["status"] for r in results], ["success"] * len(imsis))
+        self.assertEqual([r["params"]["imsi"] for r in results], imsis)
+
+    def test_pipelined_requests_share_association(self):
+        imsis = [f"12345678901{i:04d}" for i in range(16)]
+
+        async def run():
+            server, port = await self._start_batching_server(batch=4)
+            async with AsyncSS7Core(api_key="test_key_123", pipeline=True) as core:
+                results = await asyncio.gather(*[
+                    core.send_ati(imsi, "127.0.0.1", port, 6, self.gt, "TCP") for imsi in imsis
+                ])
+                channels = len(core._channels)
+            server.close()
+            await server.wait_closed()
+            return results, channels
+
+        results, channels = asyncio.run(run())
+        self.assertEqual(channels, 1)
+        self.assertEqual([r["params"]["imsi"] for r in results], imsis)
+
+    def test_concurrent_sri(self):
+        async def run():
+            server, port = await self._start_server()
+            async with AsyncSS7Core(api_key="test_key_123", max_concurrency=8) as core:
+                results = await asyncio.gather(*[
+                    core.send_sri(self.imsi, self.msisdn, "127.0.0.1", port, 6, self.gt, "TCP")
+                    for _ in range(32)
+                ])
+            server.close()
+            await server.wait_closed()
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual(len(results), 32)
+        for result in results:
+            self.assertEqual(result["status"], "success")
+            self.assertEqual(result["params"]["imsi"], self.imsi)
+
+    def test_more_transactions_in_flight_than_invoke_ids(self):
+        count = 400
+
+        async def run():
+            arrived, everyone = [0], asyncio.Event()
+
+            async def handle(reader, writer):
+                # answer only once every request is in flight
+                header = await reader.readexactly(SCCP_HEADER_LEN)
+                request = header + await reader.readexactly(sccp_body_length(header))
+                arrived[0] += 1
+                if arrived[0] == count:
+                    everyone.set()
+                await everyone.wait()
+                writer.write(create_response(SCCP_UDT(request)))
+                await writer.drain()
+                writer.close()
+
+            server = await asyncio.start_server(handle, "127.0.0.1", 0, backlog=count)
+            port = server.sockets[0].getsockname()[1]
+            async with AsyncSS7Core(api_key="test_key_123", max_concurrency=1000, timeout=3.0) as core:
+                results = await asyncio.gather(*[
+                    core.send_ati(self.imsi, "127.0.0.1", port, 6, self.gt, "TCP") for _ in range(count)
+                ])
+                outstanding = sum(len(transactions) for transactions in core._transactions.values())
+            server.close()
+            await server.wait_closed()
+            return results, outstanding
+
+        results, outstanding = asyncio.run(run())
+        self.assertEqual(outstanding, 0)
+        self.assertEqual([r["status"] for r in results], ["success"] * count)
+
+    def test_transaction_deadline(self):
+        async def run():
+            server, port = await self._start_server(reply=False)
+            async with AsyncSS7Core(api_key="test_key_123", timeout=0.2) as core:
+                result = await core.send_ati(self.imsi, "127.0.0.1", port, 6, self.gt, "TCP")
+            server.close()
+            await server.wait_closed()
+            return result
+
+        result = asyncio.run(run())
+        self.assertEqual(result["status"], "error")
+        self.assertIn("deadline", result["message"])
+
+
+if __name__ == "__main__":
+    unittest.main()
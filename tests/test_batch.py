@@ -0,0 +1,155 @@
+# tests/test_batch.py
+import csv
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from app.batch import BatchRunner, ResultWriter, generate_requests, normalize_request, read_requests
+from app.core import SS7Core
+from tests.test_campaign import MockServer
+from utils.number_ranges import EncodedNumber, IMSIRange
+
+DEFAULTS = {"target_ip": "127.0.0.1", "target_port": 2905, "protocol": "TCP", "ssn": 6, "gt": "1234567890"}
+
+
+class FakeCore:
+    """Answers send_spec and send_prepared after a random delay and tracks how many requests run at once."""
+
+    send_many = SS7Core.send_many
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+        self.specs = []
+        self._lock = threading.Lock()
+        self._random = random.Random(3)
+
+    def send_spec(self, spec):
+        with self._lock:
+            self.active += 1
+            self.calls += 1
+            self.specs.append(spec)
+            self.peak = max(self.peak, self.active)
+            delay = self._random.random() * 0.005
+        time.sleep(delay)
+        with self._lock:
+            self.active -= 1
+        return {"status": "success", "operation": f"MAP_{spec['operation']}", "params": {"imsi": spec["imsi"]}}
+
+    def send_prepared(self, operation, fields, **targets):
+        return self.send_spec(dict(fields, operation=operation, prepared=True, **targets))
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_normalize_request(self):
+        spec, error = normalize_request({"operation": "map_sri", "imsi": "123456789012345", "msisdn": "9876543210",
+                                         "target_port": "2906", "ssn": "8"}, DEFAULTS)
+        self.assertIsNone(error)
+        self.assertEqual(spec, {"operation": "SRI", "imsi": "123456789012345", "msisdn": "9876543210",
+                                "target_ip": "127.0.0.1", "target_port": 2906, "ssn": 8, "gt": "1234567890",
+                                "protocol": "TCP"})
+        self.assertEqual(normalize_request({"operation": "UL", "imsi": "123456789012345"}, DEFAULTS)[1], "Missing field: vlr_gt")
+        self.assertEqual(normalize_request({"operation": "ATI", "imsi": "12"}, DEFAULTS)[1], "Invalid imsi: 12")
+        self.assertIn("Unknown operation", normalize_request({"operation": "XX"})[1])
+
+    def test_reads_jsonl_and_csv_lazily(self):
+        with open(self._path("in.jsonl"), "w") as f:
+            f.write('{"operation": "ATI", "imsi": "123456789012345"}\n\n# comment\nnot json\n[1]\n')
+        requests = list(read_requests(self._path("in.jsonl")))
+        self.assertEqual([line for line, _ in requests], [1, 4, 5])
+        self.assertIsInstance(requests[1][1], ValueError)
+        with open(self._path("in.csv"), "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["operation", "imsi", "msisdn", "target_port"])
+            writer.writerow(["SRI", "123456789012345", "9876543210", "2906"])
+            writer.writerow(["ATI", "123456789012346", "", ""])
+        requests = list(read_requests(self._path("in.csv")))
+        self.assertEqual(requests[1], (3, {"operation": "ATI", "imsi": "123456789012346"}))
+        self.assertEqual(requests[0][1]["target_port"], "2906")
+
+    def _requests(self, count):
+        for i in range(count):
+            if i % 50 == 7:
+                yield i + 1, {"operation": "ATI", "imsi": "bad"}
+            else:
+                yield i + 1, {"operation": "ATI", "imsi": f"{123456789000000 + i:015d}"}
+
+    def test_ordered_output_with_bounded_read_ahead(self):
+        core = FakeCore()
+        runner = BatchRunner(core, max_workers=4, max_in_flight=8, defaults=DEFAULTS)
+        read = []
+
+        def requests():
+            for item in self._requests(300):
+                read.append(item[0])
+                yield item
+
+        lines = []
+        for record in runner.run(requests()):
+            lines.append(record["line"])
+            self.assertLessEqual(len(read) - len(lines), 8)
+        self.assertEqual(lines, list(range(1, 301)))
+        self.assertLessEqual(core.peak, 4)
+        self.assertEqual(core.calls, 294)
+
+    def test_unordered_output_to_files(self):
+        runner = BatchRunner(FakeCore(), max_workers=8, ordered=False, defaults=DEFAULTS)
+        with ResultWriter(self._path("out.jsonl")) as writer:
+            for record in runner.run(self._requests(100)):
+                writer.write(record)
+        with open(self._path("out.jsonl")) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(sorted(record["line"] for record in records), list(range(1, 101)))
+        self.assertEqual(sum(record["status"] == "error" for record in records), 2)
+
+        with ResultWriter(self._path("out.csv")) as writer:
+            for record in BatchRunner(FakeCore(), defaults=DEFAULTS).run(self._requests(10)):
+                writer.write(record)
+        with open(self._path("out.csv"), newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(rows[7]["message"], "Invalid imsi: bad")
+        self.assertEqual(rows[0]["imsi"], "123456789000000")
+
+    def test_generated_requests_skip_normalization(self):
+        core = FakeCore()
+        requests = enumerate(generate_requests("ATI", IMSIRange("001", "01", 0, 20)), 1)
+        records = list(BatchRunner(core, defaults=dict(DEFAULTS, target_port="2906")).run(requests))
+        self.assertEqual([record["status"] for record in records], ["success"] * 20)
+        self.assertEqual(records[3]["request"]["target_port"], 2906)
+        self.assertTrue(all(isinstance(spec["imsi"], EncodedNumber) and spec["prepared"] for spec in core.specs))
+
+        records = list(BatchRunner(core, defaults=dict(DEFAULTS, ssn="x")).run(
+            enumerate(generate_requests("ATI", IMSIRange("001", "01", 0, 3)), 1)))
+        self.assertEqual([record["message"] for record in records], ["Invalid ssn: x"] * 3)
+
+    def test_generated_requests_skip_validation(self):
+        server = MockServer()
+        server.start()
+        self.addCleanup(server.stop)
+        core = SS7Core("test_key_123", db_path=None)
+        self.addCleanup(core.close)
+        requests = enumerate(generate_requests("ATI", IMSIRange("001", "01", 0, 5)), 1)
+        runner = BatchRunner(core, max_workers=2, defaults=dict(DEFAULTS, target_port=server.port))
+        with mock.patch("app.core.validate_imsi", side_effect=AssertionError("validated")):
+            records = list(runner.run(requests))
+        self.assertEqual([record["status"] for record in records], ["success"] * 5)
+        self.assertEqual(records[2]["params"]["imsi"], "001010000000002")
+
+
+if __name__ == "__main__":
+    unittest.main()
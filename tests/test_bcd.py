@@ -1,6 +1,7 @@
 #test/test_bcd.py
+import random
 import unittest
-from utils.encoding.bcd import encode_bcd, decode_bcd
+from utils.encoding.bcd import _numpy, decode_bcd, decode_bcd_batch, encode_bcd, encode_bcd_batch
 
 class TestBCDEncoding(unittest.TestCase):
     def test_encode_bcd(self):
@@ -9,4 +10,44 @@ class TestBCDEncoding(unittest.TestCase):
 
     def test_decode_bcd(self):
         self.assertEqual(decode_bcd("21436587092143f5"), "123456789012345")
-        self.assertEqual(decode_bcd("8967452301"), "9876543210")
\ No newline at end of file
+        self.assertEqual(decode_bcd("8967452301"), "9876543210")
+
+
+class TestBCDBatch(unittest.TestCase):
+    BACKENDS = (False, True) if _numpy(None) is not None else (False,)
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.numbers = ["".join(rng.choice("0123456789") for _ in range(rng.randint(1, 15))) for _ in range(500)]
+
+    def test_matches_scalar_codec(self):
+        for use_numpy in self.BACKENDS:
+            data = encode_bcd_batch(self.numbers, use_numpy=use_numpy)
+            self.assertEqual(len(data), 8 * len(self.numbers))
+            for i, number in enumerate(self.numbers):
+                record = encode_bcd(number)
+                self.assertEqual(data[8 * i:8 * (i + 1)], record + b"\xff" * (8 - len(record)))
+                self.assertEqual(decode_bcd(data[8 * i:8 * (i + 1)]), number)
+            self.assertEqual(decode_bcd_batch(data, 8, use_numpy=use_numpy), self.numbers)
+
+    def test_buffers_round_trip(self):
+        for use_numpy in self.BACKENDS:
+            data = encode_bcd_batch(memoryview(b"123456789012345" b"987654321000000"), 15, use_numpy=use_numpy)
+            self.assertEqual(data.hex(), "21436587092143f5" "89674523010000f0")
+            ascii_digits = decode_bcd_batch(data, 8, as_buffer=True, use_numpy=use_numpy)
+            self.assertEqual(ascii_digits, b"123456789012345F" b"987654321000000F")
+            self.assertEqual(encode_bcd_batch(bytearray(ascii_digits), 16, use_numpy=use_numpy), data)
+            self.assertEqual(encode_bcd_batch(["+49"], 4, use_numpy=use_numpy), b"\x94\xff")
+
+    def test_rejects_invalid_input(self):
+        for use_numpy in self.BACKENDS:
+            for numbers in (["12a"], ["1", ""], ["12F"]):
+                with self.assertRaises(ValueError):
+                    encode_bcd_batch(numbers, use_numpy=use_numpy)
+            with self.assertRaises(ValueError):
+                encode_bcd_batch(["123"], 2, use_numpy=use_numpy)
+            with self.assertRaises(ValueError):
+                encode_bcd_batch(b"1234", 3, use_numpy=use_numpy)
+            for data in (b"\x21\xab", b"\x21\x43\xff\xff", b"\x21\x43\x65"):
+                with self.assertRaises(ValueError):
+                    decode_bcd_batch(data, 2, use_numpy=use_numpy)
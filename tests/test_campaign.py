@@ -0,0 +1,215 @@
+# tests/test_campaign.py
+import multiprocessing
+import os
+import signal
+import socket
+import tempfile
+import threading
+import unittest
+from app.campaign import CampaignRunner, CampaignSpec, Checkpoint, RowCollector, parse_operations, parse_target
+from app.metrics import Metrics
+from app.storage import TransactionStore
+from tests.mock_ss7_server import serve_connection
+from utils.number_ranges import EncodedNumber
+
+
+class MockServer(threading.Thread):
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(16)
+        self.port = self.sock.getsockname()[1]
+
+    def run(self):
+        while True:
+            try:
+                conn, addr = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=serve_connection, args=(conn, addr), daemon=True).start()
+
+    def stop(self):
+        self.sock.close()
+
+
+class TestCampaignSpec(unittest.TestCase):
+    def test_parsers(self):
+        self.assertEqual(parse_operations("sri=3, MAP_ATI"), {"SRI": 3, "ATI": 1})
+        self.assertEqual(parse_target("10.0.0.1:2905/tcp"), ("10.0.0.1", 2905, "TCP"))
+        self.assertEqual(parse_target("10.0.0.1:2905"), ("10.0.0.1", 2905, "SCTP"))
+        with self.assertRaises(ValueError):
+            parse_operations("XYZ")
+
+    def test_requests_and_shards(self):
+        spec = CampaignSpec(123456789000000, 10, {"SRI": 2, "UL": 1}, [("127.0.0.1", 1, "TCP"), ("127.0.0.2", 2, "SCTP")],
+                            gt="1234567890", ssn=6, msisdn_start=9000000000, vlr_gt="9876543210")
+        self.assertEqual([spec.request(i)["operation"] for i in range(6)], ["SRI", "SRI", "UL"] * 2)
+        self.assertEqual(spec.request(3)["imsi"], "123456789000003")
+        self.assertEqual(spec.request(3)["target_ip"], "127.0.0.2")
+        self.assertEqual(spec.request(1)["msisdn"], "9000000001")
+        self.assertEqual(spec.request(2)["vlr_gt"], "9876543210")
+        self.assertEqual(list(spec.shards(4)), [(0, 4), (4, 8), (8, 10)])
+
+    def test_requests_match_request(self):
+        spec = CampaignSpec(123456789000000, 10, {"SRI": 2, "UL": 1}, [("127.0.0.1", 1, "TCP")],
+                            gt="1234567890", ssn=6, msisdn_start=9000000000, vlr_gt="9876543210")
+        requests = list(spec.requests(3, 9))
+        self.assertEqual(requests, [spec.request(i) for i in range(3, 9)])
+        self.assertIsInstance(requests[0]["imsi"], EncodedNumber)
+        self.assertIsInstance(requests[1]["msisdn"], EncodedNumber)
+        # MSISDNs past 10 digits keep the old formatting
+        spec = CampaignSpec(1, 2, {"SRI": 1}, [("127.0.0.1", 1, "TCP")], gt="1234567890", ssn=6,
+                            msisdn_start=9999999999)
+        self.assertEqual([request["msisdn"] for request in spec.requests(0, 2)], ["9999999999", "10000000000"])
+
+
+class TestCheckpoint(unittest.TestCase):
+    def test_resume_skips_checkpointed_and_stored_requests(self):
+        spec = CampaignSpec(123456789000000, 20, {"ATI": 1}, [("127.0.0.1", 1, "TCP")], gt="1234567890", ssn=6)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = TransactionStore(os.path.join(tmpdir, "checkpoint.db"))
+            try:
+                checkpoint = Checkpoint.create(store, spec, 4)
+                self.assertEqual(checkpoint.pending(), [(0, 4), (4, 8), (8, 12), (12, 16), (16, 20)])
+                checkpoint.record([(0, 4)])
+                checkpoint.record([(10, 15)])
+                self.assertEqual((checkpoint.completed, checkpoint.cursor), (9, 4))
+                # rows of 4 and 5 committed, but the process died before their checkpoint
+                collector = RowCollector()
+                for index in (4, 5):
+                    collector.tags = {"campaign_id": checkpoint.campaign_id, "campaign_index": index}
+                    collector.submit({"status": "success", "operation": "MAP_ATI", "params": {"imsi": spec.request(index)["imsi"]}})
+                store.submit_many(collector.take())
+                store.flush()
+
+                resumed = Checkpoint.resume(store, checkpoint.campaign_id)
+                self.assertEqual(resumed.spec.to_dict(), spec.to_dict())
+                self.assertEqual(resumed.pending(), [(6, 10), (15, 19), (19, 20)])
+                self.assertEqual((resumed.completed, resumed.cursor), (11, 6))
+                self.assertEqual(resumed.counts(), {("ATI", "success"): 2})
+                resumed.record([(6, 10), (15, 20)])
+                store.flush()
+                campaign = store.get_campaign(checkpoint.campaign_id)
+                self.assertEqual((campaign["status"], campaign["completed"], campaign["cursor"]), ("finished", 20, 20))
+                with self.assertRaises(ValueError):
+                    Checkpoint.resume(store, 999)
+            finally:
+                store.close()
+
+
+class TestCampaignRunner(unittest.TestCase):
+    def test_runs_shards_on_worker_processes(self):
+        server = MockServer()
+        server.start()
+        spec = CampaignSpec(123456789000000, 60, {"SRI": 1, "ATI": 1, "UL": 1, "PSI": 1},
+                            [("127.0.0.1", server.port, "TCP")], gt="1234567890", ssn=6)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "campaign.db")
+            metrics = Metrics()
+            progress = []
+            runner = CampaignRunner(spec, workers=2, shard_size=7, api_key="test_key_123",
+                                    db_path=db_path, metrics=metrics)
+            try:
+                summary = runner.run(progress=lambda s: progress.append(s["completed"]))
+            finally:
+                server.stop()
+            self.assertEqual(summary["completed"], 60)
+            self.assertEqual(summary["by_status"], {"success": 60})
+            self.assertEqual(summary["by_operation"]["UL"], {"success": 15})
+            self.assertEqual(len(progress), 9)
+            self.assertEqual(metrics.histogram("SRI", "total").count, 15)
+
+            store = TransactionStore(db_path)
+            try:
+                rows = store.execute("SELECT imsi, request_hash, response_hash FROM responses")
+                self.assertEqual(len(rows), 60)
+                self.assertEqual(len({row["imsi"] for row in rows}), 60)
+                self.assertTrue(all(row["request_hash"] and row["response_hash"] for row in rows))
+            finally:
+                store.close()
+
+    def test_resume_after_interruption(self):
+        server = MockServer()
+        server.start()
+        spec = CampaignSpec(123456789000000, 60, {"SRI": 1, "ATI": 1}, [("127.0.0.1", server.port, "TCP")],
+                            gt="1234567890", ssn=6)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = TransactionStore(os.path.join(tmpdir, "campaign.db"))
+            try:
+                summary = CampaignRunner(spec, workers=2, shard_size=10, api_key="test_key_123", store=store).run()
+                campaign_id = summary["campaign_id"]
+                # roll back to a crash after shard [20, 30) was half stored
+                with store._lock:
+                    store.conn.execute("DELETE FROM campaign_ranges WHERE start >= 20")
+                    store.conn.execute("DELETE FROM responses WHERE campaign_index >= 25")
+                    store.conn.execute("UPDATE campaigns SET status = 'running'")
+
+                checkpoint = Checkpoint.resume(store, campaign_id)
+                summary = CampaignRunner(checkpoint.spec, workers=2, api_key="test_key_123", store=store,
+                                         checkpoint=checkpoint).run()
+                self.assertEqual(summary["resumed"], 25)
+                self.assertEqual(summary["by_status"], {"success": 60})
+                rows = store.execute("SELECT campaign_index, imsi FROM responses WHERE campaign_id = ?", (campaign_id,))
+                self.assertEqual(sorted(row["campaign_index"] for row in rows), list(range(60)))
+                self.assertEqual(len({row["imsi"] for row in rows}), 60)
+                self.assertEqual(store.get_campaign(campaign_id)["status"], "finished")
+            finally:
+                store.close()
+                server.stop()
+
+
+    def test_checkpoints_batches_within_a_shard(self):
+        server = MockServer()
+        server.start()
+        spec = CampaignSpec(123456789000000, 40, {"ATI": 1}, [("127.0.0.1", server.port, "TCP")],
+                            gt="1234567890", ssn=6)
+
+        def crash(summary):
+            raise RuntimeError("crash")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = TransactionStore(os.path.join(tmpdir, "campaign.db"))
+            try:
+                runner = CampaignRunner(spec, workers=1, shard_size=40, api_key="test_key_123", store=store,
+                                        batch_size=5)
+                with self.assertRaises(RuntimeError):
+                    runner.run(progress=crash)
+                checkpoint = Checkpoint.resume(store, runner.checkpoint.campaign_id)
+                self.assertEqual((checkpoint.cursor, checkpoint.completed), (5, 5))
+                self.assertEqual(checkpoint.pending(), [(5, 40)])
+            finally:
+                store.close()
+                server.stop()
+
+    def test_reruns_shards_of_dead_workers(self):
+        server = MockServer()
+        server.start()
+        self.addCleanup(server.stop)
+        spec = CampaignSpec(123456789000000, 40, {"ATI": 1}, [("127.0.0.1", server.port, "TCP")],
+                            gt="1234567890", ssn=6)
+        killed = []
+
+        def kill_worker(summary):
+            if not killed:
+                killed.extend(process.pid for process in multiprocessing.active_children()
+                              if "PoolWorker" in process.name)
+                for pid in killed:
+                    os.kill(pid, signal.SIGKILL)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = TransactionStore(os.path.join(tmpdir, "campaign.db"))
+            try:
+                runner = CampaignRunner(spec, workers=1, shard_size=40, api_key="test_key_123", store=store,
+                                        batch_size=5)
+                summary = runner.run(progress=kill_worker)
+                checkpoint = Checkpoint.resume(store, runner.checkpoint.campaign_id)
+            finally:
+                store.close()
+        self.assertEqual(len(killed), 1)
+        self.assertEqual(summary["by_status"], {"success": 40})
+        self.assertEqual((checkpoint.cursor, checkpoint.completed), (40, 40))
+
+
+if __name__ == "__main__":
+    unittest.main()
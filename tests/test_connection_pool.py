@@ -0,0 +1,126 @@
+# tests/test_connection_pool.py
+import socket
+import threading
+import unittest
+from utils.network.connection_pool import ConnectionPool, socket_alive
+from utils.network.framing import SCCP_HEADER
+
+
+def sccp_message(payload: bytes) -> bytes:
+    return SCCP_HEADER.pack(0x09, 0x00, 0x03, 0x00, 0x00, 0, 0, len(payload)) + payload
+
+
+class EchoServer(threading.Thread):
+    """Loopback TCP server that echoes each message and counts accepted connections."""
+
+    def __init__(self, close_after_reply: bool = False):
+        super().__init__(daemon=True)
+        self.close_after_reply = close_after_reply
+        self.accepted = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(16)
+        self.port = self.sock.getsockname()[1]
+
+    def run(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.accepted += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                data = conn.recv(4096)
+                if not data:
+                    return
+                conn.sendall(data)
+                if self.close_after_reply:
+                    return
+
+    def stop(self):
+        self.sock.close()
+
+
+class TestConnectionPool(unittest.TestCase):
+    def test_reuses_connection(self):
+        server = EchoServer()
+        server.start()
+        pool = ConnectionPool()
+        try:
+            for i in range(5):
+                payload = sccp_message(bytes([i]) * 4)
+                self.assertEqual(pool.send_packet("127.0.0.1", server.port, "TCP", payload), payload)
+            self.assertEqual(server.accepted, 1)
+            self.assertEqual(pool.idle_count(), 1)
+        finally:
+            pool.close_all()
+            server.stop()
+
+    def test_reconnects_after_peer_close(self):
+        server = EchoServer(close_after_reply=True)
+        server.start()
+        pool = ConnectionPool()
+        try:
+            for _ in range(3):
+                ping = sccp_message(b"ping")
+                self.assertEqual(pool.send_packet("127.0.0.1", server.port, "TCP", ping), ping)
+            self.assertEqual(server.accepted, 3)
+        finally:
+            pool.close_all()
+            server.stop()
+
+    def test_retries_empty_reply_on_reused_connection(self):
+        class StaleClient:
+            """Answers once, then returns b"" like a dead SCTP association."""
+
+            def __init__(self, *key):
+                self.sock, self.peer = socket.socketpair()
+                self.sent = 0
+
+            def send_packet(self, packet, timings=None):
+                self.sent += 1
+                return packet if self.sent == 1 else b""
+
+            def close(self):
+                self.sock.close()
+                self.peer.close()
+
+        clients = []
+        pool = ConnectionPool(client_factory=lambda *key: clients.append(StaleClient(*key)) or clients[-1])
+        try:
+            for _ in range(3):
+                self.assertEqual(pool.send_packet("127.0.0.1", 2905, "SCTP", b"ping"), b"ping")
+            self.assertEqual([client.sent for client in clients], [2, 2, 1])
+        finally:
+            pool.close_all()
+
+    def test_evicts_idle_connections(self):
+        server = EchoServer()
+        server.start()
+        pool = ConnectionPool(idle_timeout=0.0)
+        try:
+            pool.send_packet("127.0.0.1", server.port, "TCP", sccp_message(b"ping"))
+            self.assertEqual(pool.evict_idle(), 1)
+            self.assertEqual(pool.idle_count(), 0)
+        finally:
+            pool.close_all()
+            server.stop()
+
+    def test_socket_alive(self):
+        self.assertFalse(socket_alive(None))
+        a, b = socket.socketpair()
+        try:
+            self.assertTrue(socket_alive(a))
+            b.close()
+            self.assertFalse(socket_alive(a))
+        finally:
+            a.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+# tests/test_corpus.py
+import os
+import tempfile
+import unittest
+from app.corpus import Corpus, error_class, fingerprint
+from app.fuzzer import Fuzzer, Mutator, seed_packets
+from tests.test_campaign import MockServer
+
+SEEDS = seed_packets("123456789012345", "9876543210", "1234567890", "1234567890", 6)
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_fingerprint_fields(self):
+        self.assertEqual(error_class("Unknown TCAP tag: 0x30"), "Unknown TCAP tag")
+        self.assertEqual(error_class("Response too short (3 bytes)"), "Response too short (# bytes)")
+        self.assertIsNone(error_class(None))
+        # SCCP header with empty party addresses, then a TCAP End
+        raw = bytes([0x09, 0x00, 3, 5, 7, 0, 0, 0, 0, 0, 0, 0x64, 0x03])
+        result = {"outcome": "response", "status": "success", "opcode": 4, "raw_response": raw.hex(), "elapsed_ms": 1.5,
+                  "params": {"msisdn": "9876543210", "imsi": "123456789012345"}}
+        self.assertEqual(fingerprint(result), ("response", "success", 0x64, 4, None, "imsi:15,msisdn:10", 4, 4, None))
+        self.assertEqual(fingerprint(result, timing=False)[-2], None)
+        self.assertEqual(fingerprint(dict(result, coverage_id=7))[-1], 7)
+        self.assertEqual(fingerprint(dict(result, coverage_id=7), coverage=False)[-1], None)
+        self.assertEqual(fingerprint({"outcome": "timeout", "status": "error", "message": "No response"}),
+                         ("timeout", "error", None, None, "No response", None, 0, None, None))
+
+
+class TestCorpus(unittest.TestCase):
+    def test_dedup_and_persistence(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            corpus = Corpus(tmpdir)
+            self.assertTrue(corpus.add(SEEDS[0], {"outcome": "timeout", "status": "error", "message": "No response"}))
+            self.assertFalse(corpus.add(SEEDS[1], {"outcome": "timeout", "status": "error", "message": "No response"}))
+            self.assertTrue(corpus.add(memoryview(SEEDS[1]), {"outcome": "closed", "status": "error", "message": "x"}))
+            self.assertEqual(len(corpus), 2)
+            reloaded = Corpus(tmpdir)
+            self.assertEqual(reloaded.inputs(), [SEEDS[0], SEEDS[1]])
+            self.assertEqual(sorted(entry.hits for entry in reloaded.entries.values()), [1, 1])
+
+    def test_minimize_keeps_smallest_input_per_signature(self):
+        server = MockServer()
+        server.start()
+        self.addCleanup(server.stop)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            corpus = Corpus(tmpdir, timing=False)
+            # both answer the same way once replayed; the padded one must go
+            corpus.add(SEEDS[0] + b"\x00\x00", {"outcome": "closed"})
+            corpus.add(SEEDS[0], {"outcome": "reset"})
+            corpus.add(SEEDS[0][:20], {"outcome": "timeout", "status": "error", "message": "No response"})
+            summary = corpus.minimize(("127.0.0.1", server.port, "TCP"), workers=3, timeout=1.0)
+            self.assertEqual((summary["before"], summary["after"], summary["changed"]), (3, 2, 1))
+            self.assertEqual(sorted(corpus.inputs(), key=len), [SEEDS[0][:20], SEEDS[0]])
+            self.assertEqual(Corpus(tmpdir, timing=False).inputs(), corpus.inputs())
+            self.assertEqual(len(os.listdir(os.path.join(tmpdir, Corpus.INPUTS))), 2)
+
+    def test_fuzzer_grows_corpus(self):
+        server = MockServer()
+        server.start()
+        self.addCleanup(server.stop)
+        corpus = Corpus(timing=False)
+        mutator = Mutator(SEEDS, seed=5, max_stack=1)
+        fuzzer = Fuzzer(mutator, "127.0.0.1", server.port, "TCP", timeout=0.05, corpus=corpus)
+        try:
+            summary = fuzzer.run(40, minimize_every=20, workers=2)
+        finally:
+            fuzzer.close()
+        self.assertGreater(summary["new_inputs"], 1)
+        self.assertEqual(summary["corpus"], len(corpus))
+        self.assertEqual(mutator.seeds, SEEDS + corpus.inputs())
+
+
+if __name__ == "__main__":
+    unittest.main()
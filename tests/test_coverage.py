@@ -0,0 +1,93 @@
+# tests/test_coverage.py
+import functools
+import socket
+import threading
+import unittest
+from app.corpus import Corpus
+from app.coverage import MAP_BYTES, CoverageChannel, CoverageMap, request_digest
+from app.fuzzer import Fuzzer, Mutator, seed_packets
+from tests.mock_ss7_server import CoverageReporter, LoopbackClient, handle_request_with_coverage, serve_connection
+
+SEEDS = seed_packets("123456789012345", "9876543210", "1234567890", "1234567890", 6)
+
+
+def record(data) -> bytes:
+    reports = []
+    try:
+        handle_request_with_coverage(data, lambda digest, bitmap: reports.append((digest, bitmap)))
+    except Exception:
+        pass
+    (digest, bitmap), = reports
+    assert digest == request_digest(data)
+    return bitmap
+
+
+class TestCoverageMap(unittest.TestCase):
+    def test_counts_new_edges_only(self):
+        coverage = CoverageMap()
+        self.assertEqual(coverage.update(None), 0)
+        self.assertEqual(coverage.update(b"\x05\x00"), 2)
+        self.assertEqual(coverage.update(b"\x01\x00"), 0)
+        self.assertEqual(coverage.update(b"\x03\x80"), 2)
+        self.assertEqual(coverage.edges, 4)
+
+
+class TestCoverageRecorder(unittest.TestCase):
+    def test_bitmaps_follow_the_request_path(self):
+        for seed in SEEDS:
+            record(seed)
+        sri = record(SEEDS[0])
+        self.assertEqual(len(sri), MAP_BYTES)
+        self.assertEqual(record(SEEDS[0]), sri)
+        truncated = record(SEEDS[0][:20])
+        garbage = record(b"\x09")
+        coverage = CoverageMap()
+        self.assertGreater(coverage.update(sri), 50)
+        self.assertGreater(coverage.update(record(SEEDS[1])), 0)
+        self.assertGreater(coverage.update(truncated), 0)
+        self.assertNotEqual(garbage, truncated)
+
+
+class TestCoverageGuidedFuzzing(unittest.TestCase):
+    def _fuzz(self, channel, client_factory=None, port=0):
+        corpus = Corpus(timing=False)
+        fuzzer = Fuzzer(Mutator(SEEDS, seed=9), "127.0.0.1", port, "TCP", timeout=0.05, corpus=corpus,
+                        coverage=channel, client_factory=client_factory)
+        try:
+            summary = fuzzer.run(40)
+        finally:
+            fuzzer.close()
+        self.assertGreater(summary["edges"], 50)
+        covered = [entry for entry in corpus.entries.values() if entry.fingerprint[-1] is not None]
+        self.assertGreater(len(covered), 1)
+        return summary
+
+    def test_in_process(self):
+        channel = CoverageChannel(None)
+        self._fuzz(channel, functools.partial(LoopbackClient, coverage=channel))
+        self.assertEqual(channel.received, 40)
+        self.assertEqual(channel.pending, {})
+
+    def test_udp_side_channel(self):
+        channel = CoverageChannel("127.0.0.1", 0)
+        self.addCleanup(channel.close)
+        reporter = CoverageReporter(channel.address)
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(4)
+        self.addCleanup(listener.close)
+
+        def accept():
+            while True:
+                try:
+                    conn, addr = listener.accept()
+                except OSError:
+                    return
+                threading.Thread(target=serve_connection, args=(conn, addr, reporter), daemon=True).start()
+        threading.Thread(target=accept, daemon=True).start()
+        self._fuzz(channel, port=listener.getsockname()[1])
+        self.assertGreater(channel.received, 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# tests/test_daemon.py
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from app.core import SS7Core
+from app.daemon import DaemonClient, DaemonError, SS7Daemon
+from tests.test_thread_safety import SlowPool
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmpdir.name, "ss7.sock")
+        self.core = SS7Core(api_key="test_key_123", db_path=None)
+        self.core.connection_pool = SlowPool(delay=0.001)
+        self.daemon = SS7Daemon(self.core, self.socket_path)
+        self.daemon.start()
+        self.thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.daemon.shutdown()
+        self.thread.join(timeout=5)
+        self.core.close()
+        self.tmpdir.cleanup()
+
+    def _spec(self, i):
+        return {"operation": "ATI", "imsi": f"{123456789000000 + i:015d}", "target_ip": "127.0.0.1",
+                "target_port": 2905, "ssn": 6, "gt": "1234567890", "protocol": "TCP"}
+
+    def test_commands_over_one_connection(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket_path).st_mode), 0o600)
+        with DaemonClient(self.socket_path, api_key="test_key_123") as client:
+            self.assertTrue(client.available())
+            self.assertEqual(client.call("ping")["pid"], os.getpid())
+            for i in range(20):
+                result = client.call("send", spec=self._spec(i))
+                self.assertEqual(result["status"], "success")
+                self.assertEqual(result["params"]["imsi"], self._spec(i)["imsi"])
+            self.assertEqual(client.call("stats")["operations"]["ATI"]["*"]["total"]["count"], 20)
+            self.assertEqual(client.call("history", limit=5), [])
+            self.assertEqual(client.call("send", spec={"operation": "FOO"})["status"], "error")
+            with self.assertRaises(DaemonError):
+                client.call("bogus")
+
+    def test_rejects_wrong_api_key(self):
+        for api_key in ("wrong", None):
+            with DaemonClient(self.socket_path, api_key=api_key) as client:
+                self.assertTrue(client.available())
+                with self.assertRaisesRegex(DaemonError, "Invalid API key"):
+                    client.call("send", spec=self._spec(0))
+        with DaemonClient(self.socket_path, api_key="test_key_123") as client:
+            self.assertIn("uptime_s", client.call("ping"))
+
+    def test_concurrent_clients(self):
+        results = []
+
+        def worker(n):
+            with DaemonClient(self.socket_path, api_key="test_key_123") as client:
+                for i in range(10):
+                    results.append(client.call("send", spec=self._spec(n * 10 + i))["status"])
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["success"] * 80)
+
+    def test_single_instance_and_stale_socket(self):
+        with self.assertRaises(RuntimeError):
+            SS7Daemon(self.core, self.socket_path).start()
+        stale = os.path.join(self.tmpdir.name, "stale.sock")
+        open(stale, "w").close()
+        self.assertFalse(DaemonClient(stale).available())
+        daemon = SS7Daemon(self.core, stale)
+        daemon.start()
+        daemon.close()
+        self.assertFalse(os.path.exists(stale))
+
+    def test_cli_forwards_to_daemon(self):
+        env = dict(os.environ, SS7_DAEMON_SOCKET=self.socket_path)
+        env.pop("SS7_API_KEY", None)
+        output = subprocess.run(
+            [sys.executable, "main.py", "ati", "--imsi", "123456789012345", "--target-ip", "127.0.0.1",
+             "--target-port", "2905", "--ssn", "6", "--gt", "1234567890", "--protocol", "TCP"],
+            env=env, check=True, capture_output=True, text=True
+        ).stdout
+        self.assertIn("IMSI: 123456789012345", output)
+        self.assertEqual(self.core.get_stats()["operations"]["ATI"]["*"]["total"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
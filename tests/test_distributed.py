@@ -0,0 +1,148 @@
+# tests/test_distributed.py
+import json
+import multiprocessing
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from app.campaign import CampaignSpec
+from app.core import SS7Core
+from app.distributed import Coordinator, Worker, decode_batch, encode_batch
+from app.metrics import LatencyHistogram, Metrics
+from app.storage import TransactionStore
+from tests.test_campaign import MockServer
+
+
+def _run_worker(host, port, name):
+    Worker(host, port, api_key="test_key_123", name=name).run()
+
+
+class TestBatchEncoding(unittest.TestCase):
+    def test_round_trip(self):
+        histogram = LatencyHistogram()
+        for seconds in (0.001, 0.002, 0.5):
+            histogram.record(seconds)
+        items = [(("ATI", 1, 71, "success"), b"\x01\x02", None)]
+        data = encode_batch(items, {("ATI", "127.0.0.1:2905/TCP", "total"): histogram}, {("ATI", "success"): 1})
+        decoded_items, histograms, counts = decode_batch(data)
+        self.assertEqual(decoded_items, items)
+        self.assertEqual(counts, {("ATI", "success"): 1})
+        decoded = histograms[("ATI", "127.0.0.1:2905/TCP", "total")]
+        self.assertEqual(decoded.summary(), histogram.summary())
+        self.assertEqual(LatencyHistogram.from_dict(LatencyHistogram().to_dict()).summary(), {"count": 0})
+
+
+class TestDistributedCampaign(unittest.TestCase):
+    def setUp(self):
+        self.server = MockServer()
+        self.server.start()
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmpdir.cleanup()
+
+    def test_workers_on_loopback_with_a_dead_worker(self):
+        spec = CampaignSpec(123456789000000, 120, {"SRI": 1, "ATI": 1, "UL": 1, "PSI": 1},
+                            [("127.0.0.1", self.server.port, "TCP")], gt="1234567890", ssn=6)
+        db_path = os.path.join(self.tmpdir.name, "distributed.db")
+        metrics = Metrics()
+        coordinator = Coordinator(spec, lease_size=10, lease_timeout=1.0, batch_size=4, api_key="test_key_123",
+                                  db_path=db_path, metrics=metrics)
+        coordinator.start()
+        host, port = coordinator.address
+
+        # a worker that takes a lease and then hangs without reporting
+        hung = socket.create_connection((host, port))
+        hung.sendall(json.dumps({"type": "hello", "worker": "hung", "api_key": "test_key_123"}).encode() + b"\n")
+        hung_reader = hung.makefile("rb")
+        hung_reader.readline()
+        hung.sendall(b'{"type": "lease"}\n')
+        self.assertEqual(json.loads(hung_reader.readline())["start"], 0)
+
+        # one that dies with its lease as soon as it gets it
+        dead = socket.create_connection((host, port))
+        dead.sendall(json.dumps({"type": "hello", "worker": "dead", "api_key": "test_key_123"}).encode() + b"\n")
+        dead_reader = dead.makefile("rb")
+        dead_reader.readline()
+        dead.sendall(b'{"type": "lease"}\n')
+        self.assertEqual(json.loads(dead_reader.readline())["start"], 10)
+        dead_reader.close()
+        dead.close()
+
+        context = multiprocessing.get_context("spawn")
+        workers = [context.Process(target=_run_worker, args=(host, port, f"w{i}")) for i in range(3)]
+        for worker in workers:
+            worker.start()
+        try:
+            summary = coordinator.run()
+        finally:
+            for worker in workers:
+                worker.join(timeout=10)
+            hung_reader.close()
+            hung.close()
+        self.assertTrue(all(worker.exitcode == 0 for worker in workers))
+        self.assertEqual(summary["completed"], 120)
+        self.assertEqual(summary["by_status"], {"success": 120})
+        self.assertGreaterEqual(summary["reassigned"], 2)
+        self.assertEqual(metrics.histogram("ATI", "total").count, 30)
+
+        store = TransactionStore(db_path)
+        try:
+            rows = store.execute("SELECT imsi FROM responses")
+        finally:
+            store.close()
+        self.assertEqual(sorted(row["imsi"] for row in rows), [spec.request(i)["imsi"] for i in range(120)])
+
+    def test_rejects_wrong_api_key(self):
+        spec = CampaignSpec(123456789000000, 1, {"ATI": 1}, [("127.0.0.1", self.server.port, "TCP")],
+                            gt="1234567890", ssn=6)
+        coordinator = Coordinator(spec, api_key="test_key_123", db_path=None)
+        coordinator.start()
+        try:
+            with self.assertRaisesRegex(RuntimeError, "Invalid API key"):
+                Worker(*coordinator.address, api_key="wrong", core=object()).run()
+        finally:
+            coordinator.server.shutdown()
+            coordinator.server.server_close()
+
+    def test_reconnects_after_a_stalled_reply(self):
+        spec = CampaignSpec(123456789000000, 1, {"ATI": 1}, [("127.0.0.1", self.server.port, "TCP")],
+                            gt="1234567890", ssn=6)
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(2)
+        self.addCleanup(listener.close)
+        connections = []
+
+        def coordinator():
+            # never answers the first lease request, says done on the second connection
+            for reply in (None, {"type": "done"}):
+                conn, _ = listener.accept()
+                connections.append(conn)
+                rfile, wfile = conn.makefile("rb"), conn.makefile("wb")
+                rfile.readline()
+                welcome = {"type": "welcome", "spec": spec.to_dict(), "campaign_id": None, "batch_size": 10,
+                           "flush_interval": 1.0}
+                wfile.write(json.dumps(welcome).encode() + b"\n")
+                wfile.flush()
+                rfile.readline()
+                if reply is not None:
+                    wfile.write(json.dumps(reply).encode() + b"\n")
+                    wfile.flush()
+
+        thread = threading.Thread(target=coordinator, daemon=True)
+        thread.start()
+        core = SS7Core("test_key_123", db_path=None)
+        self.addCleanup(core.close)
+        worker = Worker(*listener.getsockname(), api_key="test_key_123", core=core, timeout=0.3, retries=1)
+        self.assertEqual(worker.run(), 0)
+        thread.join(1.0)
+        self.assertEqual(len(connections), 2)
+        for conn in connections:
+            conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+# tests/test_fast_codec.py
+import random
+import unittest
+from app.message_factory import MessageFactory
+from app.response_parser import ResponseParser
+from tests.mock_ss7_server import create_response
+from utils.protocols.fast_codec import decode_response
+from utils.protocols.ss7_layers import SCCP_UDT
+
+
+class TestFastCodec(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = ResponseParser(db_path=None)
+        factory = MessageFactory()
+        imsi, msisdn, gt = "123456789012345", "9876543210", "1234567890"
+        requests = [
+            factory.create_sri_message(imsi, msisdn, gt, 6, invoke_id=7),
+            factory.create_ati_message(imsi, gt, 6, invoke_id=8),
+            factory.create_ul_message(imsi, "9876543210", gt, 6, invoke_id=9),
+            factory.create_psi_message(imsi, gt, 6, invoke_id=10),
+        ]
+        cls.responses = [create_response(SCCP_UDT(request)) for request in requests]
+
+    def test_decodes_all_operations(self):
+        operations = [decode_response(response)["operation"] for response in self.responses]
+        self.assertEqual(operations, ["MAP_SRI", "MAP_ATI", "MAP_UL", "MAP_PSI"])
+        sri = decode_response(self.responses[0])
+        self.assertEqual(sri["invoke_id"], 7)
+        self.assertEqual(sri["params"], {"imsi": "123456789012345", "msisdn": "9876543210"})
+
+    def test_accepts_memoryview(self):
+        response = self.responses[2]
+        self.assertEqual(decode_response(memoryview(bytearray(response))), decode_response(response))
+
+    def test_matches_scapy_parser(self):
+        for response in self.responses:
+            self.assertEqual(decode_response(response), self.parser._parse_response_scapy(response))
+
+    def test_mutated_packets_match_scapy_or_fall_back(self):
+        rng = random.Random(42)
+        decoded = 0
+        for _ in range(2000):
+            packet = bytearray(rng.choice(self.responses))
+            for _ in range(rng.randint(1, 3)):
+                packet[rng.randrange(len(packet))] = rng.randrange(256)
+            if rng.random() < 0.3:
+                del packet[rng.randrange(len(packet)):]
+            packet = bytes(packet)
+            result = decode_response(packet)
+            if result is not None:
+                decoded += 1
+                self.assertEqual(result, self.parser._parse_response_scapy(packet), packet.hex())
+        self.assertGreater(decoded, 0)
+
+    def test_falls_back_for_unknown_opcode_and_truncation(self):
+        packet = bytearray(self.responses[0])
+        packet[11 + 10 + 9] = 99
+        self.assertIsNone(decode_response(bytes(packet)))
+        self.assertIsNone(decode_response(self.responses[0][:20]))
+        self.assertIsNone(decode_response(b"\x09\x00"))
+
+
+if __name__ == "__main__":
+    unittest.main()
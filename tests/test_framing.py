@@ -0,0 +1,81 @@
+# tests/test_framing.py
+import socket
+import struct
+import unittest
+from utils.network.framing import FrameReader, SCCP_HEADER
+
+
+def sccp_message(payload: bytes) -> bytes:
+    called = b"\x21\x43\x65\x87\x09"
+    calling = b"\x21\x43\x65\x87\x09"
+    header = SCCP_HEADER.pack(0x09, 0x00, 0x03, 0x00, 0x00, len(called), len(calling), len(payload))
+    return header + called + calling + payload
+
+
+class TestFrameReader(unittest.TestCase):
+    def setUp(self):
+        self.local, self.remote = socket.socketpair()
+
+    def tearDown(self):
+        self.local.close()
+        self.remote.close()
+
+    def test_splits_merged_sccp_messages(self):
+        first, second = sccp_message(b"\x04\x01\x02"), sccp_message(b"\x04" * 40)
+        self.remote.sendall(first + second)
+        reader = FrameReader(self.local)
+        self.assertEqual(bytes(reader.read_frame(1.0)), first)
+        self.assertEqual(bytes(reader.read_frame(1.0)), second)
+
+    def test_reassembles_split_message(self):
+        message = sccp_message(b"\x04" * 20)
+        reader = FrameReader(self.local)
+        self.remote.sendall(message[:7])
+        with self.assertRaises(socket.timeout):
+            reader.read_frame(0.05)
+        self.remote.sendall(message[7:])
+        self.assertEqual(bytes(reader.read_frame(1.0)), message)
+
+    def test_returns_memoryview_into_reused_buffer(self):
+        reader = FrameReader(self.local, buffer_size=64)
+        for i in range(20):
+            message = sccp_message(bytes([i]) * 10)
+            self.remote.sendall(message)
+            frame = reader.read_frame(1.0)
+            self.assertIsInstance(frame, memoryview)
+            self.assertEqual(bytes(frame), message)
+        self.assertEqual(len(reader._buf), 64)
+
+    def test_grows_buffer_for_large_frames(self):
+        message = sccp_message(b"\x04" * 500)
+        self.remote.sendall(message)
+        reader = FrameReader(self.local, buffer_size=32)
+        self.assertEqual(bytes(reader.read_frame(1.0)), message)
+
+    def test_length_prefix_mode(self):
+        payloads = [b"abc", b"", b"x" * 300]
+        self.remote.sendall(b"".join(struct.pack(">I", len(p)) + p for p in payloads))
+        reader = FrameReader(self.local, mode="length_prefix", prefix_size=4)
+        for payload in payloads:
+            self.assertEqual(bytes(reader.read_frame(1.0)), payload)
+
+    def test_peer_close_returns_buffered_bytes(self):
+        self.remote.sendall(b"\x02\x02\x02")
+        self.remote.close()
+        reader = FrameReader(self.local)
+        self.assertEqual(bytes(reader.read_frame(1.0)), b"\x02\x02\x02")
+        self.assertEqual(bytes(reader.read_frame(1.0)), b"")
+
+    def test_restores_socket_timeout(self):
+        self.local.settimeout(7.0)
+        reader = FrameReader(self.local)
+        with self.assertRaises(socket.timeout):
+            reader.read_frame(0.01)
+        self.assertEqual(self.local.gettimeout(), 7.0)
+        self.remote.sendall(sccp_message(b"\x04"))
+        reader.read_frame(1.0)
+        self.assertEqual(self.local.gettimeout(), 7.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
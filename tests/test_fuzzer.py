@@ -0,0 +1,154 @@
+# tests/test_fuzzer.py
+import socket
+import struct
+import threading
+import unittest
+from app.fuzzer import OPERATORS, Fuzzer, Mutator, PacketLayout, seed_packets
+from tests.test_campaign import MockServer
+from utils.network.sctp_client import SCTPClient
+
+SEEDS = seed_packets("123456789012345", "9876543210", "1234567890", "1234567890", 6)
+
+
+class TestMutator(unittest.TestCase):
+    def test_layout_of_generated_requests(self):
+        layout = PacketLayout(SEEDS[0])
+        # SCCP header, 5-byte called and calling party, then the TCAP Invoke at 21
+        self.assertEqual(layout.lengths16, (5, 7, 9))
+        self.assertEqual(layout.tags, (21, 23, 26, 29))
+        self.assertEqual(layout.opcodes, (28,))
+        self.assertEqual(SEEDS[0][28], 4)
+        # TCAP lengths, MAP length, then the IMSI and MSISDN length octets
+        self.assertEqual(layout.lengths, (22, 24, 30, 31, 40))
+        self.assertEqual(len(layout.digits), 5 + 5 + 8 + 5)
+        self.assertEqual(PacketLayout(b"\x09\x00").pointers, ())
+
+    def test_same_seed_same_cases(self):
+        first, second, other = Mutator(SEEDS, seed=7), Mutator(SEEDS, seed=7), Mutator(SEEDS, seed=8)
+        cases = [bytes(first.mutate()) for _ in range(500)]
+        self.assertEqual(cases, [bytes(second.mutate()) for _ in range(500)])
+        self.assertNotEqual(cases, [bytes(other.mutate()) for _ in range(500)])
+        self.assertGreater(len(set(cases)), 400)
+
+    def test_cases_reuse_one_buffer(self):
+        mutator = Mutator(SEEDS, seed=1)
+        for _ in range(100):
+            case = mutator.mutate()
+            self.assertIs(case.obj, mutator.buf)
+            self.assertTrue(1 <= len(case) <= mutator.max_size)
+            self.assertTrue(1 <= len(mutator.applied) <= mutator.max_stack)
+
+    def test_operators_target_their_fields(self):
+        for index, name in enumerate(OPERATORS):
+            mutator = Mutator(SEEDS, seed=3)
+            seed = SEEDS[1]
+            layout = mutator.layouts[1]
+            changed = 0
+            for _ in range(100):
+                case = bytes(mutator.mutate(1, [index]))
+                self.assertEqual(mutator.applied, [index])
+                changed += case != seed
+                diff = [i for i in range(min(len(case), len(seed))) if case[i] != seed[i]]
+                allowed = {"length": layout.lengths, "length16": range(5, 11), "pointer": layout.pointers,
+                           "tag": layout.tags, "opcode": layout.opcodes, "nibble": layout.digits}.get(name)
+                if allowed is not None:
+                    self.assertTrue(set(diff) <= set(allowed), (name, diff))
+                if name == "truncate":
+                    self.assertTrue(len(case) < len(seed) and seed.startswith(case))
+            self.assertGreater(changed, 50, name)
+
+    def test_rejects_bad_seeds(self):
+        with self.assertRaises(ValueError):
+            Mutator().mutate()
+        with self.assertRaises(ValueError):
+            Mutator([b"\x00" * 10], max_size=8)
+
+
+class StreamSCTPClient(SCTPClient):
+    """SCTPClient over TCP, as SCTP sockets may not be available."""
+
+    def __init__(self, target_ip, target_port, protocol, timeout):
+        super().__init__(target_ip, target_port, timeout=timeout, retries=1, persistent=True)
+
+    def connect(self):
+        self.sock = socket.create_connection((self.target_ip, self.target_port), self.timeout)
+        self.reader.attach(self.sock)
+
+
+class HangUpServer(threading.Thread):
+    """Reads one request per connection, then closes it, with a reset if abort is set."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(4)
+        self.port = self.sock.getsockname()[1]
+        self.abort = False
+
+    def run(self):
+        while True:
+            try:
+                conn, addr = self.sock.accept()
+            except OSError:
+                return
+            conn.recv(4096)
+            if self.abort:
+                conn.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            conn.close()
+
+    def stop(self):
+        self.sock.close()
+
+
+class TestFuzzer(unittest.TestCase):
+    def setUp(self):
+        self.server = MockServer()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def test_run_classifies_outcomes(self):
+        fuzzer = Fuzzer(Mutator(SEEDS, seed=11, max_stack=1), "127.0.0.1", self.server.port, "TCP", timeout=0.05)
+        seen = []
+        try:
+            summary = fuzzer.run(60, callback=lambda case, result: seen.append((bytes(case), result["outcome"])))
+        finally:
+            fuzzer.close()
+        self.assertEqual(summary["executions"], 60)
+        self.assertEqual(sum(summary["outcomes"].values()), 60)
+        self.assertGreater(summary["outcomes"].get("response", 0), 0)
+        self.assertEqual(len(seen), 60)
+        # unmutated seeds always get an answer
+        fuzzer = Fuzzer(Mutator(SEEDS), "127.0.0.1", self.server.port, "TCP", timeout=1.0)
+        try:
+            for seed in SEEDS:
+                self.assertEqual(fuzzer.execute(seed)["status"], "success")
+        finally:
+            fuzzer.close()
+
+    def test_sctp_errors_are_not_timeouts(self):
+        server = HangUpServer()
+        server.start()
+        self.addCleanup(server.stop)
+        fuzzer = Fuzzer(Mutator(SEEDS), "127.0.0.1", server.port, "SCTP", timeout=1.0, client_factory=StreamSCTPClient)
+        try:
+            self.assertEqual(fuzzer.execute(SEEDS[0])["outcome"], "closed")
+            server.abort = True
+            result = fuzzer.execute(SEEDS[0])
+        finally:
+            fuzzer.close()
+        self.assertEqual(result["outcome"], "reset")
+        self.assertIsNone(fuzzer.client)
+
+    def test_feed_sends_without_waiting(self):
+        fuzzer = Fuzzer(Mutator(SEEDS, seed=2), "127.0.0.1", self.server.port, "TCP", timeout=1.0)
+        try:
+            summary = fuzzer.feed(2000)
+        finally:
+            fuzzer.close()
+        self.assertEqual(summary["executions"], 2000)
+        self.assertGreater(summary["outcomes"].get("sent", 0), 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
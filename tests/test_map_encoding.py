@@ -0,0 +1,70 @@
+# tests/test_map_encoding.py
+import unittest
+from app.message_factory import MessageFactory
+from app.response_parser import ResponseParser
+from tests.mock_ss7_server import create_response
+from utils.encoding.bcd import decode_tbcd, encode_bcd, encode_tbcd
+from utils.protocols import map_encoding
+from utils.protocols.fast_codec import decode_response
+from utils.protocols.ss7_layers import MAP_SRI, MAP_UL, SCCP_UDT, set_map_fields
+
+
+class TestTBCD(unittest.TestCase):
+    def test_round_trip(self):
+        for digits in ("", "1", "123456789012345", "9876543210", "12*#abc"):
+            self.assertEqual(decode_tbcd(encode_tbcd(digits)), digits)
+        self.assertEqual(encode_tbcd("123456789012345"), encode_bcd("123456789012345"))
+        self.assertEqual(decode_tbcd(b"\x21\xf3"), "123")
+        with self.assertRaises(ValueError):
+            encode_tbcd("12x")
+
+
+class TestMapEncoding(unittest.TestCase):
+    def setUp(self):
+        self.factory = MessageFactory()
+        self.parser = ResponseParser(db_path=None)
+        self.addCleanup(map_encoding.set_encoding, map_encoding.get_encoding())
+
+    def _round_trip(self, request):
+        response = create_response(SCCP_UDT(request))
+        result = decode_response(response)
+        self.assertEqual(result, self.parser._parse_response_scapy(response))
+        return result
+
+    def test_variable_length_tbcd_fields(self):
+        map_encoding.set_encoding("tbcd")
+        packet = MAP_UL(bytes(set_map_fields(MAP_UL(), imsi="001010123456789", vlr_gt="491720000001")))
+        self.assertEqual(packet.len, 16)
+        self.assertEqual((packet.imsi, packet.vlr_gt), (b"001010123456789", b"491720000001"))
+        for msisdn in ("9876543210", "491701234567", "+4917012345678"):
+            result = self._round_trip(self.factory.create_sri_message("001010123456789", msisdn, "1234567890", 6))
+            self.assertEqual(result["params"], {"imsi": "001010123456789", "msisdn": msisdn.lstrip("+")})
+
+    def test_tbcd_is_smaller_than_ascii(self):
+        map_encoding.set_encoding("tbcd")
+        tbcd = self.factory.create_sri_message("123456789012345", "9876543210", "1234567890", 6)
+        map_encoding.set_encoding("ascii")
+        ascii_request = self.factory.create_sri_message("123456789012345", "9876543210", "1234567890", 6)
+        self.assertEqual(len(ascii_request) - len(tbcd), 25 - 15)
+
+    def test_ascii_compatibility_mode(self):
+        map_encoding.set_encoding("ascii")
+        request = self.factory.create_sri_message("123456789012345", "9876543210", "1234567890", 6)
+        self.assertTrue(request.endswith(b"\x04\x19123456789012345" b"9876543210"))
+        self.assertEqual(request, self.factory.build_sri_message_scapy("123456789012345", "9876543210", "1234567890", 6))
+        result = self._round_trip(request)
+        self.assertEqual(result["params"], {"imsi": "123456789012345", "msisdn": "9876543210"})
+        self.assertEqual(bytes(MAP_SRI(imsi=b"123456789012345", msisdn=b"9876543210"))[1], 25)
+
+    def test_overlong_length_octet_falls_back_to_scapy(self):
+        map_encoding.set_encoding("tbcd")
+        response = bytearray(create_response(SCCP_UDT(self.factory.create_ati_message("123456789012345", "1234567890", 6))))
+        response[-9] = 20
+        self.assertIsNone(decode_response(bytes(response)))
+        self.assertEqual(self.parser.parse_response(bytes(response))["params"], {"imsi": "123456789012345"})
+        with self.assertRaises(ValueError):
+            map_encoding.set_encoding("bcd")
+
+
+if __name__ == "__main__":
+    unittest.main()
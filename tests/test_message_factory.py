@@ -1,4 +1,5 @@
 #test/TestMessageFactory.py
+import random
 import unittest
 from app.message_factory import MessageFactory
 from utils.protocols.ss7_layers import SCCP_UDT, TCAP_Invoke
@@ -97,5 +98,31 @@ class TestMessageFactory(unittest.TestCase):
         self.assertTrue(sccp.haslayer(TCAP_Invoke))
         self.assertEqual(sccp[TCAP_Invoke].opcode, 59)
 
+    def test_templates_match_scapy_output(self):
+        rng = random.Random(1234)
+        for _ in range(200):
+            imsi = "".join(rng.choice("0123456789") for _ in range(15))
+            msisdn = rng.choice(["", "+"]) + "".join(rng.choice("0123456789") for _ in range(rng.randint(10, 15)))
+            gt = "".join(rng.choice("0123456789") for _ in range(rng.randint(10, 15)))
+            vlr_gt = "".join(rng.choice("0123456789") for _ in range(rng.randint(10, 15)))
+            ssn = rng.randint(0, 254)
+            invoke_id = rng.randint(0, 255)
+            self.assertEqual(
+                self.factory.create_sri_message(imsi, msisdn, gt, ssn, invoke_id=invoke_id),
+                self.factory.build_sri_message_scapy(imsi, msisdn, gt, ssn, invoke_id=invoke_id)
+            )
+            self.assertEqual(
+                self.factory.create_ati_message(imsi, gt, ssn, invoke_id=invoke_id),
+                self.factory.build_ati_message_scapy(imsi, gt, ssn, invoke_id=invoke_id)
+            )
+            self.assertEqual(
+                self.factory.create_ul_message(imsi, vlr_gt, gt, ssn, invoke_id=invoke_id),
+                self.factory.build_ul_message_scapy(imsi, vlr_gt, gt, ssn, invoke_id=invoke_id)
+            )
+            self.assertEqual(
+                self.factory.create_psi_message(imsi, gt, ssn, invoke_id=invoke_id),
+                self.factory.build_psi_message_scapy(imsi, gt, ssn, invoke_id=invoke_id)
+            )
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+# tests/test_metrics.py
+import os
+import random
+import socket
+import tempfile
+import threading
+import unittest
+from app.core import SS7Core
+from app.metrics import LatencyHistogram, Metrics, STAGES
+from app.response_parser import ResponseParser
+from tests.mock_ss7_server import serve_connection
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_within_bucket_error(self):
+        rng = random.Random(7)
+        samples = [rng.lognormvariate(-7, 1.0) for _ in range(20000)]
+        histogram = LatencyHistogram()
+        for sample in samples:
+            histogram.record(sample)
+        samples.sort()
+        for q in (50, 90, 99):
+            exact = samples[int(len(samples) * q / 100) - 1]
+            self.assertAlmostEqual(histogram.percentile(q) / exact, 1.0, delta=0.05)
+        self.assertEqual(histogram.count, len(samples))
+        self.assertEqual(histogram.percentile(100), samples[-1])
+
+    def test_merge_and_extremes(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        a.record(0.0)
+        b.record(1e6)
+        a.merge(b)
+        self.assertEqual(a.count, 2)
+        self.assertLess(a.percentile(50), 2e-6)
+        self.assertEqual(a.percentile(100), 1e6)
+        self.assertEqual(LatencyHistogram().summary(), {"count": 0})
+
+
+class TestMetrics(unittest.TestCase):
+    def test_snapshot_groups_by_operation_and_target(self):
+        metrics = Metrics()
+        metrics.record_stages("SRI", "10.0.0.1:2905/SCTP", {"build": 0.001, "total": 0.010})
+        metrics.record_stages("SRI", "10.0.0.2:2905/SCTP", {"build": 0.003, "total": 0.030})
+        snapshot = metrics.snapshot()
+        targets = snapshot["operations"]["SRI"]
+        self.assertEqual(set(targets), {"*", "10.0.0.1:2905/SCTP", "10.0.0.2:2905/SCTP"})
+        self.assertEqual(targets["*"]["total"]["count"], 2)
+        self.assertEqual(list(targets["*"]), ["build", "total"])
+        self.assertEqual(metrics.histogram("SRI", "build").count, 2)
+
+    def test_dump_and_load(self):
+        metrics = Metrics()
+        metrics.record("ATI", "127.0.0.1:2905/TCP", "parse", 0.0002)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "logs", "stats.json")
+            metrics.dump(path)
+            loaded = Metrics.load(path)
+            self.assertEqual(loaded["operations"]["ATI"]["*"]["parse"]["count"], 1)
+            self.assertIsNone(Metrics.load(os.path.join(tmpdir, "missing.json")))
+
+    def test_core_records_every_stage(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        port = listener.getsockname()[1]
+
+        def accept():
+            conn, addr = listener.accept()
+            serve_connection(conn, addr)
+
+        threading.Thread(target=accept, daemon=True).start()
+        core = SS7Core(api_key="test_key_123")
+        core.response_parser.close()
+        core.response_parser = ResponseParser(db_path=None)
+        try:
+            for _ in range(5):
+                result = core.send_ati("123456789012345", "127.0.0.1", port, 6, "1234567890", "TCP")
+                self.assertEqual(result["status"], "success")
+            stages = core.get_stats()["operations"]["ATI"][f"127.0.0.1:{port}/TCP"]
+            self.assertEqual(list(stages), list(STAGES))
+            self.assertTrue(all(stage["count"] == 5 for stage in stages.values()))
+            self.assertGreaterEqual(stages["total"]["max_ms"], stages["receive"]["max_ms"])
+        finally:
+            core.close()
+            listener.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+# tests/test_number_ranges.py
+import itertools
+import unittest
+from app.batch import generate_requests
+from app.message_templates import TemplateBuilder
+from utils.encoding.bcd import encode_tbcd
+from utils.number_ranges import (BloomFilter, FeistelPermutation, GTRange, IMSIRange, MSISDNRange,
+                                 parse_range)
+from utils.protocols import map_encoding
+from utils.validators import validate_gt, validate_imsi, validate_msisdn
+
+
+class TestNumberRanges(unittest.TestCase):
+    def test_values_are_valid_and_strided(self):
+        imsis = IMSIRange("001", "01", 5, 4, stride=10)
+        self.assertEqual(list(imsis), ["001010000000005", "001010000000015", "001010000000025", "001010000000035"])
+        self.assertTrue(all(validate_imsi(imsi) for imsi in IMSIRange("310", "260", 0, 50)))
+        self.assertTrue(all(validate_msisdn(msisdn) for msisdn in MSISDNRange("49", 1700000000, 50, 12)))
+        self.assertTrue(all(validate_gt(gt) for gt in GTRange("4917", 0, 50, 12)))
+        self.assertEqual(imsis[-1], "001010000000035")
+        self.assertEqual(len(imsis), 4)
+
+    def test_rejects_invalid_ranges(self):
+        with self.assertRaises(ValueError):
+            IMSIRange("01", "01", 0, 1)
+        with self.assertRaises(ValueError):
+            IMSIRange("001", "01", 9999999999, 2)
+        with self.assertRaises(ValueError):
+            MSISDNRange("49", 0, 1, 9)
+        with self.assertRaises(ValueError):
+            GTRange("49", 0, 1, 12, shard=(2, 2))
+        with self.assertRaises(ValueError):
+            parse_range("12345", MSISDNRange)
+
+    def test_seeded_permutation(self):
+        for size in (1, 2, 7, 1000, 1025):
+            permutation = FeistelPermutation(size, seed=11)
+            self.assertEqual(sorted(permutation(i) for i in range(size)), list(range(size)))
+        imsis = IMSIRange("001", "01", 0, 1000, seed=5)
+        values = list(imsis)
+        self.assertEqual(values, list(IMSIRange("001", "01", 0, 1000, seed=5)))
+        self.assertNotEqual(values, list(IMSIRange("001", "01", 0, 1000, seed=6)))
+        self.assertNotEqual(values, sorted(values))
+        self.assertEqual(sorted(values), list(IMSIRange("001", "01", 0, 1000)))
+
+    def test_shards_partition_the_range(self):
+        shards = [list(MSISDNRange("", 9876543210, 103, 10, seed=3, shard=(i, 4))) for i in range(4)]
+        self.assertEqual([len(shard) for shard in shards], [26, 26, 26, 25])
+        merged = list(itertools.chain(*shards))
+        self.assertEqual(sorted(merged), list(MSISDNRange("", 9876543210, 103, 10)))
+
+    def test_huge_ranges_stay_lazy(self):
+        imsis = IMSIRange("001", "01", 0, 10 ** 10, seed=1, shard=(3, 1000))
+        self.assertEqual(len(imsis), 10 ** 7)
+        first = list(itertools.islice(imsis, 5))
+        self.assertEqual(first, [imsis[i] for i in range(5)])
+
+    def test_bloom_filter_dedup_across_ranges(self):
+        seen = BloomFilter(2000, error_rate=0.001)
+        first = list(GTRange("", 1234567890, 1000, 10, dedup=seen))
+        second = list(GTRange("", 1234568390, 1000, 10, dedup=seen))
+        self.assertEqual(len(first), 1000)
+        self.assertFalse(set(first) & set(second))
+        self.assertGreaterEqual(len(second), 495)
+        self.assertIn("1234567890", seen)
+        self.assertNotIn("1111111111", seen)
+
+    def test_encoded_values_are_wire_ready(self):
+        imsis = IMSIRange("001", "01", 123, 3, seed=2)
+        self.assertEqual(list(imsis.encoded(chunk_size=2)), list(imsis))
+        for value in itertools.chain(imsis.encoded(chunk_size=2), MSISDNRange("49", 17000000, 3, 11).encoded()):
+            self.assertEqual(value.wire, bytes((len(encode_tbcd(value)),)) + encode_tbcd(value))
+            self.assertEqual(value.wire, map_encoding.encode_address(value))
+        builder = TemplateBuilder()
+        imsi, = IMSIRange("001", "01", 7, 1).encoded()
+        self.assertEqual(builder.build("ATI", "1234567890", 6, 1, imsi), builder.build("ATI", "1234567890", 6, 1, str(imsi)))
+        previous = map_encoding.set_encoding(map_encoding.ASCII)
+        try:
+            self.assertEqual(builder.build("ATI", "1234567890", 6, 1, imsi), builder.build("ATI", "1234567890", 6, 1, str(imsi)))
+            self.assertEqual(next(IMSIRange("001", "01", 7, 1).encoded()).wire, b"001010000000007")
+        finally:
+            map_encoding.set_encoding(previous)
+
+    def test_parse_range_and_generate_requests(self):
+        imsis = parse_range("310260000000001:3", IMSIRange, mnc_length=3)
+        self.assertEqual((imsis.mcc, imsis.mnc, imsis.start), ("310", "260", 1))
+        requests = list(generate_requests("sri", imsis, parse_range("9876543210:2", MSISDNRange)))
+        self.assertEqual([request["msisdn"] for request in requests], ["9876543210", "9876543211", "9876543210"])
+        self.assertEqual(requests[2], {"operation": "SRI", "imsi": "310260000000003", "msisdn": "9876543210"})
+        with self.assertRaises(ValueError):
+            generate_requests("UL", imsis)
+
+
+if __name__ == "__main__":
+    unittest.main()
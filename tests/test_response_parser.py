@@ -1,7 +1,7 @@
 #test/TestResponseParser.py
 import sqlite3
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from utils.protocols.ss7_layers import SCCP_UDT, TCAP_ReturnResultLast, MAP_SRI, MAP_ATI, MAP_UL, MAP_PSI
 from utils.encoding.bcd import decode_bcd
 
@@ -40,7 +40,7 @@ class ResponseParser:
     def store_transaction(self, operation: str, imsi: str, msisdn: str, vlr_gt: str, gt: str, ssn: int, target_ip: str, target_port: int, protocol: str, request_data: str, response_data: str, status: str, invoke_id: int, opcode: int):
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
-            timestamp = datetime.utcnow().isoformat()
+            timestamp = datetime.now(timezone.utc).isoformat()
             cursor.execute("""
                 INSERT INTO ss7_transactions (
                     operation, imsi, msisdn, vlr_gt, gt, ssn, target_ip, target_port, protocol,
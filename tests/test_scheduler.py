@@ -0,0 +1,70 @@
+# tests/test_scheduler.py
+import random
+import unittest
+from app.corpus import Corpus
+from app.fuzzer import OPERATORS, Fuzzer, Mutator, seed_packets
+from app.scheduler import Bandit, PowerScheduler
+from tests.mock_ss7_server import LoopbackClient
+
+SEEDS = seed_packets("123456789012345", "9876543210", "1234567890", "1234567890", 6)
+
+
+class TestBandit(unittest.TestCase):
+    def test_policies_favour_the_paying_arm(self):
+        for policy in ("ucb", "thompson"):
+            rng = random.Random(1)
+            bandit = Bandit(4, policy, rng=rng)
+            pulls = [0] * 4
+            for _ in range(2000):
+                arm = bandit.select()
+                pulls[arm] += 1
+                bandit.update(arm, 1.0 if arm == 2 and rng.random() < 0.3 else 0.0)
+            self.assertEqual(max(range(4), key=pulls.__getitem__), 2, policy)
+            self.assertGreater(pulls[2], 1000, policy)
+
+    def test_new_arms_are_tried_first(self):
+        bandit = Bandit(2)
+        for _ in range(10):
+            bandit.update(bandit.select(), 1.0)
+        bandit.add_arms(2)
+        self.assertEqual([bandit.select(), bandit.select()], [2, 3])
+        with self.assertRaises(ValueError):
+            Bandit(1, "uniform")
+
+
+class TestPowerScheduler(unittest.TestCase):
+    def test_schedules_cases_and_tracks_seeds(self):
+        mutator = Mutator(SEEDS, seed=3)
+        scheduler = PowerScheduler(mutator, seed=3)
+        corpus = Corpus(timing=False)
+        fuzzer = Fuzzer(mutator, "127.0.0.1", 0, "TCP", client_factory=LoopbackClient, corpus=corpus,
+                        scheduler=scheduler)
+        summary = fuzzer.run(300)
+        self.assertEqual(summary["executions"], 300)
+        self.assertGreater(summary["signatures"], 5)
+        # corpus inputs became seeds and seed arms
+        self.assertTrue(len(SEEDS) < len(scheduler.seeds) <= len(mutator.seeds))
+        self.assertEqual(sum(scheduler.finds.values()), summary["signatures"])
+        self.assertEqual(set(scheduler.stats()["operators"]), set(OPERATORS))
+        self.assertTrue(1 <= len(mutator.applied) <= mutator.max_stack)
+
+        mutator.replace_seeds(SEEDS)
+        scheduler.next()
+        self.assertEqual(len(scheduler.seeds), len(SEEDS))
+        self.assertEqual(scheduler.finds, {})
+
+    def test_ucb_stacks_mix_operators(self):
+        mutator = Mutator(SEEDS, seed=4, max_stack=4)
+        scheduler = PowerScheduler(mutator, seed=4)
+        stacks = []
+        for i in range(200):
+            scheduler.next()
+            stacks.append(list(mutator.applied))
+            scheduler.update({"outcome": "response", "status": "success", "opcode": i % 3})
+        self.assertFalse(scheduler.operators._untried)
+        self.assertTrue(all(len(set(stack)) == len(stack) for stack in stacks))
+        self.assertGreater(sum(len(stack) > 1 for stack in stacks[-100:]), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
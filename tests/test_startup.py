@@ -0,0 +1,38 @@
+# tests/test_startup.py
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestLazyScapyImport(unittest.TestCase):
+    def _scapy_modules_after(self, code: str) -> str:
+        probe = f"import sys; {code}; print(','.join(m for m in sys.modules if m.split('.')[0] == 'scapy'))"
+        return subprocess.run([sys.executable, "-c", probe], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+
+    def test_core_and_cli_do_not_import_scapy(self):
+        modules = "app.core, app.async_core, app.batch, app.campaign, cli.ui, utils.validators, utils.encoding.bcd, utils.protocols.fast_codec"
+        self.assertEqual(self._scapy_modules_after(f"import {modules}"), "")
+
+    def test_fast_path_round_trip_does_not_import_scapy(self):
+        code = (
+            "from app.message_factory import MessageFactory; from app.response_parser import ResponseParser; "
+            "ResponseParser(db_path=None).parse_response(MessageFactory.create_ati_message('123456789012345', '1234567890', 6), store=False)"
+        )
+        self.assertEqual(self._scapy_modules_after(code), "")
+
+    def test_scapy_loaded_on_demand_without_scapy_all(self):
+        code = (
+            "from app.response_parser import ResponseParser; "
+            "assert ResponseParser(db_path=None).parse_response(b'\\x09\\x00', store=False)['status'] == 'error'"
+        )
+        modules = self._scapy_modules_after(code).split(",")
+        self.assertIn("scapy.packet", modules)
+        self.assertNotIn("scapy.all", modules)
+
+
+if __name__ == "__main__":
+    unittest.main()
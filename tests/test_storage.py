@@ -0,0 +1,229 @@
+# tests/test_storage.py
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from app.storage import MIGRATIONS, TransactionStore
+
+
+class TestTransactionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "ss7_test.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _count(self):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _result(self, i):
+        return {
+            "status": "success",
+            "operation": "MAP_SRI",
+            "invoke_id": i % 256,
+            "opcode": 4,
+            "params": {"imsi": f"{i:015d}", "msisdn": "9876543210"},
+            "raw_response": "09"
+        }
+
+    def test_uses_wal_mode(self):
+        store = TransactionStore(self.db_path)
+        try:
+            mode = store.execute("PRAGMA journal_mode")[0]["journal_mode"]
+            self.assertEqual(mode.lower(), "wal")
+        finally:
+            store.close()
+
+    def test_batches_rows_and_flushes(self):
+        store = TransactionStore(self.db_path, batch_size=100, flush_interval=10.0)
+        try:
+            for i in range(250):
+                self.assertTrue(store.submit(self._result(i)))
+            store.flush()
+            self.assertEqual(self._count(), 250)
+            self.assertEqual(store.written, 250)
+        finally:
+            store.close()
+
+    def test_close_flushes_pending_rows(self):
+        store = TransactionStore(self.db_path, batch_size=1000, flush_interval=10.0)
+        for i in range(10):
+            store.submit(self._result(i))
+        store.close()
+        self.assertEqual(self._count(), 10)
+        self.assertFalse(store.submit(self._result(11)))
+
+    def test_full_queue_blocks_unless_dropping(self):
+        for drop_when_full in (False, True):
+            store = TransactionStore(self.db_path, batch_size=1, max_queue=2, drop_when_full=drop_when_full)
+            try:
+                # stall the writer on the database lock until the queue is full
+                store._lock.acquire()
+                release = threading.Timer(0.3, store._lock.release)
+                store.submit(self._result(0))
+                while not store._queue.empty():
+                    time.sleep(0.01)
+                store.submit(self._result(1))
+                store.submit(self._result(2))
+                release.start()
+                started = time.monotonic()
+                self.assertEqual(store.submit(self._result(3)), not drop_when_full)
+                self.assertEqual(time.monotonic() - started >= 0.2, not drop_when_full)
+                self.assertEqual(store.dropped, int(drop_when_full))
+                release.join()
+            finally:
+                store.close()
+        self.assertEqual(self._count(), 4 + 3)
+
+    def test_time_based_flush(self):
+        store = TransactionStore(self.db_path, batch_size=1000, flush_interval=0.05)
+        try:
+            store.submit(self._result(1))
+            store._queue.join()
+            self.assertEqual(self._count(), 1)
+        finally:
+            store.close()
+
+
+    def test_data_survives_restart(self):
+        store = TransactionStore(self.db_path)
+        store.submit(self._result(1), {"operation": "SRI", "target_ip": "127.0.0.1", "target_port": 2905})
+        store.close()
+        store = TransactionStore(self.db_path)
+        try:
+            rows = store.query_history()
+            self.assertEqual(len(rows), 1)
+            self.assertEqual(rows[0]["operation"], "SRI")
+            self.assertEqual(rows[0]["target_port"], 2905)
+        finally:
+            store.close()
+
+    def test_migrates_legacy_table(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE responses (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, operation TEXT, invoke_id INTEGER,
+                    opcode INTEGER, status TEXT, imsi TEXT, msisdn TEXT, vlr_gt TEXT,
+                    error TEXT, raw_response TEXT
+                )
+            """)
+            conn.executemany("INSERT INTO responses (operation, status, imsi) VALUES ('MAP_ATI', 'success', ?)",
+                             [("123456789012345",), ("123456789012346",), ("123456789012347",)])
+        store = TransactionStore(self.db_path)
+        try:
+            self.assertEqual(store.schema_version, MIGRATIONS[-1][0])
+            rows = store.query_history(operation="ATI", imsi="123456789012345")
+            self.assertEqual(len(rows), 1)
+            self.assertEqual(rows[0]["timestamp"], "")
+            store.submit(self._result(1), {"operation": "ATI"})
+            store.flush()
+            # legacy rows without a timestamp page after the new ones
+            seen, cursor = [], None
+            while True:
+                page = store.query_history(limit=2, before=cursor)
+                if not page:
+                    break
+                seen.extend(row["id"] for row in page)
+                cursor = store.next_cursor(page)
+            self.assertEqual(seen, [4, 3, 2, 1])
+        finally:
+            store.close()
+
+    def test_keyset_pagination(self):
+        store = TransactionStore(self.db_path)
+        try:
+            for i in range(25):
+                operation = "SRI" if i % 2 else "ATI"
+                store.submit(self._result(i), {"operation": operation, "timestamp": f"2025-05-{1 + i % 5:02d}T00:00:00"})
+            store.flush()
+            seen, cursor = [], None
+            while True:
+                page = store.query_history(operation="SRI", limit=5, before=cursor)
+                if not page:
+                    break
+                seen.extend(row["id"] for row in page)
+                cursor = store.next_cursor(page)
+            self.assertEqual(len(seen), 12)
+            self.assertEqual(len(set(seen)), 12)
+            filtered = store.query_history(operation="MAP_SRI", start_date="2025-05-02", end_date="2025-05-03", limit=100)
+            self.assertTrue(all("2025-05-02" <= row["timestamp"] < "2025-05-04" for row in filtered))
+            self.assertEqual(len(filtered), 5)
+        finally:
+            store.close()
+
+    def test_payloads_are_deduplicated_by_content(self):
+        store = TransactionStore(self.db_path, batch_size=50)
+        request = bytes(range(64)) * 4
+        response = bytes.fromhex("0900030e1300050005001a0418") + b"1" * 40
+        try:
+            for i in range(200):
+                store.submit(self._result(i), {"operation": "SRI", "request": request, "response": response})
+            store.flush()
+            payloads = store.execute("SELECT compression, size, length(data) AS stored FROM payloads")
+            self.assertEqual(len(payloads), 2)
+            self.assertTrue(all(row["stored"] < row["size"] for row in payloads))
+            self.assertEqual(store.execute("SELECT COUNT(*) AS n FROM responses WHERE raw_response IS NOT NULL")[0]["n"], 0)
+            rows = store.query_history(limit=1)
+            self.assertEqual(rows[0]["request_data"], request.hex())
+            self.assertEqual(rows[0]["response_data"], response.hex())
+            digest = store.execute("SELECT response_hash FROM responses LIMIT 1")[0]["response_hash"]
+            self.assertEqual(store.get_payload(digest), response)
+        finally:
+            store.close()
+
+    def test_uncompressed_payloads(self):
+        store = TransactionStore(self.db_path, compression=None)
+        try:
+            store.submit(self._result(1), {"operation": "SRI", "response": b"\x00" * 100})
+            store.flush()
+            row = store.execute("SELECT compression, size, length(data) AS stored FROM payloads")[0]
+            self.assertEqual((row["compression"], row["stored"]), (0, 100))
+            self.assertEqual(store.query_history()[0]["response_data"], "00" * 100)
+        finally:
+            store.close()
+
+    def test_migrates_hex_payloads(self):
+        store = TransactionStore(self.db_path)
+        store.close()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("PRAGMA user_version = 2")
+            conn.execute("DROP TABLE campaigns")
+            conn.execute("DROP TABLE campaign_ranges")
+            conn.execute("DROP INDEX idx_responses_campaign")
+            conn.execute("ALTER TABLE responses DROP COLUMN campaign_id")
+            conn.execute("ALTER TABLE responses DROP COLUMN campaign_index")
+            conn.execute("DROP TABLE payloads")
+            conn.execute("ALTER TABLE responses DROP COLUMN request_hash")
+            conn.execute("ALTER TABLE responses DROP COLUMN response_hash")
+            conn.executemany(
+                "INSERT INTO responses (operation, status, timestamp, request_data, raw_response) VALUES (?, ?, ?, ?, ?)",
+                [("SRI", "success", f"2025-05-01T00:00:0{i}", "0a0b", "0c0d") for i in range(3)]
+            )
+        store = TransactionStore(self.db_path)
+        try:
+            self.assertEqual(store.execute("SELECT COUNT(*) AS n FROM payloads")[0]["n"], 2)
+            rows = store.query_history()
+            self.assertEqual(len(rows), 3)
+            self.assertTrue(all(row["request_data"] == "0a0b" and row["response_data"] == "0c0d" for row in rows))
+        finally:
+            store.close()
+
+    def test_history_queries_use_indexes(self):
+        store = TransactionStore(self.db_path)
+        try:
+            plan = store.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM responses WHERE operation = ? AND timestamp >= ? "
+                "ORDER BY timestamp DESC, id DESC LIMIT 10", ("SRI", "2025-01-01")
+            )
+            self.assertIn("idx_responses_operation_timestamp", " ".join(row["detail"] for row in plan))
+            plan = store.execute("EXPLAIN QUERY PLAN SELECT id FROM responses WHERE imsi = ?", ("1",))
+            self.assertIn("idx_responses_imsi", " ".join(row["detail"] for row in plan))
+        finally:
+            store.close()
+
+if __name__ == "__main__":
+    unittest.main()
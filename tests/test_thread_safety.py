@@ -0,0 +1,120 @@
+# tests/test_thread_safety.py
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import yaml
+from app.config_manager import ConfigManager
+from app.core import SS7Core
+from tests.mock_ss7_server import create_response
+from utils.protocols.ss7_layers import SCCP_UDT
+
+
+class SlowPool:
+    """Connection pool stand-in answering every packet after a short delay."""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def send_packet(self, target_ip, target_port, protocol, packet, timings=None):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            return create_response(SCCP_UDT(packet))
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def close_all(self):
+        pass
+
+
+class TestSS7CoreThreads(unittest.TestCase):
+    def setUp(self):
+        self.core = SS7Core(api_key="test_key_123", db_path=None)
+        self.pool = self.core.connection_pool = SlowPool()
+
+    def tearDown(self):
+        self.core.close()
+
+    def _spec(self, i, operation="ATI"):
+        spec = {"operation": operation, "imsi": f"{123456789000000 + i:015d}", "target_ip": "127.0.0.1",
+                "target_port": 2905, "ssn": 6, "gt": "1234567890", "protocol": "TCP"}
+        if operation == "SRI":
+            spec["msisdn"] = "9876543210"
+        return spec
+
+    def test_more_threads_than_invoke_ids(self):
+        results = []
+        threads = [
+            threading.Thread(target=lambda i=i: results.append(self.core.send_spec(self._spec(i))))
+            for i in range(300)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 300)
+        self.assertTrue(all(result["status"] == "success" for result in results))
+        self.assertLessEqual(self.pool.peak, self.core.transactions.capacity)
+        self.assertEqual(len(self.core.transactions), 0)
+
+    def test_send_many_is_lazy_and_bounded(self):
+        consumed = []
+
+        def requests():
+            for i in range(200):
+                consumed.append(i)
+                yield self._spec(i, "SRI" if i % 2 else "ATI")
+
+        seen = 0
+        for request, result in self.core.send_many(requests(), max_workers=8, max_in_flight=16):
+            self.assertEqual(result["status"], "success")
+            self.assertEqual(result["params"]["imsi"], request["imsi"])
+            self.assertLessEqual(len(consumed) - seen, 16)
+            seen += 1
+        self.assertEqual(seen, 200)
+        self.assertLessEqual(self.pool.peak, 8)
+
+    def test_send_many_reports_invalid_specs(self):
+        results = list(self.core.send_many([{"operation": "FOO"}, {"imsi": "1"}, {"operation": "ATI", "imsi": "1"}]))
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(result["status"] == "error" for _, result in results))
+
+
+class TestConfigManagerThreads(unittest.TestCase):
+    def test_concurrent_set_config_writes_complete_files(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "config.yml")
+            shutil.copy("configs/default_config.yml", path)
+            config = ConfigManager(config_file=path)
+
+            def writer(n):
+                for i in range(20):
+                    config.set_config(f"key_{n}", {"i": i, "payload": "x" * 200})
+                    with open(path) as f:
+                        self.assertIn("ss7", yaml.safe_load(f))
+
+            threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            with open(path) as f:
+                saved = yaml.safe_load(f)
+            self.assertEqual({saved[f"key_{n}"]["i"] for n in range(8)}, {19})
+            self.assertEqual(os.listdir(tmpdir), ["config.yml"])
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# tests/test_transaction_manager.py
+import time
+import unittest
+from app.transaction_manager import IdAllocator, TransactionManager
+
+
+class TestIdAllocator(unittest.TestCase):
+    def test_allocates_unique_ids(self):
+        allocator = IdAllocator(0, 3)
+        ids = [allocator.allocate() for _ in range(4)]
+        self.assertEqual(sorted(ids), [0, 1, 2, 3])
+        with self.assertRaises(RuntimeError):
+            allocator.allocate()
+
+    def test_recycles_released_ids_in_fifo_order(self):
+        allocator = IdAllocator(0, 2)
+        for _ in range(3):
+            allocator.allocate()
+        allocator.release(1)
+        allocator.release(0)
+        self.assertEqual(allocator.allocate(), 1)
+        self.assertEqual(allocator.allocate(), 0)
+        self.assertEqual(allocator.in_use(), 3)
+
+    def test_quarantined_ids_come_back_after_grace(self):
+        allocator = IdAllocator(0, 1, grace=0.05)
+        allocator.allocate()
+        allocator.allocate()
+        allocator.release(0, quarantine=True)
+        self.assertEqual(allocator.quarantined(), 1)
+        with self.assertRaises(RuntimeError):
+            allocator.allocate()
+        self.assertGreater(allocator.retry_after(), 0.0)
+        time.sleep(allocator.retry_after())
+        self.assertEqual(allocator.allocate(), 0)
+        self.assertIsNone(allocator.retry_after())
+
+
+class TestTransactionManager(unittest.TestCase):
+    def test_routes_results_by_invoke_id(self):
+        manager = TransactionManager()
+        first = manager.begin("SRI")
+        second = manager.begin("ATI")
+        self.assertNotEqual(first.invoke_id, second.invoke_id)
+
+        self.assertTrue(manager.resolve(second.invoke_id, {"operation": "MAP_ATI"}))
+        self.assertTrue(manager.resolve(first.invoke_id, {"operation": "MAP_SRI"}))
+        self.assertEqual(first.future.result(timeout=0)["operation"], "MAP_SRI")
+        self.assertEqual(second.future.result(timeout=0)["operation"], "MAP_ATI")
+        self.assertEqual(len(manager), 0)
+
+    def test_unknown_invoke_id_is_ignored(self):
+        manager = TransactionManager()
+        self.assertFalse(manager.resolve(42, {}))
+        self.assertFalse(manager.resolve(None, {}))
+
+    def test_fail_all_releases_ids(self):
+        manager = TransactionManager(invoke_id_low=0, invoke_id_high=1)
+        txns = [manager.begin("PSI"), manager.begin("PSI")]
+        self.assertEqual(manager.fail_all(ConnectionResetError("closed")), 2)
+        for txn in txns:
+            self.assertIsInstance(txn.future.exception(timeout=0), ConnectionResetError)
+        manager.begin("PSI")
+
+    def test_expired_ids_are_not_matched_to_new_transactions(self):
+        manager = TransactionManager(invoke_id_low=0, invoke_id_high=1, reuse_grace=0.1)
+        expired = manager.begin("ATI")
+        self.assertTrue(manager.expire(expired.invoke_id))
+        fresh = manager.begin("ATI")
+        self.assertNotEqual(fresh.invoke_id, expired.invoke_id)
+        # the late response for the expired transaction finds no waiter
+        self.assertFalse(manager.resolve(expired.invoke_id, {"operation": "MAP_ATI"}))
+        self.assertFalse(fresh.future.done())
+        self.assertTrue(manager.resolve(fresh.invoke_id, {}))
+        self.assertFalse(manager.expire(fresh.invoke_id))
+
+        started = time.monotonic()
+        manager.begin("ATI")
+        reused = manager.begin_waiting("ATI")
+        self.assertEqual(reused.invoke_id, expired.invoke_id)
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+# tests/test_triage.py
+import os
+import tempfile
+import threading
+import unittest
+from app.fuzzer import Fuzzer, Mutator, seed_packets
+from app.triage import FLAKY, MINIMIZED, Triage, anomaly
+from tests.mock_ss7_server import create_response
+from tests.test_campaign import MockServer
+from utils.protocols.ss7_layers import SCCP_UDT
+
+SEEDS = seed_packets("123456789012345", "9876543210", "1234567890", "1234567890", 6)
+
+
+class FakeTarget:
+    """Answers every request like the mock server, except that inputs
+    containing b"\\xde\\xad" reset the association and b"\\xbe\\xef" does so
+    only the first time it is seen."""
+
+    def __init__(self):
+        self.seen = set()
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def client(self, target_ip, target_port, protocol, timeout):
+        return FakeClient(self)
+
+
+class FakeClient:
+    def __init__(self, target):
+        self.target = target
+
+    def connect(self):
+        pass
+
+    def close(self):
+        pass
+
+    def request(self, packet):
+        packet = bytes(packet)
+        with self.target.lock:
+            self.target.requests += 1
+            first = packet not in self.target.seen
+            self.target.seen.add(packet)
+        if b"\xde\xad" in packet or (first and b"\xbe\xef" in packet):
+            raise ConnectionResetError("Connection reset by peer")
+        try:
+            return create_response(SCCP_UDT(packet))
+        except Exception:
+            return b""
+
+
+class TestTriage(unittest.TestCase):
+    def test_anomaly_kinds(self):
+        self.assertIsNone(anomaly({"outcome": "response", "status": "success"}))
+        self.assertEqual(anomaly({"outcome": "response", "status": "error"}), "garbage")
+        for outcome in ("reset", "closed", "timeout"):
+            self.assertEqual(anomaly({"outcome": outcome, "status": "error"}), outcome)
+
+    def test_confirms_and_minimizes_in_parallel(self):
+        target = FakeTarget()
+        triage = Triage(("127.0.0.1", 1, "TCP"), workers=4, client_factory=target.client)
+        crash = SEEDS[0][:30] + b"\xde\xad" + SEEDS[0][30:]
+        flaky = SEEDS[0] + b"\x00" * 8 + b"\xbe\xef"
+        fuzzer = Fuzzer(None, "127.0.0.1", 1, "TCP", client_factory=target.client)
+        self.assertTrue(triage.capture(crash, fuzzer.execute(crash)))
+        self.assertFalse(triage.capture(crash + b"\x00", fuzzer.execute(crash + b"\x00")))
+        self.assertFalse(triage.capture(SEEDS[0], fuzzer.execute(SEEDS[0])))
+        result = fuzzer.execute(flaky)
+        self.assertEqual(result["outcome"], "reset")
+        # same signature as the crash, so it only counts as a hit; being
+        # larger it does not replace the captured input either
+        self.assertFalse(triage.capture(flaky, result))
+        self.assertEqual(len(triage), 1)
+        summary = triage.process()
+        finding = next(iter(triage.findings.values()))
+        self.assertEqual((summary["processed"], summary["minimized"]), (1, 1))
+        self.assertEqual(finding.status, MINIMIZED)
+        self.assertEqual(finding.reproducer, b"\xde\xad")
+        self.assertEqual(finding.hits, 3)
+        self.assertLess(finding.tests, 200)
+
+        triage = Triage(("127.0.0.1", 1, "TCP"), workers=2, client_factory=target.client)
+        target.seen.clear()
+        triage.capture(flaky, fuzzer.execute(flaky))
+        self.assertEqual(triage.process()["flaky"], 1)
+        self.assertEqual(next(iter(triage.findings.values())).status, FLAKY)
+
+    def test_persists_findings_from_a_fuzzing_run(self):
+        server = MockServer()
+        server.start()
+        self.addCleanup(server.stop)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            triage = Triage(("127.0.0.1", server.port, "TCP"), tmpdir, workers=2, timeout=0.05, replays=2)
+            fuzzer = Fuzzer(Mutator(SEEDS, seed=4, max_stack=1), "127.0.0.1", server.port, "TCP", timeout=0.05,
+                            triage=triage)
+            try:
+                fuzzer.run(20)
+                truncated = SEEDS[0][:20]
+                triage.capture(truncated, fuzzer.execute(truncated))
+            finally:
+                fuzzer.close()
+            self.assertGreaterEqual(len(triage), 1)
+            summary = triage.process()
+            self.assertEqual(summary["processed"], len(triage))
+            reloaded = Triage(("127.0.0.1", server.port, "TCP"), tmpdir)
+            self.assertEqual(sorted(reloaded.findings), sorted(triage.findings))
+            for key, finding in reloaded.findings.items():
+                self.assertEqual(finding.reproducer, triage.findings[key].reproducer)
+                if finding.status == MINIMIZED:
+                    self.assertTrue(os.path.exists(os.path.join(tmpdir, Triage.REPRODUCERS, f"{key}.bin")))
+            self.assertEqual(reloaded.process()["processed"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,9 @@
 # utils/encoding/bcd.py
+import functools
+import sys
+from typing import Iterable, List, Optional, Union
+
+
 def encode_bcd(number: str) -> bytes:
     """
     Encode a number string into BCD (Binary-Coded Decimal) format.
@@ -70,4 +75,215 @@ def decode_bcd(bcd_data: str) -> str:
     decoded = ''.join(result)
     if not decoded:
         raise ValueError("No valid digits decoded")
-    return decoded
\ No newline at end of file
+    return decoded
+
+# TBCD-STRING (3GPP TS 29.002): BCD with '*', '#', 'a', 'b', 'c' for nibbles
+# 0xA-0xE and 0xF as the filler of an odd-length number.
+TBCD_DIGITS = "0123456789*#abc"
+_TBCD_ENCODE = str.maketrans("*#abc", "abcde")
+_TBCD_DECODE = [
+    "".join(TBCD_DIGITS[nibble] for nibble in (byte & 0x0F, byte >> 4) if nibble != 0xF)
+    for byte in range(256)
+]
+
+
+def encode_tbcd(digits: str) -> bytes:
+    """
+    Encode a TBCD string, e.g. an IMSI, MSISDN or global title.
+
+    Args:
+        digits: Characters from TBCD_DIGITS (may be empty)
+
+    Returns:
+        TBCD-encoded bytes, low nibble first, padded with 0xF
+
+    Raises:
+        ValueError: If digits contains a character TBCD cannot carry
+    """
+    if digits.strip(TBCD_DIGITS):
+        raise ValueError(f"Invalid TBCD digits: {digits}")
+    if len(digits) % 2:
+        digits += "f"
+    digits = digits.translate(_TBCD_ENCODE)
+    return bytes.fromhex("".join(map(str.__add__, digits[1::2], digits[::2])))
+
+
+def decode_tbcd(data) -> str:
+    """
+    Decode TBCD bytes. Never fails: every octet maps to up to two characters
+    and filler nibbles are dropped.
+
+    Args:
+        data: bytes, bytearray or memoryview
+
+    Returns:
+        Decoded TBCD string
+    """
+    return "".join(map(_TBCD_DECODE.__getitem__, data))
+
+
+# Batch codecs. A batch is one contiguous buffer of fixed-width records:
+# encode_bcd_batch packs N numbers into N * ((length + 1) // 2) octets, shorter
+# numbers padded with the 0xF filler, and decode_bcd_batch splits such a buffer
+# back into numbers. numpy does the nibble work when it is installed (imported
+# on the first batch call, not at startup); otherwise pairs of digits go
+# through lookup tables.
+_DECODE_PAIRS = [
+    f"{octet & 0x0F:X}{octet >> 4:X}" if all(n <= 9 or n == 0xF for n in (octet & 0x0F, octet >> 4)) else None
+    for octet in range(256)
+]
+_BUFFER_TYPES = (bytes, bytearray, memoryview)
+
+_np = None
+
+
+def _numpy(use_numpy: Optional[bool]):
+    global _np
+    if use_numpy is False:
+        return None
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = False
+    if use_numpy and not _np:
+        raise ImportError("use_numpy=True but numpy is not installed")
+    return _np or None
+
+
+@functools.lru_cache(maxsize=None)
+def _encode_pairs() -> list:
+    """
+    BCD octet for every pair of ASCII characters read as one native-endian
+    16-bit value; None for pairs that are not two digits or filler.
+    """
+    table = [None] * 65536
+    for octet, pair in enumerate(_DECODE_PAIRS):
+        if pair:
+            first, second = pair.encode('ascii')
+            table[first | (second << 8) if sys.byteorder == "little" else (first << 8) | second] = octet
+    return table
+
+
+def _encode_records(data: bytes, length: int) -> bytes:
+    if length % 2:
+        data = b"F".join(data[i:i + length] for i in range(0, len(data), length)) + b"F"
+    try:
+        return bytes(map(_encode_pairs().__getitem__, memoryview(data).cast('H')))
+    except TypeError:
+        raise ValueError("Input must contain only digits")
+
+
+def _encode_records_numpy(np, data: bytes, length: int) -> bytes:
+    chars = np.frombuffer(data, dtype=np.uint8).reshape(-1, length)
+    filler = chars == ord("F")
+    nibbles = chars - np.uint8(ord("0"))
+    if not ((nibbles <= 9) | filler).all():
+        raise ValueError("Input must contain only digits")
+    nibbles[filler] = 0xF
+    if length % 2:
+        nibbles = np.hstack((nibbles, np.full((len(nibbles), 1), 0xF, dtype=np.uint8)))
+    return ((nibbles[:, 1::2] << 4) | nibbles[:, ::2]).tobytes()
+
+
+def encode_bcd_batch(numbers: Union[Iterable[str], bytes, bytearray, memoryview], length: Optional[int] = None,
+                     use_numpy: Optional[bool] = None) -> bytes:
+    """
+    Encode many numbers into one contiguous buffer of BCD records.
+
+    Args:
+        numbers: Digit strings (a leading '+' is dropped, as in encode_bcd), or
+            a buffer of ASCII digits with length characters per number, padded
+            with 'F'
+        length: Digits per record; defaults to the longest number and is
+            required for a buffer
+        use_numpy: True requires numpy, False never uses it, None uses it if
+            installed
+
+    Returns:
+        (length + 1) // 2 octets per number, each record the bytes encode_bcd
+        returns for that number followed by 0xFF filler octets
+
+    Raises:
+        ValueError: If a number is empty, longer than length or not all digits
+    """
+    if isinstance(numbers, _BUFFER_TYPES):
+        if not length or length < 1:
+            raise ValueError("length is required to encode a buffer")
+        data = bytes(numbers).upper()
+        if len(data) % length:
+            raise ValueError(f"Buffer size {len(data)} is not a multiple of {length}")
+        if any(not data[i:i + length].strip(b"F") for i in range(0, len(data), length)):
+            raise ValueError("Input cannot be empty")
+    else:
+        numbers = [number.lstrip('+') for number in numbers]
+        if not numbers:
+            return b""
+        longest = max(map(len, numbers))
+        length = length or longest
+        if longest > length:
+            raise ValueError(f"Number longer than {length} digits")
+        if not all(numbers):
+            raise ValueError("Input cannot be empty")
+        digits = "".join(numbers)
+        if not (digits.isascii() and digits.isdigit()):
+            raise ValueError("Input must contain only digits")
+        data = "".join(number.ljust(length, "F") for number in numbers).encode('ascii')
+    np = _numpy(use_numpy)
+    if np is not None:
+        return _encode_records_numpy(np, data, length)
+    return _encode_records(data, length)
+
+
+def _decode_records(data) -> str:
+    try:
+        return "".join(map(_DECODE_PAIRS.__getitem__, data))
+    except TypeError:
+        raise ValueError("Invalid BCD digit")
+
+
+def _decode_records_numpy(np, data, width: int) -> str:
+    octets = np.frombuffer(data, dtype=np.uint8).reshape(-1, width)
+    nibbles = np.empty((len(octets), 2 * width), dtype=np.uint8)
+    nibbles[:, ::2] = octets & 0x0F
+    nibbles[:, 1::2] = octets >> 4
+    filler = nibbles == 0xF
+    if ((nibbles > 9) & ~filler).any():
+        raise ValueError("Invalid BCD digit")
+    chars = nibbles + np.uint8(ord("0"))
+    chars[filler] = ord("F")
+    return chars.tobytes().decode('ascii')
+
+
+def decode_bcd_batch(data: Union[bytes, bytearray, memoryview], width: int, as_buffer: bool = False,
+                     use_numpy: Optional[bool] = None) -> Union[List[str], bytes]:
+    """
+    Decode a contiguous buffer of fixed-width BCD records, e.g. from
+    encode_bcd_batch.
+
+    Args:
+        data: Buffer of width octets per number
+        width: Octets per record
+        as_buffer: Return one buffer of 2 * width ASCII characters per number,
+            filler nibbles as 'F' (the buffer form encode_bcd_batch takes),
+            instead of a list of strings
+        use_numpy: True requires numpy, False never uses it, None uses it if
+            installed
+
+    Returns:
+        Decoded number strings (filler dropped, as decode_bcd), or the buffer
+
+    Raises:
+        ValueError: If data is not whole records or a record holds an invalid
+            BCD digit or no digits at all
+    """
+    if width < 1 or len(data) % width:
+        raise ValueError(f"Buffer size {len(data)} is not a multiple of {width}")
+    np = _numpy(use_numpy)
+    text = _decode_records_numpy(np, data, width) if np is not None else _decode_records(data)
+    size = 2 * width
+    numbers = [text[i:i + size].replace("F", "") for i in range(0, len(text), size)]
+    if not all(numbers):
+        raise ValueError("No valid digits decoded")
+    return text.encode('ascii') if as_buffer else numbers
@@ -0,0 +1,272 @@
+# utils/network/async_transport.py
+import asyncio
+import logging
+import socket
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+from utils.network.framing import SCCP_HEADER_LEN, sccp_body_length
+
+PoolKey = Tuple[str, int, str]
+
+
+class AsyncTCPTransport:
+    """
+    TCP transport built on asyncio streams.
+    """
+    def __init__(self, host: str, port: int):
+        """
+        Initialize asyncio TCP transport.
+
+        Args:
+            host: Target host IP
+            port: Target port
+        """
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.logger = logging.getLogger(__name__)
+
+    async def connect(self) -> None:
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.logger.debug(f"Async TCP connection to {self.host}:{self.port} established")
+
+    def is_alive(self) -> bool:
+        return (
+            self.writer is not None
+            and not self.writer.is_closing()
+            and not self.reader.at_eof()
+        )
+
+    async def send_packet(self, data: bytes) -> bytes:
+        """
+        Send packet and wait for the response on the open connection.
+
+        Returns:
+            One complete SCCP message; whatever arrived (possibly b"") if
+            the peer closed the connection first
+        """
+        if not self.is_alive():
+            await self.connect()
+        self.writer.write(data)
+        await self.writer.drain()
+        try:
+            return await self.read_frame()
+        except asyncio.IncompleteReadError as e:
+            await self.close()
+            return e.partial
+
+    async def send(self, data: bytes) -> None:
+        """
+        Write a packet without waiting for a response (pipelined mode).
+        """
+        if not self.is_alive():
+            await self.connect()
+        self.writer.write(data)
+        await self.writer.drain()
+
+    async def read_frame(self) -> bytes:
+        """
+        Read exactly one SCCP UDT message from the stream.
+
+        Raises:
+            asyncio.IncompleteReadError: If the peer closes mid-message
+        """
+        header = await self.reader.readexactly(SCCP_HEADER_LEN)
+        body = await self.reader.readexactly(sccp_body_length(header))
+        return header + body
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError as e:
+                self.logger.debug(f"Error closing async TCP connection: {e}")
+            finally:
+                self.reader = None
+                self.writer = None
+
+
+class AsyncSCTPTransport:
+    """
+    SCTP adapter driving a non-blocking one-to-one SCTP socket from the event loop.
+
+    asyncio has no SCTP stream support, so the socket is serviced through
+    loop.sock_* primitives instead of the blocking SCTPClient.
+    """
+    def __init__(self, target_ip: str, target_port: int, buffer_size: int = 1024):
+        """
+        Initialize asyncio SCTP transport.
+
+        Args:
+            target_ip: Target host IP
+            target_port: Target port
+            buffer_size: Bytes requested per receive call
+        """
+        self.target_ip = target_ip
+        self.target_port = target_port
+        self.buffer_size = buffer_size
+        self.sock: Optional[socket.socket] = None
+        self._pending = bytearray()
+        self.logger = logging.getLogger(__name__)
+
+    async def connect(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._pending.clear()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_SCTP)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, (self.target_ip, self.target_port))
+        except Exception:
+            sock.close()
+            raise
+        self.sock = sock
+        self.logger.debug(f"Async SCTP association to {self.target_ip}:{self.target_port} established")
+
+    def is_alive(self) -> bool:
+        return self.sock is not None and self.sock.fileno() >= 0
+
+    async def send_packet(self, packet: bytes) -> bytes:
+        """
+        Send packet and wait for the response on the open association.
+
+        Returns:
+            One complete SCCP message; whatever arrived (possibly b"") if
+            the peer closed the association first
+        """
+        if not self.is_alive():
+            await self.connect()
+        await asyncio.get_running_loop().sock_sendall(self.sock, packet)
+        try:
+            return await self.read_frame()
+        except asyncio.IncompleteReadError as e:
+            await self.close()
+            return e.partial
+
+    async def send(self, packet: bytes) -> None:
+        """
+        Write a packet without waiting for a response (pipelined mode).
+        """
+        if not self.is_alive():
+            await self.connect()
+        await asyncio.get_running_loop().sock_sendall(self.sock, packet)
+
+    async def read_frame(self) -> bytes:
+        """
+        Read exactly one SCCP UDT message from the association.
+
+        Raises:
+            asyncio.IncompleteReadError: If the peer closes mid-message
+        """
+        await self._fill(SCCP_HEADER_LEN)
+        total = SCCP_HEADER_LEN + sccp_body_length(self._pending)
+        await self._fill(total)
+        frame = bytes(self._pending[:total])
+        del self._pending[:total]
+        return frame
+
+    async def _fill(self, size: int) -> None:
+        loop = asyncio.get_running_loop()
+        while len(self._pending) < size:
+            chunk = await loop.sock_recv(self.sock, max(self.buffer_size, size - len(self._pending)))
+            if not chunk:
+                raise asyncio.IncompleteReadError(bytes(self._pending), size)
+            self._pending += chunk
+
+    async def close(self) -> None:
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError as e:
+                self.logger.debug(f"Error closing async SCTP association: {e}")
+            finally:
+                self.sock = None
+
+
+def create_transport(target_ip: str, target_port: int, protocol: str):
+    """
+    Create an asyncio transport for the given protocol.
+    """
+    if protocol.upper() == "SCTP":
+        return AsyncSCTPTransport(target_ip, target_port)
+    return AsyncTCPTransport(target_ip, target_port)
+
+
+class AsyncConnectionPool:
+    """
+    Event-loop counterpart of ConnectionPool: idle transports are kept per
+    (ip, port, protocol) and reused by later transactions.
+    """
+    def __init__(self, max_idle_per_key: int = 64, idle_timeout: float = 30.0):
+        self.max_idle_per_key = max_idle_per_key
+        self.idle_timeout = idle_timeout
+        self._idle: Dict[PoolKey, Deque[Tuple[object, float]]] = {}
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def make_key(target_ip: str, target_port: int, protocol: str) -> PoolKey:
+        return (target_ip, int(target_port), protocol.upper())
+
+    def acquire(self, key: PoolKey) -> Tuple[object, bool]:
+        now = time.monotonic()
+        idle = self._idle.get(key)
+        while idle:
+            transport, last_used = idle.pop()
+            if now - last_used <= self.idle_timeout and transport.is_alive():
+                return transport, True
+            asyncio.ensure_future(transport.close())
+        return create_transport(*key), False
+
+    async def release(self, key: PoolKey, transport, healthy: bool = True) -> None:
+        idle = self._idle.setdefault(key, deque())
+        if not healthy or not transport.is_alive() or len(idle) >= self.max_idle_per_key:
+            await transport.close()
+            return
+        idle.append((transport, time.monotonic()))
+
+    async def send_packet(self, target_ip: str, target_port: int, protocol: str, packet: bytes) -> bytes:
+        """
+        Send a packet over a pooled transport, retrying once on a fresh
+        connection if a reused one has gone away.
+        """
+        return await self.transact(target_ip, target_port, protocol, lambda transport: transport.send_packet(packet))
+
+    async def transact(self, target_ip: str, target_port: int, protocol: str,
+                       exchange: Callable[[object], Awaitable[bytes]]) -> bytes:
+        """
+        Run exchange(transport) on a pooled transport, as send_packet does;
+        used when the packet depends on the transport, e.g. on invoke IDs
+        allocated per association.
+        """
+        key = self.make_key(target_ip, target_port, protocol)
+        transport, reused = self.acquire(key)
+        try:
+            response = await exchange(transport)
+            if reused and not response:
+                raise ConnectionResetError("Pooled connection closed by peer")
+        except OSError as e:
+            await transport.close()
+            if not reused:
+                raise
+            self.logger.info(f"Pooled async connection to {target_ip}:{target_port} failed ({e}), reconnecting")
+            transport, _ = self.acquire(key)
+            try:
+                response = await exchange(transport)
+            except BaseException:
+                await transport.close()
+                raise
+        except BaseException:
+            # Includes cancellation by a transaction deadline: the response
+            # may still arrive later, so the transport cannot be reused.
+            await transport.close()
+            raise
+        await self.release(key, transport, healthy=bool(response))
+        return response
+
+    async def close_all(self) -> None:
+        idle, self._idle = self._idle, {}
+        for transports in idle.values():
+            for transport, _ in transports:
+                await transport.close()
@@ -0,0 +1,219 @@
+# utils/network/connection_pool.py
+import logging
+import select
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from utils.network.sctp_client import SCTPClient
+from utils.network.tcp_client import TCPClient
+
+PoolKey = Tuple[str, int, str]
+
+
+def socket_alive(sock: Optional[socket.socket]) -> bool:
+    """
+    Check whether an idle socket is still usable without blocking.
+
+    An idle association must not be readable: a readable socket either
+    has been closed by the peer (recv returns b"") or holds a stale,
+    unsolicited message that would be mistaken for the next response.
+
+    Args:
+        sock: Socket to probe
+
+    Returns:
+        True if the socket is open and has no pending data
+    """
+    if sock is None:
+        return False
+    try:
+        if sock.fileno() < 0:
+            return False
+        readable, _, errored = select.select([sock], [], [sock], 0)
+        if errored:
+            return False
+        if readable:
+            return False
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def default_client_factory(target_ip: str, target_port: int, protocol: str):
+    """
+    Create a persistent transport client for the given protocol.
+    """
+    if protocol.upper() == "SCTP":
+        return SCTPClient(target_ip, target_port, persistent=True)
+    return TCPClient(target_ip, target_port, persistent=True)
+
+
+class ConnectionPool:
+    """
+    Pool of persistent SCTP/TCP associations keyed by (ip, port, protocol).
+
+    Connections are checked for health when they are taken from the pool,
+    re-established transparently when a reused association turns out to be
+    dead, and evicted once they have been idle longer than idle_timeout.
+    """
+
+    def __init__(self, max_idle_per_key: int = 4, idle_timeout: float = 30.0,
+                 client_factory: Optional[Callable[[str, int, str], object]] = None):
+        """
+        Initialize connection pool.
+
+        Args:
+            max_idle_per_key: Maximum idle connections kept per target
+            idle_timeout: Seconds an idle connection is kept before eviction
+            client_factory: Callable creating a client for (ip, port, protocol)
+        """
+        self.max_idle_per_key = max_idle_per_key
+        self.idle_timeout = idle_timeout
+        self.client_factory = client_factory or default_client_factory
+        self._idle: Dict[PoolKey, Deque[Tuple[object, float]]] = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def make_key(target_ip: str, target_port: int, protocol: str) -> PoolKey:
+        return (target_ip, int(target_port), protocol.upper())
+
+    def acquire(self, key: PoolKey) -> Tuple[object, bool]:
+        """
+        Take a healthy connection for key from the pool or create a new one.
+
+        Returns:
+            Tuple of (client, reused) where reused tells whether the client
+            already had an open association
+        """
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle:
+                client, last_used = idle.pop()
+                if now - last_used > self.idle_timeout or not socket_alive(client.sock):
+                    self._discard(client)
+                    continue
+                return client, True
+        return self.client_factory(*key), False
+
+    def release(self, key: PoolKey, client, healthy: bool = True) -> None:
+        """
+        Return a client to the pool, or close it if unhealthy or the pool is full.
+        """
+        if not healthy or client.sock is None:
+            self._discard(client)
+            return
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.setdefault(key, deque())
+            if len(idle) >= self.max_idle_per_key:
+                self._discard(client)
+                return
+            idle.append((client, now))
+        self.evict_idle(now)
+
+    @contextmanager
+    def connection(self, target_ip: str, target_port: int, protocol: str):
+        """
+        Context manager yielding a pooled client; the client is discarded
+        if the block raises.
+        """
+        key = self.make_key(target_ip, target_port, protocol)
+        client, _ = self.acquire(key)
+        try:
+            yield client
+        except Exception:
+            self.release(key, client, healthy=False)
+            raise
+        self.release(key, client)
+
+    def send_packet(self, target_ip: str, target_port: int, protocol: str, packet: bytes,
+                    timings: Optional[dict] = None) -> bytes:
+        """
+        Send a packet over a pooled association and return the response.
+
+        A failure or an empty reply (b"" or None) on a reused association is
+        retried once on a fresh one, since the peer may have closed it while
+        it sat idle.
+
+        Args:
+            timings: Optional dict collecting per-stage seconds; taking a
+                connection from the pool counts towards "connect"
+        """
+        key = self.make_key(target_ip, target_port, protocol)
+        started = time.perf_counter()
+        client, reused = self.acquire(key)
+        if timings is not None:
+            timings["connect"] = timings.get("connect", 0.0) + time.perf_counter() - started
+        try:
+            response = client.send_packet(packet, timings=timings)
+        except (OSError, socket.timeout) as e:
+            self.release(key, client, healthy=False)
+            if not reused:
+                raise
+            reason = str(e)
+        except Exception:
+            self.release(key, client, healthy=False)
+            raise
+        else:
+            if response or not reused:
+                self.release(key, client, healthy=bool(response))
+                return response
+            self.release(key, client, healthy=False)
+            reason = "empty response"
+        self.logger.info(f"Pooled connection to {target_ip}:{target_port} failed ({reason}), reconnecting")
+        client = self.client_factory(*key)
+        try:
+            response = client.send_packet(packet, timings=timings)
+        except Exception:
+            self.release(key, client, healthy=False)
+            raise
+        self.release(key, client, healthy=bool(response))
+        return response
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        Close connections idle for longer than idle_timeout.
+
+        Returns:
+            Number of evicted connections
+        """
+        now = time.monotonic() if now is None else now
+        evicted = []
+        with self._lock:
+            for key in list(self._idle):
+                idle = self._idle[key]
+                while idle and now - idle[0][1] > self.idle_timeout:
+                    evicted.append(idle.popleft()[0])
+                if not idle:
+                    del self._idle[key]
+        for client in evicted:
+            self._discard(client)
+        return len(evicted)
+
+    def idle_count(self, key: Optional[PoolKey] = None) -> int:
+        with self._lock:
+            if key is not None:
+                return len(self._idle.get(key, ()))
+            return sum(len(idle) for idle in self._idle.values())
+
+    def close_all(self) -> None:
+        """
+        Close every idle connection held by the pool.
+        """
+        with self._lock:
+            clients = [client for idle in self._idle.values() for client, _ in idle]
+            self._idle.clear()
+        for client in clients:
+            self._discard(client)
+
+    def _discard(self, client) -> None:
+        try:
+            client.close()
+        except Exception as e:
+            self.logger.error(f"Error closing pooled connection: {e}")
@@ -0,0 +1,158 @@
+# utils/network/framing.py
+import socket
+import struct
+import time
+
+# SCCP UDT header as laid out by utils.protocols.ss7_layers.SCCP_UDT:
+# msg_type, protocol_class, pointer1-3 (1 byte each), then called_len,
+# calling_len and data_len as 16-bit big-endian integers.
+SCCP_HEADER = struct.Struct(">BBBBBHHH")
+SCCP_HEADER_LEN = SCCP_HEADER.size
+
+
+def sccp_body_length(header) -> int:
+    """
+    Return the number of bytes following an SCCP UDT header.
+
+    Args:
+        header: At least SCCP_HEADER_LEN bytes of a UDT message
+
+    Returns:
+        Combined length of the called party, calling party and data fields
+    """
+    _, _, _, _, _, called_len, calling_len, data_len = SCCP_HEADER.unpack_from(header)
+    return called_len + calling_len + data_len
+
+
+class FrameReader:
+    """
+    Reassemble complete messages from a stream socket into a reusable buffer.
+
+    Bytes are received with recv_into() straight into a preallocated
+    bytearray and frames are handed out as memoryview slices of that buffer,
+    so no per-message copies are made. A returned view is only valid until
+    the next call to read_frame().
+
+    Two framing modes are supported:
+        "sccp": frame length derived from the SCCP UDT length fields
+        "length_prefix": each frame is preceded by a big-endian length of
+            prefix_size bytes (2 or 4), which is stripped from the result
+    """
+
+    def __init__(self, sock=None, mode: str = "sccp", prefix_size: int = 2, buffer_size: int = 65536):
+        """
+        Initialize frame reader.
+
+        Args:
+            sock: Connected stream socket (may be attached later)
+            mode: "sccp" or "length_prefix"
+            prefix_size: Size of the length prefix in bytes
+            buffer_size: Initial receive buffer size; grows for larger frames
+        """
+        if mode not in ("sccp", "length_prefix"):
+            raise ValueError(f"Unknown framing mode: {mode}")
+        if prefix_size not in (2, 4):
+            raise ValueError("prefix_size must be 2 or 4")
+        self.sock = sock
+        self.mode = mode
+        self.prefix_size = prefix_size
+        self._buf = bytearray(buffer_size)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+        self._needed = 0
+
+    def attach(self, sock) -> None:
+        """
+        Switch to a new socket and drop any buffered bytes.
+        """
+        self.sock = sock
+        self._start = 0
+        self._end = 0
+        self._needed = 0
+
+    @property
+    def buffered(self) -> int:
+        return self._end - self._start
+
+    def read_frame(self, timeout: float):
+        """
+        Return the next complete frame, waiting until the deadline if needed.
+
+        Args:
+            timeout: Seconds to wait for a complete frame
+
+        Returns:
+            memoryview of the frame; an empty view if the peer closed the
+            connection with nothing buffered. If the peer closes mid-frame
+            the buffered bytes are returned as they are.
+
+        Raises:
+            socket.timeout: If no complete frame arrived before the deadline
+        """
+        deadline = time.monotonic() + timeout
+        previous = self.sock.gettimeout()
+        try:
+            while True:
+                bounds = self._frame_bounds()
+                if bounds is not None:
+                    begin, end = bounds
+                    self._start = end
+                    if self._start == self._end:
+                        self._start = self._end = 0
+                    return self._view[begin:end]
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise socket.timeout(f"No complete frame within {timeout}s")
+                self._reserve()
+                self.sock.settimeout(remaining)
+                received = self.sock.recv_into(self._view[self._end:])
+                if not received:
+                    frame = self._view[self._start:self._end]
+                    self._start = self._end = 0
+                    return frame
+                self._end += received
+        finally:
+            # the socket may be pooled: do not leave it with this call's deadline
+            if self.sock.fileno() >= 0:
+                self.sock.settimeout(previous)
+
+    def _frame_bounds(self):
+        available = self._end - self._start
+        if self.mode == "sccp":
+            if available < SCCP_HEADER_LEN:
+                return None
+            total = SCCP_HEADER_LEN + sccp_body_length(self._view[self._start:self._start + SCCP_HEADER_LEN])
+            if available < total:
+                self._needed = total
+                return None
+            return self._start, self._start + total
+        if available < self.prefix_size:
+            return None
+        length = int.from_bytes(self._view[self._start:self._start + self.prefix_size], "big")
+        total = self.prefix_size + length
+        if available < total:
+            self._needed = total
+            return None
+        return self._start + self.prefix_size, self._start + total
+
+    def _reserve(self) -> None:
+        """
+        Make room after the buffered bytes for the rest of the current frame,
+        compacting to the front of the buffer or growing it when necessary.
+        """
+        pending = self._end - self._start
+        needed = max(self._needed, pending + 1)
+        self._needed = 0
+        if self._start + needed <= len(self._buf):
+            return
+        if needed <= len(self._buf):
+            self._buf[:pending] = self._buf[self._start:self._end]
+        else:
+            buf = bytearray(max(needed, 2 * len(self._buf)))
+            buf[:pending] = self._view[self._start:self._end]
+            self._buf = buf
+            self._view = memoryview(buf)
+        self._start = 0
+        self._end = pending
@@ -2,15 +2,18 @@
 import socket
 import logging
 import time
-from scapy.all import raw
+from utils.network.framing import FrameReader
 
 class SCTPClient:
-    def __init__(self, target_ip: str, target_port: int, timeout: float = 2.0, retries: int = 3):
+    def __init__(self, target_ip: str, target_port: int, timeout: float = 2.0, retries: int = 3, persistent: bool = False,
+                 framing: str = "sccp", prefix_size: int = 2):
         self.target_ip = target_ip
         self.target_port = target_port
         self.timeout = timeout
         self.retries = retries
+        self.persistent = persistent
         self.sock = None
+        self.reader = FrameReader(mode=framing, prefix_size=prefix_size)
         self.logger = logging.getLogger(__name__)
 
     def connect(self):
@@ -18,6 +21,7 @@ class SCTPClient:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_SCTP)
             self.sock.settimeout(self.timeout)
             self.sock.connect((self.target_ip, self.target_port))
+            self.reader.attach(self.sock)
             self.logger.info(f"Connected to {self.target_ip}:{self.target_port}")
         except Exception as e:
             self.logger.error(f"Connection error: {e}")
@@ -34,35 +38,78 @@ class SCTPClient:
             raise
 
     def receive(self, buffer_size: int = 1024) -> bytes:
+        frame = self.receive_frame()
+        return bytes(frame) if frame is not None else b""
+
+    def receive_frame(self, timeout: float = None):
+        """
+        Wait for one complete SCCP message and return it as a memoryview.
+
+        The view points into the client's receive buffer and is only valid
+        until the next receive. Waits up to timeout (default timeout * retries)
+        and returns None on timeout or receive error.
+        """
         if not self.sock:
             self.logger.error("No active connection")
-            return b""
-        for attempt in range(self.retries):
-            try:
-                data = self.sock.recv(buffer_size)
-                if data:
-                    self.logger.debug(f"Received packet: {data.hex()}")
-                    return data
-                self.logger.warning(f"Empty response on attempt {attempt + 1}")
-                time.sleep(0.1)
-            except socket.timeout:
-                self.logger.warning(f"Receive timeout on attempt {attempt + 1}")
-            except Exception as e:
-                self.logger.error(f"Receive error: {e}")
-                break
-        return b""
+            return None
+        timeout = self.timeout * self.retries if timeout is None else timeout
+        try:
+            frame = self.reader.read_frame(timeout)
+            if not frame:
+                self.logger.warning("Connection closed by peer before response")
+            elif self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Received packet: {frame.hex()}")
+            return frame
+        except socket.timeout:
+            self.logger.warning(f"Receive timeout after {timeout}s")
+        except Exception as e:
+            self.logger.error(f"Receive error: {e}")
+        return None
+
+    def request(self, packet: bytes):
+        """
+        Send a packet on the open association and return the response frame
+        as a memoryview without copying it (see receive_frame).
 
-    def send_packet(self, packet: bytes) -> bytes:
+        Unlike receive_frame, errors are not swallowed, so callers can tell
+        a silent peer from a broken association.
+
+        Returns:
+            The frame, valid until the next receive; empty if the peer
+            closed the association
+
+        Raises:
+            socket.timeout: If no complete frame arrives within timeout * retries
+            OSError: If the association fails, e.g. on a reset
+        """
+        self.send(packet)
+        return self.reader.read_frame(self.timeout * self.retries)
+
+    def send_packet(self, packet: bytes, timings: dict = None) -> bytes:
+        """
+        Send packet and receive the response, adding the seconds spent in the
+        connect, send and receive stages to timings if given.
+        """
         try:
-            self.connect()
+            started = time.perf_counter()
+            if not self.sock:
+                self.connect()
+            connected = time.perf_counter()
             self.send(packet)
+            sent = time.perf_counter()
             response = self.receive()
+            if timings is not None:
+                timings["connect"] = timings.get("connect", 0.0) + connected - started
+                timings["send"] = timings.get("send", 0.0) + sent - connected
+                timings["receive"] = timings.get("receive", 0.0) + time.perf_counter() - sent
             return response
         except Exception as e:
             self.logger.error(f"Send/receive error: {e}")
+            self.close()
             raise
         finally:
-            self.close()
+            if not self.persistent:
+                self.close()
 
     def close(self):
         if self.sock:
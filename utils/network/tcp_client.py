@@ -1,13 +1,16 @@
 # utils/network/tcp_client.py
 import logging
 import socket
+import time
 from typing import Optional
+from utils.network.framing import FrameReader
 
 class TCPClient:
     """
     TCP client for SS7 communication (fallback for testing).
     """
-    def __init__(self, host: str, port: int, timeout: float = 5.0):
+    def __init__(self, host: str, port: int, timeout: float = 5.0, persistent: bool = False,
+                 framing: str = "sccp", prefix_size: int = 2):
         """
         Initialize TCP client.
 
@@ -15,11 +18,16 @@ class TCPClient:
             host: Target host IP
             port: Target port
             timeout: Socket timeout in seconds
+            persistent: Keep the connection open between send_packet calls
+            framing: Stream framing mode, "sccp" or "length_prefix"
+            prefix_size: Length prefix size in bytes for "length_prefix" framing
         """
         self.host = host
         self.port = port
         self.timeout = timeout
+        self.persistent = persistent
         self.sock: Optional[socket.socket] = None
+        self.reader = FrameReader(mode=framing, prefix_size=prefix_size)
         self.logger = logging.getLogger(__name__)
 
     def connect(self) -> None:
@@ -36,6 +44,7 @@ class TCPClient:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.sock.settimeout(self.timeout)
             self.sock.connect((self.host, self.port))
+            self.reader.attach(self.sock)
             self.logger.info(f"Successfully connected to {self.host}:{self.port}")
         except socket.timeout:
             self.logger.error(f"Connection to {self.host}:{self.port} timed out after {self.timeout}s")
@@ -47,12 +56,16 @@ class TCPClient:
             self.logger.error(f"Unexpected error connecting to {self.host}:{self.port}: {e}")
             raise
 
-    def send_packet(self, data: bytes) -> bytes:
+    def send_packet(self, data: bytes, timings: Optional[dict] = None) -> bytes:
         """
         Send packet and receive response, handling connection lifecycle.
 
+        Persistent clients reuse an open connection and only close it on error.
+
         Args:
             data: Data to send
+            timings: Optional dict to which the seconds spent in the connect,
+                send and receive stages are added
 
         Returns:
             Response data
@@ -62,20 +75,47 @@ class TCPClient:
             Exception: For other send/receive errors
         """
         try:
-            self.connect()
+            started = time.perf_counter()
+            if not self.sock:
+                self.connect()
+            connected = time.perf_counter()
             self.logger.debug(f"Sending data: {data.hex().upper()}")
             self.sock.sendall(data)
-            response = self.sock.recv(4096)
+            sent = time.perf_counter()
+            response = bytes(self.reader.read_frame(self.timeout))
+            if timings is not None:
+                timings["connect"] = timings.get("connect", 0.0) + connected - started
+                timings["send"] = timings.get("send", 0.0) + sent - connected
+                timings["receive"] = timings.get("receive", 0.0) + time.perf_counter() - sent
             self.logger.debug(f"Received response: {response.hex().upper()}")
             return response
         except socket.timeout:
             self.logger.error(f"Send/receive timeout for {self.host}:{self.port} after {self.timeout}s")
+            self.close()
             raise
         except Exception as e:
             self.logger.error(f"Unexpected error during send/receive: {e}")
+            self.close()
             raise
         finally:
-            self.close()
+            if not self.persistent:
+                self.close()
+
+    def request(self, data: bytes):
+        """
+        Send a packet on the open connection and return the response frame.
+
+        Returns:
+            memoryview into the client's receive buffer, valid until the
+            next receive; empty if the peer closed the connection
+
+        Raises:
+            socket.timeout: If no complete frame arrives within timeout
+        """
+        if not self.sock:
+            self.connect()
+        self.sock.sendall(data)
+        return self.reader.read_frame(self.timeout)
 
     def close(self) -> None:
         """
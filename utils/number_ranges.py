@@ -0,0 +1,296 @@
+# utils/number_ranges.py
+import hashlib
+import itertools
+import math
+import random
+from typing import Iterator, Optional, Tuple
+from utils.encoding.bcd import encode_bcd_batch
+from utils.protocols.map_encoding import ASCII, get_encoding
+
+# Lazy generators for IMSI, MSISDN and GT number spaces. A range is
+# validated once when it is built, so every value it yields is a valid
+# fixed-width digit string and needs no per-item check.
+
+_MASK64 = (1 << 64) - 1
+
+
+class EncodedNumber(str):
+    """
+    Digit string that carries its MAP wire form: wire is what
+    encode_address() returns for it under encoding. TemplateBuilder puts
+    wire on the wire as is instead of encoding the digits again.
+    """
+
+    def __new__(cls, digits: str, wire: bytes, encoding: str):
+        value = super().__new__(cls, digits)
+        value.wire = wire
+        value.encoding = encoding
+        return value
+
+    def __reduce__(self):
+        return EncodedNumber, (str(self), self.wire, self.encoding)
+
+
+class FeistelPermutation:
+    """
+    Seeded pseudo-random permutation of range(size) computed per index.
+
+    A balanced Feistel network permutes the smallest even-bit domain that
+    covers size and cycle-walks back into range, so no table is built no
+    matter how large size is.
+    """
+
+    ROUNDS = 4
+
+    def __init__(self, size: int, seed: int):
+        self.size = int(size)
+        bits = max(2, (self.size - 1).bit_length())
+        bits += bits % 2
+        self._half = bits // 2
+        self._mask = (1 << self._half) - 1
+        rng = random.Random(seed)
+        self._keys = [rng.getrandbits(64) for _ in range(self.ROUNDS)]
+
+    def _round(self, value: int, key: int) -> int:
+        value = ((value ^ key) * 0x9E3779B97F4A7C15) & _MASK64
+        value ^= value >> 29
+        return value & self._mask
+
+    def __call__(self, index: int) -> int:
+        if not 0 <= index < self.size:
+            raise IndexError(f"Index {index} out of range for {self.size}")
+        value = index
+        while True:
+            left, right = value >> self._half, value & self._mask
+            for key in self._keys:
+                left, right = right, left ^ self._round(right, key)
+            value = (left << self._half) | right
+            if value < self.size:
+                return value
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set for deduplicating values across ranges.
+
+    add() never reports a new value as seen twice, but with probability
+    error_rate (at capacity) reports an unseen value as already present.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate in (0, 1)")
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value: str) -> Iterator[int]:
+        digest = hashlib.blake2b(value.encode("ascii"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def __contains__(self, value: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    def add(self, value: str) -> bool:
+        """
+        Add value; returns False if it was (probably) present already.
+        """
+        bits = self._bits
+        new = False
+        for position in self._positions(value):
+            byte, bit = position >> 3, 1 << (position & 7)
+            if not bits[byte] & bit:
+                bits[byte] |= bit
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+
+class NumberRange:
+    """
+    Lazy range of fixed-length numbers: prefix followed by a zero-padded
+    suffix start, start + stride, ... (count values).
+
+    Values can be visited in a seeded random order (seed), split across
+    workers (shard=(i, n) takes every n-th value starting at i, disjoint
+    and together covering the range in any order) and filtered through a
+    BloomFilter shared between ranges (dedup).
+    """
+
+    kind = "number"
+    min_length = 1
+    max_length = 15
+
+    def __init__(self, prefix: str, start: int, count: int, length: int, stride: int = 1,
+                 seed: Optional[int] = None, shard: Tuple[int, int] = (0, 1),
+                 dedup: Optional[BloomFilter] = None):
+        """
+        Initialize range.
+
+        Args:
+            prefix: Fixed leading digits, e.g. MCC + MNC
+            start: First suffix value
+            count: Number of values
+            length: Total digits of every value, prefix included
+            stride: Step between suffix values
+            seed: Visit values in a pseudo-random order derived from seed
+            shard: (index, total) share of the range produced by this iterator
+            dedup: Skip values already added to this filter
+
+        Raises:
+            ValueError: If the range cannot produce valid values
+        """
+        prefix = str(prefix)
+        if prefix and not prefix.isdigit():
+            raise ValueError(f"Invalid {self.kind} prefix: {prefix}")
+        if not self.min_length <= length <= self.max_length:
+            raise ValueError(f"{self.kind} length must be {self.min_length}-{self.max_length} digits, got {length}")
+        self.width = length - len(prefix)
+        if self.width < 1:
+            raise ValueError(f"Prefix {prefix} leaves no digits in a {length}-digit {self.kind}")
+        if start < 0 or count < 0 or stride < 1:
+            raise ValueError("start and count must not be negative and stride must be positive")
+        if count and start + (count - 1) * stride >= 10 ** self.width:
+            raise ValueError(f"{self.kind} range overflows {self.width} suffix digits")
+        index, total = shard
+        if not 0 <= index < total:
+            raise ValueError(f"Invalid shard {index} of {total}")
+        self.prefix = prefix
+        self.start = int(start)
+        self.count = int(count)
+        self.length = length
+        self.stride = int(stride)
+        self.seed = seed
+        self.shard = (int(index), int(total))
+        self.dedup = dedup
+        self._permutation = FeistelPermutation(self.count, seed) if seed is not None and self.count > 1 else None
+
+    def __len__(self) -> int:
+        """
+        Values in this shard, before deduplication.
+        """
+        index, total = self.shard
+        return len(range(index, self.count, total))
+
+    def value(self, position: int) -> str:
+        """
+        Value at position in [0, count) of the whole (unsharded) range.
+        """
+        if self._permutation is not None:
+            position = self._permutation(position)
+        elif not 0 <= position < self.count:
+            raise IndexError(f"Position {position} out of range for {self.count}")
+        return f"{self.prefix}{self.start + position * self.stride:0{self.width}d}"
+
+    def __getitem__(self, item: int) -> str:
+        """
+        item-th value of this shard, ignoring dedup.
+        """
+        index, total = self.shard
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError(f"Index {item} out of range for {len(self)}")
+        return self.value(index + item * total)
+
+    def __iter__(self) -> Iterator[str]:
+        index, total = self.shard
+        dedup = self.dedup
+        for position in range(index, self.count, total):
+            value = self.value(position)
+            if dedup is not None and not dedup.add(value):
+                continue
+            yield value
+
+    def encoded(self, chunk_size: int = 1024) -> Iterator[EncodedNumber]:
+        """
+        Iterate like the range itself, but yield EncodedNumbers carrying the
+        encode_address() form for the current MAP encoding: a length octet
+        and TBCD digits, encoded chunk_size values at a time with
+        encode_bcd_batch, or the ASCII digits.
+        """
+        encoding = get_encoding()
+        values = iter(self)
+        if encoding == ASCII:
+            for value in values:
+                yield EncodedNumber(value, value.encode("ascii"), encoding)
+            return
+        width = (self.length + 1) // 2
+        octet = bytes((width,))
+        while True:
+            chunk = list(itertools.islice(values, chunk_size))
+            if not chunk:
+                return
+            data = encode_bcd_batch(chunk, self.length)
+            for i, value in enumerate(chunk):
+                yield EncodedNumber(value, octet + data[i * width:(i + 1) * width], encoding)
+
+
+class IMSIRange(NumberRange):
+    """
+    15-digit IMSIs MCC + MNC + MSIN for a range of MSINs.
+    """
+
+    kind = "IMSI"
+    min_length = 15
+    max_length = 15
+
+    def __init__(self, mcc: str, mnc: str, msin_start: int, count: int, **kwargs):
+        if len(mcc) != 3 or not mcc.isdigit():
+            raise ValueError(f"Invalid MCC: {mcc}")
+        if len(mnc) not in (2, 3) or not mnc.isdigit():
+            raise ValueError(f"Invalid MNC: {mnc}")
+        super().__init__(mcc + mnc, msin_start, count, 15, **kwargs)
+        self.mcc = mcc
+        self.mnc = mnc
+
+
+class MSISDNRange(NumberRange):
+    """
+    MSISDNs of 10-15 digits sharing a prefix such as a country code.
+    """
+
+    kind = "MSISDN"
+    min_length = 10
+    max_length = 15
+
+
+class GTRange(NumberRange):
+    """
+    Global titles of 10-15 digits sharing a prefix.
+    """
+
+    kind = "GT"
+    min_length = 10
+    max_length = 15
+
+
+def parse_range(value: str, cls=NumberRange, mnc_length: int = 2, **kwargs) -> NumberRange:
+    """
+    Build a range from "FIRST:COUNT" as given on the command line, e.g.
+    "001010000000000:1000" for 1000 IMSIs starting at that one.
+
+    Args:
+        value: First number and count
+        cls: NumberRange subclass to build
+        mnc_length: MNC digits when cls is IMSIRange
+        kwargs: stride, seed, shard and dedup
+
+    Raises:
+        ValueError: If value is malformed or the range is invalid
+    """
+    first, _, count = value.partition(":")
+    if not first.isdigit() or not count.isdigit():
+        raise ValueError(f"Invalid range (expected FIRST:COUNT): {value}")
+    if issubclass(cls, IMSIRange):
+        msin = first[3 + mnc_length:]
+        if not msin:
+            raise ValueError(f"Invalid IMSI: {first}")
+        return cls(first[:3], first[3:3 + mnc_length], int(msin), int(count), **kwargs)
+    return cls("", int(first), int(count), len(first), **kwargs)
@@ -0,0 +1,91 @@
+# utils/protocols/fast_codec.py
+import struct
+from typing import Optional
+from utils.protocols.map_encoding import decode_address
+
+# Hand-written decoder for the SCCP_UDT -> TCAP_ReturnResultLast -> MAP_*
+# layouts defined in utils/protocols/ss7_layers.py. It produces exactly the
+# result dict ResponseParser builds from the scapy dissection, and returns
+# None whenever the packet is malformed or uses an opcode it does not know,
+# so the caller can fall back to scapy.
+
+SCCP_HEADER = struct.Struct(">BBBBBHHH")
+SCCP_HEADER_LEN = SCCP_HEADER.size
+TCAP_RETURN_RESULT_LAST_TAG = 0x04
+TCAP_RESULT_LEN = 10
+TCAP_INVOKE_ID_OFFSET = 4
+TCAP_OPCODE_OFFSET = 9
+MAP_HEADER_LEN = 2
+
+# opcode -> (operation name, MAP address fields in order) following the MAP
+# layers bound to TCAP_ReturnResultLast. Field encoding is map_encoding's.
+MAP_LAYOUTS = {
+    4: ("MAP_SRI", ("imsi", "msisdn")),
+    71: ("MAP_ATI", ("imsi",)),
+    2: ("MAP_UL", ("imsi", "vlr_gt")),
+    59: ("MAP_PSI", ("imsi",)),
+}
+
+
+def decode_response(response) -> Optional[dict]:
+    """
+    Decode a MAP response without scapy.
+
+    Args:
+        response: bytes, bytearray or memoryview holding one SCCP UDT message
+
+    Returns:
+        Parsed result dict, or None if the packet needs the scapy decoder
+    """
+    view = memoryview(response)
+    size = len(view)
+    if size < SCCP_HEADER_LEN:
+        return None
+    called_len, calling_len, data_len = SCCP_HEADER.unpack_from(view)[5:]
+    start = SCCP_HEADER_LEN + called_len + calling_len
+    end = start + data_len
+    if end > size:
+        return None
+
+    raw_hex = view.hex()
+    if not data_len:
+        return {
+            "status": "error",
+            "message": "No data in SCCP_UDT",
+            "operation": "unknown",
+            "raw_response": raw_hex
+        }
+
+    tcap_tag = view[start]
+    if tcap_tag != TCAP_RETURN_RESULT_LAST_TAG:
+        return {
+            "status": "error",
+            "message": f"Unknown TCAP tag: {hex(tcap_tag)}",
+            "operation": "unknown",
+            "raw_response": raw_hex
+        }
+
+    if data_len < TCAP_RESULT_LEN + MAP_HEADER_LEN:
+        return None
+    opcode = view[start + TCAP_OPCODE_OFFSET]
+    layout = MAP_LAYOUTS.get(opcode)
+    if layout is None:
+        return None
+    operation, fields = layout
+
+    params = {}
+    offset = start + TCAP_RESULT_LEN + MAP_HEADER_LEN
+    for name in fields:
+        field = decode_address(view, offset, end, name, strict=True)
+        if field is None:
+            return None
+        params[name], offset = field
+
+    return {
+        "status": "success",
+        "invoke_id": view[start + TCAP_INVOKE_ID_OFFSET],
+        "opcode": opcode,
+        "operation": operation,
+        "params": params,
+        "raw_response": raw_hex
+    }
@@ -0,0 +1,95 @@
+# utils/protocols/map_encoding.py
+from typing import Optional, Tuple
+from utils.encoding.bcd import decode_tbcd, encode_tbcd
+
+# Wire encoding of the MAP address fields (IMSI, MSISDN, VLR GT) shared by
+# the scapy layers, the request templates and the fast response decoder.
+# "tbcd" puts each field on the wire as a length octet followed by TBCD
+# digits, like real MAP. "ascii" keeps the old fixed-width ASCII layout for
+# peers (e.g. older mock servers) that still expect it.
+
+TBCD = "tbcd"
+ASCII = "ascii"
+ENCODINGS = (TBCD, ASCII)
+
+# Field widths of the ASCII layout
+ASCII_WIDTHS = {"imsi": 15, "msisdn": 10, "vlr_gt": 10}
+
+_encoding = TBCD
+
+
+def get_encoding() -> str:
+    return _encoding
+
+
+def set_encoding(encoding: str) -> str:
+    """
+    Select the MAP address encoding for this process.
+
+    Args:
+        encoding: "tbcd" or "ascii"
+
+    Returns:
+        The previous encoding
+
+    Raises:
+        ValueError: If encoding is unknown
+    """
+    global _encoding
+    encoding = str(encoding).lower()
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown MAP encoding: {encoding} (expected one of {', '.join(ENCODINGS)})")
+    previous, _encoding = _encoding, encoding
+    return previous
+
+
+def encode_address(value) -> bytes:
+    """
+    Encode one MAP address field for the wire.
+
+    Args:
+        value: Digits as str, or as ASCII bytes; a leading '+' is dropped
+            in TBCD
+
+    Returns:
+        Length octet and TBCD digits, or the ASCII bytes in ascii mode
+
+    Raises:
+        ValueError: If value cannot be TBCD-encoded or is too long
+    """
+    if _encoding == ASCII:
+        return value.encode('utf-8') if isinstance(value, str) else bytes(value)
+    if not isinstance(value, str):
+        value = bytes(value).decode('ascii')
+    tbcd = encode_tbcd(value.lstrip('+'))
+    if len(tbcd) > 255:
+        raise ValueError(f"MAP address too long: {len(value)} digits")
+    return bytes((len(tbcd),)) + tbcd
+
+
+def decode_address(data, offset: int, end: int, name: str, strict: bool = False) -> Optional[Tuple[str, int]]:
+    """
+    Decode the MAP address field starting at data[offset].
+
+    Args:
+        data: bytes, bytearray or memoryview holding the field
+        offset: Start of the field
+        end: End of the MAP payload
+        name: Field name, selecting the width in ascii mode
+        strict: Return None instead of truncating a TBCD field whose length
+            octet runs past end
+
+    Returns:
+        (digits, offset of the next field), or None (strict only)
+    """
+    if _encoding == ASCII:
+        next_offset = offset + ASCII_WIDTHS[name]
+        return bytes(data[offset:min(next_offset, end)]).decode('utf-8', errors='ignore'), next_offset
+    if offset >= end:
+        return "", offset
+    next_offset = offset + 1 + data[offset]
+    if next_offset > end:
+        if strict:
+            return None
+        next_offset = end
+    return decode_tbcd(data[offset + 1:next_offset]), next_offset
@@ -1,6 +1,25 @@
 # utils/protocols/ss7_layers.py
-from scapy.all import Packet, ByteField, ShortField, StrLenField
-from scapy.packet import bind_layers
+# Only scapy's packet core is needed to define and dissect these layers;
+# importing scapy.all would also load every protocol scapy ships with.
+from scapy.fields import ByteField, ShortField, StrField, StrLenField
+from scapy.packet import Packet, bind_layers
+from utils.protocols.map_encoding import ASCII, ASCII_WIDTHS, decode_address, encode_address, get_encoding
+
+class MAPAddressField(StrField):
+    """
+    IMSI, MSISDN or GT held as ASCII digits. On the wire it is a length octet
+    plus TBCD digits, or fixed-width ASCII when map_encoding is "ascii".
+    """
+
+    def addfield(self, pkt, s, val):
+        return s + encode_address(self.i2m(pkt, val))
+
+    def getfield(self, pkt, s):
+        if get_encoding() == ASCII:
+            width = ASCII_WIDTHS[self.name]
+            return s[width:], s[:width]
+        digits, offset = decode_address(s, 0, len(s), self.name)
+        return s[offset:], digits.encode('ascii')
 
 class SCCP_UDT(Packet):
     name = "SCCP_UDT"
@@ -68,8 +87,8 @@ class MAP_SRI(Packet):
     fields_desc = [
         ByteField("tag", 0x04),
         ByteField("len", None),
-        StrLenField("imsi", b"", length_from=lambda pkt: 15),  # 15 bytes
-        StrLenField("msisdn", b"", length_from=lambda pkt: 10)  # 10 bytes
+        MAPAddressField("imsi", b""),
+        MAPAddressField("msisdn", b"")
     ]
 
     def post_build(self, pkt, pay):
@@ -83,7 +102,7 @@ class MAP_ATI(Packet):
     fields_desc = [
         ByteField("tag", 0x47),
         ByteField("len", None),
-        StrLenField("imsi", b"", length_from=lambda pkt: 15)
+        MAPAddressField("imsi", b"")
     ]
 
     def post_build(self, pkt, pay):
@@ -97,8 +116,8 @@ class MAP_UL(Packet):
     fields_desc = [
         ByteField("tag", 0x02),
         ByteField("len", None),
-        StrLenField("imsi", b"", length_from=lambda pkt: 15),
-        StrLenField("vlr_gt", b"", length_from=lambda pkt: 10)
+        MAPAddressField("imsi", b""),
+        MAPAddressField("vlr_gt", b"")
     ]
 
     def post_build(self, pkt, pay):
@@ -112,7 +131,7 @@ class MAP_PSI(Packet):
     fields_desc = [
         ByteField("tag", 0x46),
         ByteField("len", None),
-        StrLenField("imsi", b"", length_from=lambda pkt: 15)
+        MAPAddressField("imsi", b"")
     ]
 
     def post_build(self, pkt, pay):
@@ -126,7 +145,7 @@ def set_map_fields(map_packet, **kwargs):
         if hasattr(map_packet, field):
             encoded_value = value.encode('utf-8') if isinstance(value, str) else value
             setattr(map_packet, field, encoded_value)
-    total_len = sum(len(getattr(map_packet, f.name)) for f in map_packet.fields_desc if f.name not in ["tag", "len"])
+    total_len = sum(len(encode_address(getattr(map_packet, f.name))) for f in map_packet.fields_desc if f.name not in ["tag", "len"])
     map_packet.len = total_len
     return map_packet
 